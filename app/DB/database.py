@@ -1,9 +1,12 @@
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo import MongoClient
+from pymongo.errors import OperationFailure
 import os
 from dotenv import load_dotenv
 
+from ..core.roundtrips import mongo_command_counter
+
 # Load environment variables from a .env file if present
 load_dotenv()
 
@@ -17,7 +20,12 @@ MODULES_COLLECTION = "modules"
 LESSONS_COLLECTION = "lessons"
 ASSESSMENTS_COLLECTION = "assessments"
 PROGRESS_COLLECTION = "progress"
+CONTENT_PROGRESS_COLLECTION = "content_progress"
 ROADMAPS_COLLECTION = "roadmaps"
+STUDENT_GRADES_COLLECTION = "student_grades"
+STUDENT_RESPONSES_COLLECTION = "student_responses"
+STUDENT_GRADE_SUMMARIES_COLLECTION = "student_grade_summaries"
+MODULE_GRADE_KEYS_COLLECTION = "module_grade_keys"
 
 # Database instance
 _db: Optional[AsyncIOMotorDatabase] = None
@@ -31,7 +39,7 @@ async def get_database() -> AsyncIOMotorDatabase:
     """
     global _db
     if _db is None:
-        client = AsyncIOMotorClient(MONGODB_URL)
+        client = AsyncIOMotorClient(MONGODB_URL, event_listeners=[mongo_command_counter])
         _db = client[DATABASE_NAME]
         
         # Create indexes for our collections
@@ -50,24 +58,78 @@ async def _create_indexes():
     await db[COURSES_COLLECTION].create_index("instructor_id")
     await db[COURSES_COLLECTION].create_index([("title", "text"), ("description", "text")])
     await db[COURSES_COLLECTION].create_index("status")
+    await db[COURSES_COLLECTION].create_index([("status", 1), ("_id", -1)])
+
+    # Roadmaps indexes (catalog pages are filtered by status, newest _id first)
+    await db[ROADMAPS_COLLECTION].create_index([("status", 1), ("_id", -1)])
     
-    # Modules indexes
+    # Modules indexes (modules, lessons and assessments are ordered by a sparse rank within their parent)
     await db[MODULES_COLLECTION].create_index("course_id")
-    await db[MODULES_COLLECTION].create_index([("order", 1), ("course_id", 1)], unique=True)
+    await _create_unique_index(MODULES_COLLECTION, [("course_id", 1), ("rank", 1)])
     
     # Lessons indexes
     await db[LESSONS_COLLECTION].create_index("module_id")
     await db[LESSONS_COLLECTION].create_index("course_id")
-    await db[LESSONS_COLLECTION].create_index([("order", 1), ("module_id", 1)], unique=True)
+    await _create_unique_index(LESSONS_COLLECTION, [("module_id", 1), ("rank", 1)])
     
     # Assessments indexes
     await db[ASSESSMENTS_COLLECTION].create_index("module_id")
     await db[ASSESSMENTS_COLLECTION].create_index("course_id")
+    await _create_unique_index(ASSESSMENTS_COLLECTION, [("module_id", 1), ("rank", 1)])
     
     # Progress indexes
     await db[PROGRESS_COLLECTION].create_index([("user_id", 1), ("course_id", 1)], unique=True)
     await db[PROGRESS_COLLECTION].create_index("user_id")
     await db[PROGRESS_COLLECTION].create_index("course_id")
+    await db[CONTENT_PROGRESS_COLLECTION].create_index(
+        [("user_id", 1), ("course_id", 1), ("module_id", 1), ("content_id", 1)],
+        unique=True
+    )
+
+    # Student grades indexes
+    await _create_unique_index(STUDENT_GRADES_COLLECTION, [("email", 1), ("module", 1)])
+    await db[STUDENT_GRADES_COLLECTION].create_index([("module", 1), ("_id", 1)])
+    await db[STUDENT_GRADES_COLLECTION].create_index([("date_assigned", 1), ("_id", 1)])
+
+    # Student responses indexes
+    await _create_unique_index(STUDENT_RESPONSES_COLLECTION, [("email", 1)])
+
+    # Module grade key indexes (module -> key of the grades that pass it)
+    await db[MODULE_GRADE_KEYS_COLLECTION].create_index("grade_key")
+    await db[MODULE_GRADE_KEYS_COLLECTION].create_index("grade_keys")
+    await db[MODULE_GRADE_KEYS_COLLECTION].create_index("course_id")
+    await _seed_legacy_grade_keys()
+
+
+
+async def _create_unique_index(collection_name: str, keys: list):
+    """
+    Creates a unique index. Data written by earlier versions can break its
+    uniqueness until `python -m app.tools.migrate_legacy_data` has run, so a
+    failed build is reported instead of failing the connection.
+    """
+    db = await get_database()
+    try:
+        await db[collection_name].create_index(keys, unique=True)
+    except OperationFailure as e:
+        print(f"⚠️ Unique index on {collection_name} not built, run app.tools.migrate_legacy_data: {e}")
+
+async def _seed_legacy_grade_keys():
+    """
+    Stores the module -> grade key mapping that used to be hardcoded, without
+    overwriting keys already derived from assessments.
+    Safe to run on every startup.
+    """
+    from ..services.modules.assessment_mapping import LEGACY_GRADE_KEYS
+
+    db = await get_database()
+    for module_id, grade_key in LEGACY_GRADE_KEYS.items():
+        await db[MODULE_GRADE_KEYS_COLLECTION].update_one(
+            {"_id": module_id},
+            {"$setOnInsert": {"grade_key": grade_key, "source": "legacy"}},
+            upsert=True
+        )
+
 
 async def test_connection() -> bool:
     """
@@ -0,0 +1,29 @@
+from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends
+from ..services.analytics.grade_analytics_service import GradeAnalyticsService
+from ..core.auth import require_instructor
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+grade_analytics_service = GradeAnalyticsService()
+
+@router.get("/grades", response_model=Dict[str, Any])
+async def get_grade_statistics(
+    user_payload: Dict[str, Any] = Depends(require_instructor)
+) -> Dict[str, Any]:
+    """
+    Get grade distribution statistics for every module and overall:
+    mean, median, std, min/max, percentiles, histogram buckets and
+    pass rate against the passing grade.
+    """
+    return await grade_analytics_service.get_all_statistics()
+
+@router.get("/grades/{module}", response_model=Dict[str, Any])
+async def get_module_grade_statistics(
+    module: str,
+    user_payload: Dict[str, Any] = Depends(require_instructor)
+) -> Dict[str, Any]:
+    """Get grade distribution statistics for one module (assessment)."""
+    stats = await grade_analytics_service.get_module_statistics(module)
+    if not stats:
+        raise HTTPException(status_code=404, detail="No grades found for this module")
+    return stats
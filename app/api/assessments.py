@@ -4,7 +4,8 @@ from ..models.assessments.assessment import (
     Assessment,
     AssessmentCreate,
     AssessmentUpdate,
-    AssessmentStatus
+    AssessmentStatus,
+    AssessmentReorder
 )
 from ..services.assessments.assessment_service import AssessmentService
 from ..core.auth import get_current_user_payload, require_instructor, require_student
@@ -47,6 +48,18 @@ async def list_module_assessments(
         include_archived=include_archived
     )
 
+@router.put("/module/{module_id}/order", response_model=List[Assessment])
+async def reorder_module_assessments(
+    module_id: str,
+    reorder: AssessmentReorder,
+    user_payload: Dict[str, Any] = Depends(require_instructor)
+) -> List[Assessment]:
+    """Apply a complete new assessment ordering for a module in one write."""
+    try:
+        return await assessment_service.reorder_assessments(module_id, reorder.assessment_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.put("/{assessment_id}", response_model=Assessment)
 async def update_assessment(
     assessment_id: str,
@@ -0,0 +1,59 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Query
+from ..models.courses.course import CourseLevel, CourseStatus
+from ..models.roadmaps.roadmap import RoadmapCategory, RoadmapDifficulty, RoadmapStatus
+from ..services.catalog.catalog_service import CourseCatalogService, RoadmapCatalogService
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+course_catalog_service = CourseCatalogService()
+roadmap_catalog_service = RoadmapCatalogService()
+
+@router.get("/courses", response_model=Dict[str, Any])
+async def search_course_catalog(
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=10, ge=1, le=100),
+    category: Optional[str] = None,
+    level: Optional[CourseLevel] = None,
+    language: Optional[str] = None,
+    status: Optional[CourseStatus] = CourseStatus.PUBLISHED,
+    search_term: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Search the course catalog. Returns a page of courses, the total number
+    of matches and the counts per category, level and language.
+    """
+    return await course_catalog_service.search(
+        filters={
+            "category": category,
+            "level": level.value if level else None,
+            "language": language
+        },
+        status=status.value if status else None,
+        search_term=search_term,
+        skip=skip,
+        limit=limit
+    )
+
+@router.get("/roadmaps", response_model=Dict[str, Any])
+async def search_roadmap_catalog(
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=10, ge=1, le=100),
+    category: Optional[RoadmapCategory] = None,
+    difficulty: Optional[RoadmapDifficulty] = None,
+    status: Optional[RoadmapStatus] = RoadmapStatus.PUBLISHED,
+    search_term: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Search the roadmap catalog. Returns a page of roadmaps, the total number
+    of matches and the counts per category and difficulty.
+    """
+    return await roadmap_catalog_service.search(
+        filters={
+            "category": category.value if category else None,
+            "difficulty": difficulty.value if difficulty else None
+        },
+        status=status.value if status else None,
+        search_term=search_term,
+        skip=skip,
+        limit=limit
+    )
@@ -1,10 +1,14 @@
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from ..core.auth import require_instructor
+from ..models.modules.module import Module, ModuleReorder
 from ..services.courses.course_service import CourseService
+from ..services.modules.module_service import ModuleService
 from ..services.module_access_service import ModuleAccessService
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 course_service = CourseService()
+module_service = ModuleService()
 module_access_service = ModuleAccessService()
 
 # Mock data that matches your frontend structure
@@ -118,6 +122,18 @@ MOCK_COURSES_DATA = [
     }
 ]
 
+@router.put("/{course_id}/modules/order", response_model=List[Module])
+async def reorder_course_modules(
+    course_id: str,
+    reorder: ModuleReorder,
+    user_payload: Dict[str, Any] = Depends(require_instructor)
+) -> List[Module]:
+    """Apply a complete new module ordering for a course in one write."""
+    try:
+        return await module_service.reorder_modules(course_id, reorder.module_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.get("/frontend-data", response_model=List[Dict[str, Any]])
 async def get_courses_frontend_data() -> List[Dict[str, Any]]:
     """
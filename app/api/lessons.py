@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, Depends, Query
-from ..models.lessons.lesson import Lesson, LessonCreate, LessonUpdate, LessonStatus
+from ..models.lessons.lesson import Lesson, LessonCreate, LessonUpdate, LessonStatus, LessonReorder
 from ..services.lessons.lesson_service import LessonService
 from ..core.auth import get_current_user_payload, require_instructor, require_student
 
@@ -42,6 +42,18 @@ async def list_module_lessons(
         include_archived=include_archived
     )
 
+@router.put("/module/{module_id}/order", response_model=List[Lesson])
+async def reorder_module_lessons(
+    module_id: str,
+    reorder: LessonReorder,
+    user_payload: Dict[str, Any] = Depends(require_instructor)
+) -> List[Lesson]:
+    """Apply a complete new lesson ordering for a module in one write."""
+    try:
+        return await lesson_service.reorder_lessons(module_id, reorder.lesson_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.put("/{lesson_id}", response_model=Lesson)
 async def update_lesson(
     lesson_id: str,
@@ -1,6 +1,10 @@
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from ..models.module_access import CohortAccessRequest
 from ..services.module_access_service import ModuleAccessService
+from ..core.streaming import ndjson_lines
+from ..core.config import settings
 
 router = APIRouter(prefix="/module-access", tags=["module-access"])
 module_access_service = ModuleAccessService()
@@ -33,6 +37,43 @@ async def check_module_access(
             detail=f"Error checking module access: {str(e)}"
         )
 
+@router.post(
+    "/course/{course_id}/students",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "One NDJSON line per student with the access status of every module",
+            "content": {"application/x-ndjson": {}}
+        },
+        404: {"description": "Course not found"}
+    }
+)
+async def get_cohort_module_access(course_id: str, cohort: CohortAccessRequest) -> StreamingResponse:
+    """
+    Get access status for all modules in a course for many students at once,
+    streamed as NDJSON (one line per student, same shape as
+    `/course/{student_email}/{course_id}`).
+    
+    Args:
+        course_id: Course ID
+        cohort: Student emails, or a grade key selecting the cohort
+        
+    Returns:
+        Streaming NDJSON response
+    """
+    try:
+        rows = await module_access_service.stream_course_access_for_students(
+            course_id, cohort.emails, cohort.grade_key
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting cohort module access: {str(e)}"
+        )
+    if rows is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return StreamingResponse(ndjson_lines(rows), media_type="application/x-ndjson")
+
 @router.get("/course/{student_email}/{course_id}", response_model=Dict[str, Any])
 async def get_course_module_access(
     student_email: str,
@@ -75,7 +116,7 @@ async def check_python_module2_access(student_email: str) -> Dict[str, Any]:
         has_access = await module_access_service.check_python_module2_access(student_email)
         
         # Get the actual grade for more detailed response
-        grade_record = module_access_service.grades_service.get_grades_by_token(
+        grade_record = await module_access_service.grades_service.get_grades_by_email(
             student_email, "Assessment1"
         )
         
@@ -85,12 +126,51 @@ async def check_python_module2_access(student_email: str) -> Dict[str, Any]:
             "has_access": has_access,
             "module_id": "python-module2",
             "prerequisite_assessment": "Assessment1",
-            "required_grade": 40.0,
+            "required_grade": settings.PASSING_GRADE,
             "current_grade": current_grade,
-            "reason": f"Assessment1 grade: {current_grade}/40.0" if grade_record else "No Assessment1 grade found"
+            "reason": f"Assessment1 grade: {current_grade}/{settings.PASSING_GRADE}" if grade_record else "No Assessment1 grade found"
         }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error checking Python Module 2 access: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/next/{student_email}/{course_id}", response_model=Dict[str, Any])
+async def get_next_unlocks(
+    student_email: str,
+    course_id: str
+) -> Dict[str, Any]:
+    """
+    Get which modules of a course a student has completed, can take now,
+    and will unlock next by passing the available ones.
+    
+    Args:
+        student_email: Student's email address
+        course_id: Course ID
+        
+    Returns:
+        Dict with completed, available and next module lists
+    """
+    try:
+        return await module_access_service.get_next_unlocks(student_email, course_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting next unlocks: {str(e)}"
+        )
+
+@router.get("/graph/{course_id}", response_model=Dict[str, Any])
+async def get_prerequisite_graph(course_id: str) -> Dict[str, Any]:
+    """
+    Get the compiled prerequisite graph of a course: topological order,
+    transitive prerequisites, modules on cycles and dangling prerequisite IDs.
+    """
+    try:
+        graph = await module_access_service.module_service.prerequisite_graphs.get_graph(course_id)
+        return graph.summary()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting prerequisite graph: {str(e)}"
+        )
@@ -1,11 +1,24 @@
+from dataclasses import asdict
 from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Query
-from ..models.progress.progress import CourseProgress, ContentType
-from ..services.progress.progress_service import ProgressService
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from ..models.progress.progress import CourseProgress, ProgressBatchUpdate
+from ..services.progress.progress_service import ContentProgressEvent, ProgressService, ProgressWriteError
+from ..services.progress.progress_buffer import ProgressBuffer
 from ..core.auth import get_current_user_payload, require_student
 
 router = APIRouter(prefix="/progress", tags=["progress"])
 progress_service = ProgressService()
+progress_buffer = ProgressBuffer()
+
+def _unwritten_detail(error: ProgressWriteError, events: List[ContentProgressEvent]) -> Dict[str, Any]:
+    """Error body listing the progress events to send again."""
+    return {
+        "message": str(error),
+        "unwritten": [
+            {field: value for field, value in asdict(event).items() if field != "user_id"}
+            for event in events
+        ]
+    }
 
 @router.get("/courses/{course_id}", response_model=CourseProgress)
 async def get_course_progress(
@@ -38,28 +51,99 @@ async def list_user_progress(
         limit=limit
     )
 
+@router.post("/batch", response_model=List[CourseProgress])
+async def update_progress_batch(
+    batch: ProgressBatchUpdate,
+    user_payload: Dict[str, Any] = Depends(require_student)
+) -> List[CourseProgress]:
+    """
+    Apply an ordered list of content progress events, possibly across courses
+    (e.g. replayed by an offline client). Events are coalesced so every
+    affected course progress is written once. Returns the updated progress,
+    or 409 with the (coalesced) events that were not written under
+    `unwritten`.
+    """
+    try:
+        progress_docs = await progress_service.apply_content_events([
+            ContentProgressEvent(
+                user_id=user_payload["user_id"],
+                course_id=event.course_id,
+                module_id=event.module_id,
+                content_id=event.content_id,
+                time_spent=event.time_spent,
+                last_position=event.last_position,
+                completed=event.completed
+            )
+            for event in batch.events
+        ])
+    except ProgressWriteError as e:
+        # The other events were written; only these must be sent again
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=_unwritten_detail(e, e.unwritten))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [CourseProgress.model_validate(progress) for progress in progress_docs]
+
 @router.post("/courses/{course_id}/modules/{module_id}/content/{content_id}")
 async def update_content_progress(
     course_id: str,
     module_id: str,
     content_id: str,
-    content_type: ContentType,
     time_spent: int = Query(..., ge=0),  # Required, must be non-negative
     completed: bool = Query(False),
     last_position: Dict[str, Any] = None,
     user_payload: Dict[str, Any] = Depends(require_student)
 ) -> CourseProgress:
     """Update progress for a specific content item (lesson or assessment)."""
-    updated_progress = await progress_service.update_content_progress(
+    try:
+        updated_progress = await progress_service.update_content_progress(
+            user_id=user_payload["user_id"],
+            course_id=course_id,
+            module_id=module_id,
+            content_id=content_id,
+            time_spent=time_spent,
+            last_position=last_position,
+            completed=completed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not updated_progress:
+        raise HTTPException(status_code=404, detail="Progress not found")
+    return updated_progress 
+
+@router.post(
+    "/courses/{course_id}/modules/{module_id}/content/{content_id}/heartbeat",
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def record_progress_heartbeat(
+    course_id: str,
+    module_id: str,
+    content_id: str,
+    time_spent: int = Query(..., ge=0),
+    completed: bool = Query(False),
+    last_position: Dict[str, Any] = None,
+    user_payload: Dict[str, Any] = Depends(require_student)
+) -> Dict[str, str]:
+    """
+    Report time spent on a content item. Heartbeats are buffered and
+    written in bulk every few seconds; a completion is written immediately.
+    Responds 409 with the heartbeat under `unwritten` if a completion
+    could not be written.
+    """
+    event = ContentProgressEvent(
         user_id=user_payload["user_id"],
         course_id=course_id,
         module_id=module_id,
         content_id=content_id,
-        content_type=content_type,
         time_spent=time_spent,
         last_position=last_position,
         completed=completed
     )
-    if not updated_progress:
-        raise HTTPException(status_code=404, detail="Progress not found")
-    return updated_progress 
\ No newline at end of file
+    try:
+        await progress_buffer.add(event)
+    except ProgressWriteError as e:
+        # The completion was not written (time buffered before it stays
+        # buffered); the client should send this heartbeat again
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=_unwritten_detail(e, [event]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "accepted"}
@@ -0,0 +1,33 @@
+from typing import Any, Dict, List, Literal, Optional
+from fastapi import APIRouter, Query
+from ..services.search.suggest_service import SuggestService
+from ..services.search.lesson_search_service import LessonSearchService
+
+router = APIRouter(prefix="/search", tags=["search"])
+suggest_service = SuggestService()
+lesson_search_service = LessonSearchService()
+
+@router.get("/suggest", response_model=List[Dict[str, Any]])
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    types: Optional[List[Literal["course", "module", "lesson"]]] = Query(default=None),
+    limit: int = Query(default=10, ge=1, le=50)
+) -> List[Dict[str, Any]]:
+    """
+    Typeahead suggestions for published course, module and lesson titles.
+    The last word of `q` is matched as a prefix.
+    """
+    return await suggest_service.suggest(q, types=types, limit=limit)
+
+@router.get("/lessons", response_model=List[Dict[str, Any]])
+async def search_lessons(
+    q: str = Query(..., min_length=1, max_length=200),
+    course_id: Optional[str] = None,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=10, ge=1, le=50)
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search over the content of published lessons.
+    Each result points at the best matching content block with a snippet.
+    """
+    return await lesson_search_service.search(q, course_id=course_id, skip=skip, limit=limit)
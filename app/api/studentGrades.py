@@ -1,9 +1,12 @@
 # src/api/studentGrades.py
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Dict, Any
+from datetime import date
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 
 from app.models.studentGrades import StudentGrades
-from app.services.studentGrades import GradesService
+from app.services.studentGrades import GradesService, GRADE_FIELDS
+from app.core.streaming import iter_lines, iter_ndjson_rows, iter_csv_rows, ndjson_lines, csv_lines
 
 router = APIRouter()
 
@@ -41,13 +44,56 @@ async def create_grade(grade: StudentGrades, service: GradesService = Depends(ge
     """
     try:
         # Llamamos al servicio que maneja la creación  de las calificaciones
-        result = service.create_grade(grade)
+        result = await service.create_grade(grade)
         return {
             "grade": result  # Aquí result debe ser lo que retorna el servicio
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
+@router.post(
+    "/import",
+    response_model=Dict[str, Any],
+    responses={
+        200: {
+            "description": "Import finished; invalid rows are reported, not fatal",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "processed": 3,
+                        "upserted": 1,
+                        "modified": 1,
+                        "failed": 1,
+                        "errors": [{"line": 3, "error": "grade: Input should be a valid number"}]
+                    }
+                }
+            }
+        },
+        400: {"description": "Unsupported upload format"}
+    }
+)
+async def import_grades(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults from Content-Type"),
+    batch_size: int = Query(500, ge=1, le=5000),
+    service: GradesService = Depends(get_student_grade_service)
+):
+    """
+    Bulk import grades from a streamed NDJSON or CSV body.
+
+    Each row needs `email`, `module`, `grade` and `date_assigned`; existing
+    grades for the same (email, module) are overwritten. The body is parsed
+    incrementally and written in `bulk_write` batches of `batch_size` rows.
+    """
+    content_type = request.headers.get("content-type", "")
+    upload_format = format or ("csv" if "csv" in content_type else "ndjson")
+    if upload_format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+
+    lines = iter_lines(request.stream())
+    rows = iter_csv_rows(lines) if upload_format == "csv" else iter_ndjson_rows(lines)
+    return await service.import_grades(rows, batch_size=batch_size)
+
 @router.patch(
     "/{email}/{module}",
     response_model=Dict[str, Any],
@@ -78,7 +124,7 @@ async def update_grade(email: str, module: str, grade: StudentGrades, service: G
     """
     try:
         # Actualiza la calificación existente para el estudiante
-        result = service.update_grades(grade)
+        result = await service.update_grades(grade)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -106,10 +152,12 @@ async def update_grade(email: str, module: str, grade: StudentGrades, service: G
 )
 async def get_grade(email: str, module: str, service: GradesService = Depends(get_student_grade_service)):
     try:
-        grade = service.get_grades_by_email(email, module)
+        grade = await service.get_grades_by_email(email, module)
         if not grade:
             raise HTTPException(status_code=404, detail="Grade not found")
         return grade
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -118,11 +166,12 @@ async def get_grade(email: str, module: str, service: GradesService = Depends(ge
     response_model=List[Dict[str, Any]],
     responses={
         200: {
-            "description": "List of all grades",
+            "description": "One page of grades; the next page cursor is in the X-Next-Cursor header",
             "content": {
                 "application/json": {
                     "example": [
                         {
+                            "_id": "665f1c2b9d1e8a0012345678",
                             "email": "token123",
                             "module": "Math101",
                             "grade": 95.0,
@@ -131,14 +180,64 @@ async def get_grade(email: str, module: str, service: GradesService = Depends(ge
                     ]
                 }
             }
-        }
+        },
+        400: {"description": "Invalid cursor"}
     }
 )
-async def list_grades(service: GradesService = Depends(get_student_grade_service)):
+async def list_grades(
+    response: Response,
+    module: Optional[str] = Query(None, description="Only grades of this module"),
+    date_from: Optional[date] = Query(None, description="Assigned on or after this date"),
+    date_to: Optional[date] = Query(None, description="Assigned on or before this date"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    limit: int = Query(100, ge=1, le=1000),
+    service: GradesService = Depends(get_student_grade_service)
+):
+    """
+    List grades page by page, optionally filtered by module and assignment date.
+    Pass the `X-Next-Cursor` response header as `after` to fetch the next page;
+    the header is absent on the last page.
+    """
     try:
-        return service.list_grades()
+        grades, next_cursor = await service.list_grades(module, date_from, date_to, after, limit)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return grades
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Grades streamed as NDJSON or CSV",
+            "content": {"application/x-ndjson": {}, "text/csv": {}}
+        }
+    }
+)
+async def export_grades(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    module: Optional[str] = Query(None, description="Only grades of this module"),
+    date_from: Optional[date] = Query(None, description="Assigned on or after this date"),
+    date_to: Optional[date] = Query(None, description="Assigned on or before this date"),
+    service: GradesService = Depends(get_student_grade_service)
+):
+    """
+    Export every matching grade as a streamed NDJSON or CSV download.
+    """
+    grades = service.iter_grades(module, date_from, date_to)
+    if format == "csv":
+        return StreamingResponse(
+            csv_lines(grades, GRADE_FIELDS),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="grades.csv"'}
+        )
+    return StreamingResponse(
+        ndjson_lines(grades),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="grades.ndjson"'}
+    )
 
 @router.delete(
     "/delete-by-email/{email}",
@@ -182,7 +281,7 @@ async def delete_grades_by_email(email: str, service: GradesService = Depends(ge
     }
     ```
     """
-    result = service.delete_grades_by_email(email)
+    result = await service.delete_grades_by_email(email)
     if result["deleted_count"] == 0:
         raise HTTPException(status_code=404, detail="No grades found for this email")
     return result
@@ -1,9 +1,11 @@
 # src/api/studentResponses.py
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 
 from app.models.studentResponses import StudentResponses
-from app.services.studentResponses import ResponsesService
+from app.services.studentResponses import ResponsesService, RESPONSE_CSV_FIELDS
+from app.core.streaming import ndjson_lines, csv_lines
 
 router = APIRouter()
 
@@ -37,11 +39,81 @@ def get_student_responses_service():
 )
 async def save_responses(responses: StudentResponses, service: ResponsesService = Depends(get_student_responses_service)):
     try:
-        result = service.create_responses(responses)
+        result = await service.create_responses(responses)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get(
+    "/responses/",
+    response_model=List[Dict[str, Any]],
+    responses={
+        200: {
+            "description": "One page of responses; the next page cursor is in the X-Next-Cursor header",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "_id": "665f1c2b9d1e8a0012345678",
+                            "email": "example@example.com",
+                            "responses": [
+                                {"question_id": 1, "answer": "a"}
+                            ]
+                        }
+                    ]
+                }
+            }
+        },
+        400: {"description": "Invalid cursor"}
+    }
+)
+async def list_responses(
+    response: Response,
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    limit: int = Query(100, ge=1, le=1000),
+    service: ResponsesService = Depends(get_student_responses_service)
+):
+    """
+    List responses page by page. Pass the `X-Next-Cursor` response header as
+    `after` to fetch the next page; the header is absent on the last page.
+    """
+    try:
+        responses, next_cursor = await service.list_all_responses(after, limit)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return responses
+
+@router.get(
+    "/responses/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Responses streamed as NDJSON (one student per line) or CSV (one answer per row)",
+            "content": {"application/x-ndjson": {}, "text/csv": {}}
+        }
+    }
+)
+async def export_responses(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    service: ResponsesService = Depends(get_student_responses_service)
+):
+    """
+    Export every student's responses as a streamed NDJSON or CSV download.
+    """
+    if format == "csv":
+        return StreamingResponse(
+            csv_lines(service.iter_answers(), RESPONSE_CSV_FIELDS),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="responses.csv"'}
+        )
+    return StreamingResponse(
+        ndjson_lines(service.iter_responses()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="responses.ndjson"'}
+    )
+
 @router.get(
     "/responses/{email}",
     response_model=Dict[str, Any],
@@ -74,10 +146,12 @@ async def save_responses(responses: StudentResponses, service: ResponsesService
 )
 async def get_responses(email: str, service: ResponsesService = Depends(get_student_responses_service)):
     try:
-        responses = service.get_responses_by_token(email)
+        responses = await service.get_responses_by_token(email)
         if not responses:
             raise HTTPException(status_code=404, detail="Responses not found")
         return responses
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -123,7 +197,7 @@ async def delete_responses_by_email(email: str, service: ResponsesService = Depe
     }
     ```
     """
-    result = service.delete_responses_by_email(email)
+    result = await service.delete_responses_by_email(email)
     if result["deleted_count"] == 0:
         raise HTTPException(status_code=404, detail="No responses found for this email")
     return result
@@ -1,7 +1,8 @@
-from typing import Optional, Any
+from typing import Optional, Any, List
 import json
 from redis.asyncio import Redis
 from .config import settings
+from .roundtrips import record_redis_call
 
 class CacheService:
     def __init__(self):
@@ -22,12 +23,14 @@ class CacheService:
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from cache."""
         await self.connect()
+        record_redis_call()
         value = await self.redis.get(key)
         return json.loads(value) if value else None
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set a value in cache with optional TTL."""
         await self.connect()
+        record_redis_call()
         try:
             await self.redis.set(
                 key,
@@ -41,13 +44,91 @@ class CacheService:
     async def delete(self, key: str) -> bool:
         """Delete a value from cache."""
         await self.connect()
+        record_redis_call()
         return bool(await self.redis.delete(key))
 
+    async def delete_many(self, keys: List[str]) -> int:
+        """Delete several values in one call."""
+        if not keys:
+            return 0
+        await self.connect()
+        record_redis_call()
+        return await self.redis.delete(*keys)
+
+    async def hget(self, key: str, field: str) -> Optional[Any]:
+        """Get a field of a hash."""
+        await self.connect()
+        record_redis_call()
+        value = await self.redis.hget(key, field)
+        return json.loads(value) if value else None
+
+    async def hmget(self, key: str, fields: List[str]) -> List[Optional[Any]]:
+        """Get several fields of a hash in one call."""
+        await self.connect()
+        record_redis_call()
+        values = await self.redis.hmget(key, fields)
+        return [json.loads(value) if value else None for value in values]
+
+    async def hset(self, key: str, field: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set a field of a hash, refreshing the hash TTL in the same round-trip."""
+        await self.connect()
+        record_redis_call()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, field, json.dumps(value))
+                pipe.expire(key, ttl if ttl is not None else self.ttl)
+                await pipe.execute()
+            return True
+        except Exception:
+            return False
+
+    async def hincr_many(self, keys: List[str], field: str, ttl: Optional[int] = None) -> None:
+        """Increment a counter field of several hashes, refreshing their TTL, in one round-trip."""
+        if not keys:
+            return
+        await self.connect()
+        record_redis_call()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hincrby(key, field, 1)
+                pipe.expire(key, ttl if ttl is not None else self.ttl)
+            await pipe.execute()
+
+    async def add_to_sets(self, keys: List[str], member: str, ttl: Optional[int] = None) -> bool:
+        """Add a member to several sets, refreshing their TTL, in one round-trip."""
+        if not keys:
+            return True
+        await self.connect()
+        record_redis_call()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.sadd(key, member)
+                    pipe.expire(key, ttl if ttl is not None else self.ttl)
+                await pipe.execute()
+            return True
+        except Exception:
+            return False
+
+    async def smembers(self, key: str) -> List[str]:
+        """Get the members of a set."""
+        await self.connect()
+        record_redis_call()
+        return list(await self.redis.smembers(key))
+
+    async def incr(self, key: str) -> int:
+        """Increment a counter (created at 1) and return its new value."""
+        await self.connect()
+        record_redis_call()
+        return await self.redis.incr(key)
+
     async def clear_pattern(self, pattern: str) -> int:
         """Clear all keys matching a pattern."""
         await self.connect()
+        record_redis_call()
         keys = await self.redis.keys(pattern)
         if keys:
+            record_redis_call()
             return await self.redis.delete(*keys)
         return 0
 
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -27,6 +27,20 @@ class Settings(BaseSettings):
     # Redis settings
     REDIS_URL: str = "redis://localhost:6379"  # Default Redis URL
     REDIS_CACHE_TTL: int = 300  # 5 minutes default TTL
+    CATALOG_CACHE_TTL: int = 60  # Faceted catalog pages, also cleared on every catalog write
+
+    # Round-trip budget settings (Mongo commands + Redis calls per request)
+    ROUND_TRIP_BUDGET: int = 25  # Default budget for every route
+    ROUND_TRIP_BUDGETS: Dict[str, int] = {}  # Per-route overrides, keyed by route template
+
+    # Grade settings
+    PASSING_GRADE: float = 40.0  # Minimum grade that passes an assessment and unlocks the next module
+
+    # Progress heartbeat buffering (write-behind)
+    PROGRESS_FLUSH_INTERVAL_SECONDS: float = 5.0  # Buffered heartbeats are written at least this often
+    PROGRESS_FLUSH_MAX_EVENTS: int = 1000  # Flush early once this many heartbeats are buffered
+    PROGRESS_WRITE_RETRIES: int = 5  # Attempts of a version-checked progress write before giving up
+    PROGRESS_STORAGE_LAYOUT: str = "embedded"  # "embedded" or "normalized" (one content_progress document per content item)
 
     # Port settings for FastAPI
     API_PORT: int = 8002  # Default port is 8002
@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LocalCache:
+    """
+    In-process LRU cache with a per-entry TTL.
+
+    Sits in front of Redis for small, hot, compiled structures that are
+    expensive to rebuild from JSON on every request. Each worker holds its
+    own copy, so the TTL bounds how long a worker can serve an entry that
+    another worker has invalidated.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value, evicting the least recently used entry when full."""
+        self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def replace(self, key: str, value: Any) -> bool:
+        """Replace a live value, keeping its expiry. Returns False if missing or expired."""
+        if self.get(key) is None:
+            return False
+        expires_at, _ = self._entries[key]
+        self._entries[key] = (expires_at, value)
+        return True
+
+    def delete(self, key: str) -> None:
+        """Delete a value if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Delete every value."""
+        self._entries.clear()
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # Contador de peticiones HTTP
 REQUEST_COUNT = Counter(
@@ -20,3 +20,38 @@ ERROR_COUNT = Counter(
     "Total HTTP errors", 
     ["method", "endpoint"]
 )
+
+
+# Histograma de round-trips a Mongo/Redis por petición, por plantilla de ruta
+DB_ROUND_TRIPS = Histogram(
+    "http_request_db_round_trips",
+    "Database and cache round-trips per HTTP request",
+    ["method", "route", "backend"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+)
+
+# Contador de peticiones que exceden su presupuesto de round-trips
+ROUND_TRIP_BUDGET_EXCEEDED = Counter(
+    "http_request_round_trip_budget_exceeded_total",
+    "HTTP requests that exceeded their round-trip budget",
+    ["method", "route"]
+)
+
+# Contenidos con latidos de progreso en el buffer, pendientes de escribir
+PROGRESS_BUFFERED_CONTENTS = Gauge(
+    "progress_buffered_contents",
+    "Content items with buffered progress not yet written"
+)
+
+# Vaciados del buffer de progreso, por resultado
+PROGRESS_FLUSHES = Counter(
+    "progress_buffer_flushes_total",
+    "Progress buffer flushes",
+    ["result"]
+)
+
+# Escrituras de progreso rechazadas por una versión desactualizada (y reintentadas)
+PROGRESS_WRITE_CONFLICTS = Counter(
+    "progress_write_conflicts_total",
+    "Optimistic progress writes that found a newer document version"
+)
@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+from pymongo import monitoring
+
+
+@dataclass
+class RoundTripCounter:
+    """
+    Counts the MongoDB commands and Redis calls issued while it is active.
+    """
+    mongo: int = 0
+    redis: int = 0
+    mongo_commands: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return self.mongo + self.redis
+
+
+_current_counter: ContextVar[Optional[RoundTripCounter]] = ContextVar(
+    "round_trip_counter", default=None
+)
+
+
+def current_counter() -> Optional[RoundTripCounter]:
+    """Return the counter bound to the current request/task, if any."""
+    return _current_counter.get()
+
+
+@contextmanager
+def count_round_trips() -> Iterator[RoundTripCounter]:
+    """
+    Bind a fresh counter to the current context.
+
+    Used by the HTTP middleware and usable from tests:
+
+        with count_round_trips() as trips:
+            await service.get_student_module_access_for_course(email, course_id)
+        assert trips.mongo <= 3
+    """
+    counter = RoundTripCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def record_redis_call(calls: int = 1) -> None:
+    """Record Redis round-trips against the active counter."""
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.redis += calls
+
+
+class MongoCommandCounter(monitoring.CommandListener):
+    """
+    PyMongo command listener feeding the active RoundTripCounter.
+
+    Motor runs PyMongo on executor threads with a copy of the caller's
+    context, so the counter bound by the request is visible here.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        counter = _current_counter.get()
+        if counter is None:
+            return
+        counter.mongo += 1
+        counter.mongo_commands[event.command_name] = (
+            counter.mongo_commands.get(event.command_name, 0) + 1
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+mongo_command_counter = MongoCommandCounter()
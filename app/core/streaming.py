@@ -0,0 +1,93 @@
+import codecs
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple, Union
+
+# A parsed upload row: (1-based line number, parsed record or the parse error)
+ParsedRow = Tuple[int, Union[Dict[str, Any], Exception]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into text lines without buffering the whole body.
+    Only the current partial line is held in memory.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """Parse newline-delimited JSON objects, skipping blank lines."""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            yield line_number, record
+        except ValueError as e:
+            yield line_number, e
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """
+    Parse CSV rows keyed by the header line, skipping blank lines.
+    Quoted values may not span several lines.
+    """
+    header: List[str] = []
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            values = next(csv.reader([line]))
+        except csv.Error as e:
+            yield line_number, e
+            continue
+        if not header:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield line_number, dict(zip(header, values))
+
+
+async def ndjson_lines(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode documents as newline-delimited JSON, one chunk per document."""
+    async for document in documents:
+        yield (json.dumps(document, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def csv_lines(
+    documents: AsyncIterator[Dict[str, Any]],
+    fieldnames: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """Encode documents as CSV with a header row, one chunk per document."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+
+    def flush() -> bytes:
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writeheader()
+    yield flush()
+    async for document in documents:
+        writer.writerow(document)
+        yield flush()
@@ -0,0 +1,364 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import AbstractSet, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# Words too common to rank by. Keywords of the languages taught ("for",
+# "in", "is", "and", "or", "as", "from", "with") are searchable.
+STOP_WORDS = {
+    # Spanish
+    "a", "al", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los",
+    "para", "por", "que", "se", "su", "sus", "un", "una", "unos", "unas", "y", "o",
+    # English
+    "an", "are", "at", "be", "by", "it", "of", "on", "the", "this", "to", "your"
+}
+
+# Smaller list for indexes over code: "by", "of", "on" and "this" are
+# keywords of SQL, JavaScript and Java
+CODE_STOP_WORDS = STOP_WORDS - {"by", "of", "on", "this"}
+
+# Light Spanish and English suffix stripping, longest suffix first. Text is
+# accent-stripped before stemming, so "ación" is matched as "acion".
+_SUFFIXES = sorted([
+    # Spanish
+    "amientos", "imientos", "amiento", "imiento", "aciones", "uciones", "acion",
+    "ucion", "mente", "idades", "idad", "ismos", "ismo", "istas", "ista",
+    "ables", "ibles", "able", "ible", "ancias", "ancia", "anzas", "anza",
+    "osos", "osas", "oso", "osa", "ivos", "ivas", "ivo", "iva",
+    # Spanish verbs: gerunds, participles and infinitives
+    "ando", "iendo", "ados", "adas", "ado", "ada", "idos", "idas", "ido", "ida",
+    "ar", "er", "ir", "os", "as", "a", "o", "e",
+    # English
+    "izations", "ization", "ations", "ation", "nesses", "ness", "ments", "ment",
+    "ingly", "ings", "ing", "edly", "ers", "ed", "ies", "es", "ly", "s"
+], key=len, reverse=True)
+
+# A stem keeps at least this many letters ("data" is not "dat"), except for
+# a plain plural "s" ("sets" is "set")
+MIN_STEM_LENGTH = 4
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem(token: str) -> str:
+    """Strip the longest known Spanish/English suffix, keeping a minimal stem."""
+    for suffix in _SUFFIXES:
+        if not token.endswith(suffix):
+            continue
+        if suffix == "s":
+            # "class", "status" and "analysis" are not plurals
+            if token[-2:-1] in ("s", "u", "i") or len(token) - 1 < MIN_STEM_LENGTH - 1:
+                continue
+        elif len(token) - len(suffix) < MIN_STEM_LENGTH:
+            continue
+        # "libraries" is "library"
+        token = token[:-len(suffix)] + ("y" if suffix == "ies" else "")
+        break
+    # "programm" (programming) and "program" (programacion) share a stem, and
+    # so do "desarroll" (desarrollo, desarrollar) and "desarrol"
+    if len(token) > MIN_STEM_LENGTH and token[-1] == token[-2] and token[-1] not in "aeious":
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str, stop_words: AbstractSet[str] = STOP_WORDS) -> List[str]:
+    """Split text into normalized, stemmed tokens, dropping stop words."""
+    return [
+        stem(token)
+        for token in _TOKEN_RE.findall(normalize(text))
+        if token not in stop_words
+    ]
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index with BM25 ranking over weighted fields.
+
+    Each document is a mapping of field name to text (or a list of texts);
+    a field's weight multiplies the term frequencies it contributes.
+    Documents can be added, replaced and removed one at a time.
+    """
+
+    def __init__(
+        self,
+        field_weights: Dict[str, float],
+        k1: float = 1.2,
+        b: float = 0.75,
+        stop_words: AbstractSet[str] = STOP_WORDS
+    ):
+        self.field_weights = field_weights
+        self.k1 = k1
+        self.b = b
+        self.stop_words = stop_words
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Set[str]] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: str, fields: Dict[str, Any]) -> None:
+        """Index a document, replacing any previous version."""
+        self.remove(doc_id)
+        frequencies: Dict[str, float] = defaultdict(float)
+        length = 0.0
+        for field, weight in self.field_weights.items():
+            value = fields.get(field)
+            if not value:
+                continue
+            texts = value if isinstance(value, (list, tuple)) else [value]
+            for text in texts:
+                for token in tokenize(str(text), self.stop_words):
+                    frequencies[token] += weight
+                    length += weight
+
+        for token, frequency in frequencies.items():
+            self._postings[token][doc_id] = frequency
+        self._doc_terms[doc_id] = set(frequencies)
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document if indexed."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for token in terms:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._doc_lengths.pop(doc_id, 0.0)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._total_length = 0.0
+
+    def search(
+        self,
+        query: str,
+        accept: Optional[Callable[[str], bool]] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank documents matching any query term by BM25 score.
+
+        Args:
+            query: Free text query
+            accept: Optional predicate filtering document IDs
+            limit: Maximum number of results
+
+        Returns:
+            (doc_id, score) pairs, best first
+        """
+        terms = set(tokenize(query, self.stop_words))
+        if not terms or not self._doc_terms:
+            return []
+
+        document_count = len(self._doc_terms)
+        average_length = (self._total_length / document_count) or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                if accept is not None and not accept(doc_id):
+                    continue
+                length_norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / average_length
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def terms(self) -> Iterable[str]:
+        """Every indexed term."""
+        return self._postings.keys()
+
+
+def snippet(text: str, query: str, width: int = 160, stop_words: AbstractSet[str] = STOP_WORDS) -> str:
+    """
+    Cut a window of about `width` characters of `text` around the first word
+    matching a query term (compared after normalizing and stemming).
+    Falls back to the start of the text.
+    """
+    terms = set(tokenize(query, stop_words))
+    start = 0
+    for match in _WORD_RE.finditer(text):
+        if stem(normalize(match.group())) in terms:
+            start = max(0, match.start() - width // 4)
+            break
+    end = min(len(text), start + width)
+    start = max(0, min(start, end - width))
+    # Do not cut words at either edge
+    if start > 0 and not text[start - 1].isspace():
+        space = text.find(" ", start, start + 20)
+        start = space + 1 if space != -1 else start
+    if end < len(text) and not text[end].isspace():
+        space = text.rfind(" ", end - 20, end)
+        end = space if space > start else end
+    fragment = " ".join(text[start:end].split())
+    return f"{'...' if start > 0 else ''}{fragment}{'...' if end < len(text) else ''}"
+
+
+def prefix_terms(text: str) -> List[str]:
+    """Split text into normalized, unstemmed words for prefix matching."""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class PrefixIndex:
+    """
+    In-memory typeahead index: sorted arrays of (term, entry ID) and
+    (label, entry ID) pairs searched with bisect.
+
+    A lookup is a few binary searches plus a bounded scan over the matching
+    ranges, so it costs O(log n + matches) and never touches the database.
+    Entries can be added, replaced and removed one at a time, or loaded all
+    at once with a single sort.
+    """
+
+    def __init__(self, max_candidates: int = 1000):
+        self.max_candidates = max_candidates
+        self._pairs: List[Tuple[str, str]] = []
+        self._labels: List[Tuple[str, str]] = []
+        self._entry_terms: Dict[str, List[str]] = {}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, entry_id: str, label: str, payload: Dict[str, Any], extra: Iterable[str] = ()) -> None:
+        """
+        Index an entry under every word of its label and of `extra` texts
+        (e.g. tags), replacing any previous version.
+        """
+        self.remove(entry_id)
+        for term in self._store(entry_id, label, payload, extra):
+            bisect.insort(self._pairs, (term, entry_id))
+        bisect.insort(self._labels, (self._payloads[entry_id]["_label"], entry_id))
+
+    def load(self, entries: Iterable[Tuple[str, str, Dict[str, Any], Iterable[str]]]) -> None:
+        """
+        Replace the whole index with (entry ID, label, payload, extra)
+        entries, keeping the first of duplicate IDs. The arrays are sorted once, O(n log n), where adding the
+        entries one by one would shift the arrays on every insert, O(n²).
+        """
+        self.clear()
+        for entry_id, label, payload, extra in entries:
+            if entry_id in self._payloads:
+                continue
+            self._pairs.extend((term, entry_id) for term in self._store(entry_id, label, payload, extra))
+            self._labels.append((self._payloads[entry_id]["_label"], entry_id))
+        self._pairs.sort()
+        self._labels.sort()
+
+    def _store(self, entry_id: str, label: str, payload: Dict[str, Any], extra: Iterable[str]) -> List[str]:
+        """Record an entry's terms and payload; returns its terms."""
+        label_terms = prefix_terms(label)
+        terms = sorted(set(label_terms).union(*(prefix_terms(text) for text in extra)))
+        self._entry_terms[entry_id] = terms
+        self._payloads[entry_id] = {**payload, "_label": " ".join(label_terms)}
+        return terms
+
+    def remove(self, entry_id: str) -> None:
+        """Remove an entry if indexed."""
+        terms = self._entry_terms.pop(entry_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            self._delete(self._pairs, (term, entry_id))
+        self._delete(self._labels, (self._payloads.pop(entry_id)["_label"], entry_id))
+
+    @staticmethod
+    def _delete(pairs: List[Tuple[str, str]], pair: Tuple[str, str]) -> None:
+        position = bisect.bisect_left(pairs, pair)
+        if position < len(pairs) and pairs[position] == pair:
+            del pairs[position]
+
+    def clear(self) -> None:
+        self._pairs.clear()
+        self._labels.clear()
+        self._entry_terms.clear()
+        self._payloads.clear()
+
+    def lookup(
+        self,
+        query: str,
+        accept: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Find entries matching every word of the query, the last word as a
+        prefix and the others as complete words or prefixes.
+
+        Entries whose label starts with the query come first, then shorter
+        labels. Those are collected from the label array before any other
+        match, so a long run of alphabetically earlier matches cannot crowd
+        them out; each pass gathers at most `max_candidates` entries.
+        """
+        words = prefix_terms(query)
+        if not words:
+            return []
+        *leading, last = words
+        phrase = " ".join(words)
+
+        candidates: List[str] = []
+        seen: Set[str] = set()
+        position = bisect.bisect_left(self._labels, (phrase, ""))
+        while position < len(self._labels) and len(candidates) < self.max_candidates:
+            label, entry_id = self._labels[position]
+            if not label.startswith(phrase):
+                break
+            position += 1
+            seen.add(entry_id)
+            if accept is None or accept(self._payloads[entry_id]):
+                candidates.append(entry_id)
+
+        budget = len(candidates) + self.max_candidates
+        position = bisect.bisect_left(self._pairs, (last, ""))
+        while position < len(self._pairs) and len(candidates) < budget:
+            term, entry_id = self._pairs[position]
+            if not term.startswith(last):
+                break
+            position += 1
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            terms = self._entry_terms[entry_id]
+            if all(any(term.startswith(word) for term in terms) for word in leading):
+                if accept is None or accept(self._payloads[entry_id]):
+                    candidates.append(entry_id)
+
+        ranked = heapq.nsmallest(
+            limit,
+            (self._payloads[entry_id] for entry_id in candidates),
+            key=lambda payload: (
+                not payload["_label"].startswith(phrase),
+                len(payload["_label"]),
+                payload["_label"]
+            )
+        )
+        return [
+            {key: value for key, value in payload.items() if key != "_label"}
+            for payload in ranked
+        ]
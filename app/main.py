@@ -2,12 +2,20 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from app.core.metrics import REQUEST_COUNT, RESPONSE_TIME, ERROR_COUNT
+from app.core.metrics import (
+    REQUEST_COUNT, RESPONSE_TIME, ERROR_COUNT, DB_ROUND_TRIPS, ROUND_TRIP_BUDGET_EXCEEDED
+)
+from app.core.config import settings
+from app.core.roundtrips import count_round_trips
+from app.services.progress.progress_buffer import ProgressBuffer
 
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 # Import routers
-from .api import studentGrades, studentResponses, lessons, assessments, progress, courses_frontend, module_access, roadmaps
+from .api import studentGrades, studentResponses, lessons, assessments, progress, courses_frontend, module_access, roadmaps, analytics, catalog, search
 
 # Create FastAPI instance
 app = FastAPI(
@@ -26,7 +34,6 @@ app.add_middleware(
 )
 
 # Include routers
-app.include_router(studentGrades.router)
 app.include_router(studentResponses.router)
 app.include_router(lessons.router)
 app.include_router(assessments.router)
@@ -34,6 +41,23 @@ app.include_router(progress.router)
 app.include_router(courses_frontend.router)
 app.include_router(module_access.router)
 app.include_router(roadmaps.router)
+app.include_router(analytics.router)
+app.include_router(catalog.router)
+app.include_router(search.router)
+# Grades are mounted without a prefix: "/{email}/{module}" would shadow any
+# two-segment route registered after it, so this router goes last
+app.include_router(studentGrades.router)
+
+# Buffer de latidos de progreso: flush periódico y vaciado al apagar
+progress_buffer = ProgressBuffer()
+
+@app.on_event("startup")
+async def start_progress_buffer():
+    progress_buffer.start()
+
+@app.on_event("shutdown")
+async def drain_progress_buffer():
+    await progress_buffer.stop()
 
 # Middleware para registrar métricas
 @app.middleware("http")
@@ -60,6 +84,47 @@ async def record_metrics(request, call_next):
 
     return response
 
+# Middleware para contar round-trips a Mongo/Redis por petición (detecta patrones N+1)
+@app.middleware("http")
+async def track_round_trips(request, call_next):
+    with count_round_trips() as trips:
+        response = await call_next(request)
+
+    response.headers["X-Mongo-Commands"] = str(trips.mongo)
+    response.headers["X-Redis-Calls"] = str(trips.redis)
+
+    # Las respuestas en streaming (exportaciones) siguen consultando mientras
+    # se envía el cuerpo: la métrica se registra cuando termina el envío
+    body_iterator = response.body_iterator
+
+    async def record_when_sent():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            _record_round_trips(request, trips)
+
+    response.body_iterator = record_when_sent()
+    return response
+
+def _record_round_trips(request, trips):
+    # Usar la plantilla de la ruta para no crear una serie por cada ID
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", request.url.path)
+    method = request.method
+
+    DB_ROUND_TRIPS.labels(method=method, route=route_path, backend="mongo").observe(trips.mongo)
+    DB_ROUND_TRIPS.labels(method=method, route=route_path, backend="redis").observe(trips.redis)
+
+    budget = settings.ROUND_TRIP_BUDGETS.get(route_path, settings.ROUND_TRIP_BUDGET)
+    if trips.total > budget:
+        ROUND_TRIP_BUDGET_EXCEEDED.labels(method=method, route=route_path).inc()
+        logger.warning(
+            "%s %s used %d round-trips (mongo=%d, redis=%d, budget=%d): %s",
+            method, route_path, trips.total, trips.mongo, trips.redis, budget,
+            trips.mongo_commands
+        )
+
 # Ruta para exponer las métricas en formato Prometheus
 @app.get("/metrics")
 async def metrics():
@@ -29,14 +29,16 @@ class AssessmentCreate(BaseModel):
     course_id: str
     order: int
     content: AssessmentContent
+    route: Optional[str] = None  # Key grades are recorded under; defaults to the title
 
 class Assessment(BaseDBModel, StatusModel):
     title: str
     description: str
     module_id: str
     course_id: str
-    order: int
+    order: Optional[int] = None  # Position among siblings, derived from the stored rank
     content: AssessmentContent
+    route: Optional[str] = None  # Key grades are recorded under; defaults to the title
     status: AssessmentStatus = AssessmentStatus.DRAFT
 
     class Config:
@@ -75,4 +77,8 @@ class AssessmentUpdate(BaseModel):
     description: Optional[str] = None
     order: Optional[int] = None
     content: Optional[AssessmentContent] = None
-    status: Optional[AssessmentStatus] = None 
\ No newline at end of file
+    route: Optional[str] = None
+    status: Optional[AssessmentStatus] = None 
+
+class AssessmentReorder(BaseModel):
+    assessment_ids: List[str]  # Every assessment of the module, in the new order
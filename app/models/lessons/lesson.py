@@ -54,7 +54,7 @@ class LessonCreate(BaseModel):
 class Lesson(BaseDBModel, StatusModel):
     title: str
     description: str
-    order: int
+    order: Optional[int] = None  # Position among siblings, derived from the stored rank
     module_id: str
     course_id: str
     estimated_duration: int  # in minutes
@@ -105,4 +105,7 @@ class LessonUpdate(BaseModel):
     content_blocks: Optional[List[Content]] = None
     status: Optional[LessonStatus] = None
     next_lesson_id: Optional[str] = None
-    previous_lesson_id: Optional[str] = None 
\ No newline at end of file
+    previous_lesson_id: Optional[str] = None 
+
+class LessonReorder(BaseModel):
+    lesson_ids: List[str]  # Every lesson of the module, in the new order
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class CohortAccessRequest(BaseModel):
+    """
+    Selecciona los estudiantes cuyo acceso a los módulos de un curso se evalúa.
+
+    Attributes:
+        emails (Optional[List[str]]): Estudiantes a evaluar.
+        grade_key (Optional[str]): Sin `emails`, evalúa a los estudiantes con una nota registrada bajo esta clave.
+            Sin ninguno de los dos, evalúa a todos los estudiantes con nota en alguno de los módulos del curso.
+    """
+    emails: Optional[List[str]] = Field(None, description="Emails de los estudiantes")
+    grade_key: Optional[str] = Field(None, description="Clave de nota (evaluación) que define la cohorte")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "emails": ["student1@example.com", "student2@example.com"]
+            }
+        }
+    }
@@ -30,7 +30,7 @@ class ModuleCreate(BaseModel):
 class Module(BaseDBModel, StatusModel):
     title: str
     description: str
-    order: int
+    order: Optional[int] = None  # Position among siblings, derived from the stored rank
     course_id: str
     estimated_duration: int  # in minutes
     difficulty: ModuleDifficulty
@@ -71,4 +71,7 @@ class ModuleUpdate(BaseModel):
     difficulty: Optional[ModuleDifficulty] = None
     objectives: Optional[List[ModuleObjective]] = None
     prerequisites: Optional[List[str]] = None
-    status: Optional[ModuleStatus] = None 
\ No newline at end of file
+    status: Optional[ModuleStatus] = None 
+
+class ModuleReorder(BaseModel):
+    module_ids: List[str]  # Every module of the course, in the new order
@@ -1,7 +1,7 @@
-from typing import Optional, Dict, Any
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from ..base import BaseDBModel
 
 class ContentType(str, Enum):
@@ -26,6 +26,25 @@ class ModuleProgress(BaseModel):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     content_progress: Dict[str, ContentProgress] = Field(default_factory=dict)  # content_id -> progress
+    completed_count: int = 0  # Completed lessons and assessments of the module
+    total_count: int = 0  # Lessons and assessments of the module (0 if unknown)
+
+    @computed_field
+    @property
+    def completion_percentage(self) -> float:
+        return round(min(self.completed_count / self.total_count, 1.0) * 100, 2) if self.total_count else 0.0
+
+class ContentProgressUpdate(BaseModel):
+    course_id: str
+    module_id: str
+    content_id: str
+    content_type: ContentType
+    time_spent: int = Field(..., ge=0)  # seconds since the previous report
+    last_position: Optional[Dict[str, Any]] = None
+    completed: bool = False
+
+class ProgressBatchUpdate(BaseModel):
+    events: List[ContentProgressUpdate] = Field(..., min_length=1, max_length=1000)  # oldest first
 
 class CourseProgress(BaseDBModel):
     user_id: str
@@ -35,6 +54,16 @@ class CourseProgress(BaseDBModel):
     completed_at: Optional[datetime] = None
     module_progress: Dict[str, ModuleProgress] = Field(default_factory=dict)  # module_id -> progress
     last_accessed_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_count: int = 0  # Completed lessons and assessments of the course
+    total_count: int = 0  # Lessons and assessments of the course (0 if unknown)
+    completed_modules: int = 0
+    total_modules: int = 0
+    version: int = 0  # Bumped by every write; optimistic writes only apply to the version they read
+
+    @computed_field
+    @property
+    def completion_percentage(self) -> float:
+        return round(min(self.completed_count / self.total_count, 1.0) * 100, 2) if self.total_count else 0.0
 
     class Config:
         schema_extra = {
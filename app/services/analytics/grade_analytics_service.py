@@ -0,0 +1,183 @@
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from ...core.cache import cache
+from ...core.config import settings
+from ...DB.database import STUDENT_GRADES_COLLECTION
+from ..base import BaseService
+
+logger = logging.getLogger(__name__)
+
+# Grades fetched per cursor round-trip
+ANALYTICS_BATCH_SIZE = 5000
+
+# Percentiles reported for every distribution
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# Histogram bucket edges: ten buckets of width 10 over the 0-100 scale.
+# Out-of-scale grades are counted in the first or last bucket.
+HISTOGRAM_EDGES = np.linspace(0.0, 100.0, 11)
+
+ANALYTICS_CACHE_PREFIX = "grade_analytics"
+
+# Counter embedded in every statistics cache key; bumping it invalidates them all
+ANALYTICS_GENERATION_KEY = f"{ANALYTICS_CACHE_PREFIX}:generation"
+
+
+class GradeAnalyticsService(BaseService):
+    """
+    Service computing grade distribution statistics per grade key (the
+    `module` field of student grades, i.e. the assessment name).
+
+    Grades are read in batches through a projected cursor into compact
+    per-module float columns, and every statistic is computed with NumPy.
+    Results are cached in Redis under a generation number that
+    GradesService writes bump, which invalidates them all at once.
+    """
+
+    def __init__(self):
+        super().__init__(STUDENT_GRADES_COLLECTION)
+
+    async def get_module_statistics(self, module: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the grade distribution of one module.
+        Returns None if the module has no grades.
+        """
+        module = module.strip()
+        cache_key = await self._cache_key(f"module:{module}")
+        cached_stats = await cache.get(cache_key)
+        if cached_stats is not None:
+            return cached_stats
+
+        columns = await self._load_grade_columns({"module": module})
+        if module not in columns:
+            return None
+
+        stats = self.compute_statistics(columns[module])
+        stats["module"] = module
+        await cache.set(cache_key, stats)
+        return stats
+
+    async def get_all_statistics(self) -> Dict[str, Any]:
+        """
+        Get the grade distribution of every module, plus the overall one,
+        from a single pass over the collection.
+        """
+        cache_key = await self._cache_key("all")
+        cached_stats = await cache.get(cache_key)
+        if cached_stats is not None:
+            return cached_stats
+
+        columns = await self._load_grade_columns({})
+        modules = {
+            module: {"module": module, **self.compute_statistics(grades)}
+            for module, grades in sorted(columns.items())
+        }
+        overall = self.compute_statistics(
+            np.concatenate(list(columns.values())) if columns else np.empty(0)
+        )
+        stats = {"overall": overall, "modules": modules}
+        await cache.set(cache_key, stats)
+        return stats
+
+    async def _load_grade_columns(self, query: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Read the numeric grades matching `query` into one float column per module.
+
+        Each cursor batch becomes a grade array (np.fromiter) and a module
+        array; the columns are then split out of the concatenated arrays with
+        one stable sort, so no per-grade Python list is ever built.
+        """
+        collection = await self.get_collection()
+        cursor = collection.find(
+            {**query, "module": {"$type": "string"}, "grade": {"$type": "number"}},
+            {"_id": 0, "module": 1, "grade": 1}
+        ).batch_size(ANALYTICS_BATCH_SIZE)
+
+        grade_batches: List[np.ndarray] = []
+        module_batches: List[np.ndarray] = []
+        while True:
+            batch = await cursor.to_list(length=ANALYTICS_BATCH_SIZE)
+            if not batch:
+                break
+            grade_batches.append(np.fromiter((document["grade"] for document in batch), dtype=np.float64, count=len(batch)))
+            module_batches.append(np.array([document["module"] for document in batch], dtype=object))
+        if not grade_batches:
+            return {}
+
+        grades = np.concatenate(grade_batches)
+        modules = np.concatenate(module_batches)
+        order = np.argsort(modules, kind="stable")
+        names, starts = np.unique(modules[order], return_index=True)
+        return dict(zip(names.tolist(), np.split(grades[order], starts[1:])))
+
+    @staticmethod
+    def compute_statistics(grades: np.ndarray, passing_grade: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Compute the distribution statistics of a grade column.
+
+        Args:
+            grades: 1-D float array of grades
+            passing_grade: Minimum grade counted as passed (defaults to settings.PASSING_GRADE)
+
+        Returns:
+            Dict with count, mean, median, std, min, max, percentiles,
+            histogram buckets and pass rate (None values when empty)
+        """
+        if passing_grade is None:
+            passing_grade = settings.PASSING_GRADE
+        count = int(grades.size)
+        if count == 0:
+            return {
+                "count": 0,
+                "mean": None,
+                "median": None,
+                "std": None,
+                "min": None,
+                "max": None,
+                "percentiles": {f"p{p}": None for p in PERCENTILES},
+                "histogram": [],
+                "passing_grade": passing_grade,
+                "passed": 0,
+                "pass_rate": None
+            }
+
+        percentile_values = np.percentile(grades, PERCENTILES)
+        counts, _ = np.histogram(np.clip(grades, HISTOGRAM_EDGES[0], HISTOGRAM_EDGES[-1]), bins=HISTOGRAM_EDGES)
+        passed = int(np.count_nonzero(grades >= passing_grade))
+
+        histogram: List[Dict[str, Any]] = [
+            {"min": float(low), "max": float(high), "count": int(bucket_count)}
+            for low, high, bucket_count in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], counts)
+        ]
+        return {
+            "count": count,
+            "mean": float(grades.mean()),
+            "median": float(percentile_values[PERCENTILES.index(50)]),
+            "std": float(grades.std()),
+            "min": float(grades.min()),
+            "max": float(grades.max()),
+            "percentiles": {f"p{p}": float(value) for p, value in zip(PERCENTILES, percentile_values)},
+            "histogram": histogram,
+            "passing_grade": passing_grade,
+            "passed": passed,
+            "pass_rate": passed / count
+        }
+
+    @staticmethod
+    async def _cache_key(suffix: str) -> str:
+        generation = await cache.get(ANALYTICS_GENERATION_KEY) or 0
+        return f"{ANALYTICS_CACHE_PREFIX}:{generation}:{suffix}"
+
+    @staticmethod
+    async def invalidate() -> None:
+        """
+        Invalidate every cached grade statistic in O(1) by moving to a new
+        generation; entries of older generations expire with their TTL.
+        Cache errors are logged, not raised, as the grades are already written.
+        """
+        try:
+            await cache.incr(ANALYTICS_GENERATION_KEY)
+        except Exception:
+            logger.exception("Failed to invalidate the cached grade statistics")
@@ -1,32 +1,23 @@
 from typing import List, Optional, Dict, Any
 from ...DB.database import ASSESSMENTS_COLLECTION
 from ...models.assessments.assessment import Assessment, AssessmentCreate, AssessmentUpdate
-from ..base import BaseService
+from ..ordering import OrderedService
+from ..modules.assessment_mapping import AssessmentMappingService
 
-class AssessmentService(BaseService):
+class AssessmentService(OrderedService):
     def __init__(self):
-        super().__init__(ASSESSMENTS_COLLECTION)
+        super().__init__(ASSESSMENTS_COLLECTION, parent_field="module_id")
+        self.assessment_mapping = AssessmentMappingService()
     
     async def create_assessment(self, assessment: AssessmentCreate) -> Assessment:
-        """Create a new assessment."""
-        # Ensure the order is unique within the module
-        if await self.exists({"module_id": assessment.module_id, "order": assessment.order}):
-            # If order exists, shift all assessments with >= order up by 1
-            collection = await self.get_collection()
-            await collection.update_many(
-                {
-                    "module_id": assessment.module_id,
-                    "order": {"$gte": assessment.order}
-                },
-                {"$inc": {"order": 1}}
-            )
-        
-        assessment_dict = await self.create(assessment)
+        """Create a new assessment at the position given by its order."""
+        assessment_dict = await self.create_ordered(assessment)
+        await self.assessment_mapping.refresh_module(assessment.module_id)
         return Assessment.model_validate(assessment_dict)
     
     async def get_assessment(self, assessment_id: str) -> Optional[Assessment]:
         """Get an assessment by ID."""
-        assessment_dict = await self.get_by_id(assessment_id)
+        assessment_dict = await self.get_ordered(assessment_id)
         return Assessment.model_validate(assessment_dict) if assessment_dict else None
     
     async def list_assessments(
@@ -42,11 +33,10 @@ class AssessmentService(BaseService):
         if not include_archived:
             filter_query["status"] = {"$ne": "archived"}
             
-        assessments = await self.get_all(
+        assessments = await self.list_ordered(
+            filter_query,
             skip=skip,
-            limit=limit,
-            filter_query=filter_query,
-            sort=[("order", 1)]  # Sort by order ascending
+            limit=limit
         )
         return [Assessment.model_validate(assessment) for assessment in assessments]
     
@@ -55,50 +45,24 @@ class AssessmentService(BaseService):
         assessment_id: str,
         assessment_update: AssessmentUpdate
     ) -> Optional[Assessment]:
-        """Update an assessment."""
-        current_assessment = await self.get_assessment(assessment_id)
-        if not current_assessment:
+        """Update an assessment. Changing the order moves only this assessment."""
+        assessment_dict = await self.update_ordered(assessment_id, assessment_update)
+        if not assessment_dict:
             return None
-            
-        # If order is being updated, handle reordering
-        if assessment_update.order is not None and assessment_update.order != current_assessment.order:
-            collection = await self.get_collection()
-            if assessment_update.order > current_assessment.order:
-                # Moving down: decrease order of assessments in between
-                await collection.update_many(
-                    {
-                        "module_id": current_assessment.module_id,
-                        "order": {"$gt": current_assessment.order, "$lte": assessment_update.order}
-                    },
-                    {"$inc": {"order": -1}}
-                )
-            else:
-                # Moving up: increase order of assessments in between
-                await collection.update_many(
-                    {
-                        "module_id": current_assessment.module_id,
-                        "order": {"$gte": assessment_update.order, "$lt": current_assessment.order}
-                    },
-                    {"$inc": {"order": 1}}
-                )
-        
-        assessment_dict = await self.update(assessment_id, assessment_update)
-        return Assessment.model_validate(assessment_dict) if assessment_dict else None
+        if assessment_update.model_fields_set & {"title", "route", "order"}:
+            await self.assessment_mapping.refresh_assessment(assessment_dict)
+        return Assessment.model_validate(assessment_dict)
     
     async def delete_assessment(self, assessment_id: str) -> bool:
-        """Delete an assessment."""
-        current_assessment = await self.get_assessment(assessment_id)
-        if not current_assessment:
-            return False
-            
-        # Shift all assessments with higher order down by 1
-        collection = await self.get_collection()
-        await collection.update_many(
-            {
-                "module_id": current_assessment.module_id,
-                "order": {"$gt": current_assessment.order}
-            },
-            {"$inc": {"order": -1}}
-        )
-        
-        return await self.delete(assessment_id) 
\ No newline at end of file
+        """Delete an assessment. Siblings keep their ranks, so nothing is shifted."""
+        assessment_dict = await self.get_by_id(assessment_id)
+        deleted = await self.delete(assessment_id)
+        if deleted and assessment_dict:
+            await self.assessment_mapping.refresh_assessment(assessment_dict)
+        return deleted
+    
+    async def reorder_assessments(self, module_id: str, assessment_ids: List[str]) -> List[Assessment]:
+        """Apply a complete new assessment ordering for a module."""
+        assessments = await self.reorder(module_id, assessment_ids)
+        await self.assessment_mapping.refresh_module(module_id)
+        return [Assessment.model_validate(assessment) for assessment in assessments]
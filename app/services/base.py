@@ -1,4 +1,5 @@
-from typing import Any, Dict, List, Optional, Type, TypeVar, cast
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypeVar, cast
 from bson import ObjectId
 from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorCollection
@@ -35,37 +36,71 @@ class BaseService:
         result = await collection.find_one({"_id": ObjectId(id)})
         return result if result else None
     
+    async def get_one(
+        self,
+        filter_query: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get the first document matching a filter."""
+        collection = await self.get_collection()
+        return await collection.find_one(filter_query, projection)
+    
+    async def get_by_ids(
+        self,
+        ids: List[str],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get several documents by ID with a single `$in` query. Invalid IDs are skipped."""
+        object_ids = [ObjectId(id) for id in ids if ObjectId.is_valid(id)]
+        if not object_ids:
+            return []
+        collection = await self.get_collection()
+        return await collection.find({"_id": {"$in": object_ids}}, projection).to_list(length=None)
+    
     async def get_all(
         self,
         skip: int = 0,
         limit: int = 100,
-        filter_query: Optional[Dict[str, Any]] = None
+        filter_query: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None
     ) -> List[Dict[str, Any]]:
-        """Get all documents with pagination and filtering."""
+        """Get all documents with pagination, filtering and optional sorting."""
         collection = await self.get_collection()
-        cursor = collection.find(filter_query or {}).skip(skip).limit(limit)
+        cursor = collection.find(filter_query or {})
+        if sort:
+            cursor = cursor.sort(sort)
+        cursor = cursor.skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     
     async def update(
         self,
         id: str,
-        update_schema: UpdateSchemaType
+        update_schema: UpdateSchemaType,
+        exclude: Optional[Set[str]] = None,
+        extra_fields: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
-        """Update a document by its ID."""
+        """
+        Update a document by its ID, stamping ``updated_at``.
+
+        Fields in ``exclude`` are left out of the schema and ``extra_fields``
+        are written alongside it (for values the service derives itself).
+        """
         collection = await self.get_collection()
         if not ObjectId.is_valid(id):
             return None
             
-        update_data = update_schema.model_dump(exclude_unset=True)
+        update_data = update_schema.model_dump(exclude_unset=True, exclude=exclude)
+        update_data.update(extra_fields or {})
         if not update_data:
             return await self.get_by_id(id)
+        update_data["updated_at"] = datetime.utcnow()
             
         result = await collection.update_one(
             {"_id": ObjectId(id)},
             {"$set": update_data}
         )
         
-        if result.modified_count == 0:
+        if result.matched_count == 0:
             return None
             
         return await self.get_by_id(id)
@@ -0,0 +1,185 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+
+from ...core.cache import cache
+from ...core.config import settings
+from ...DB.database import COURSES_COLLECTION, ROADMAPS_COLLECTION
+from ...models.courses.course import Course
+from ...models.roadmaps.roadmap import Roadmap
+from ..base import BaseService
+from ..roadmaps.roadmap_search import RoadmapSearchService
+
+CATALOG_CACHE_PREFIX = "catalog"
+
+
+class CatalogService(BaseService, ABC):
+    """
+    Base service for faceted catalog searches.
+
+    A page of results, the total and the counts of every facet come from a
+    single `$facet` aggregation. Facet counts are disjunctive: the counts of
+    one facet apply every selected filter except its own, so the other
+    values of a selected facet keep their counts.
+
+    Results are newest first (by `_id`, which grows with creation time)
+    unless ranked by relevance. Pages without a search term are cached for CATALOG_CACHE_TTL seconds and
+    cleared on every write to the collection.
+    """
+
+    catalog_name: str = ""
+    facet_fields: Tuple[str, ...] = ()
+
+    async def search(
+        self,
+        filters: Dict[str, Optional[str]],
+        status: Optional[str] = "published",
+        search_term: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Search the catalog.
+
+        Args:
+            filters: Selected value per facet field (None when unselected)
+            status: Required status, None for any
+            search_term: Optional free text query; results are then ranked by relevance
+            skip: Number of results to skip
+            limit: Maximum number of results
+
+        Returns:
+            The page of `items`, the `total` number of matches and the
+            `facets` counts as lists of {"value", "count"}
+        """
+        selected = {
+            field: value
+            for field, value in filters.items()
+            if field in self.facet_fields and value is not None
+        }
+        params = {"filters": selected, "status": status, "skip": skip, "limit": limit}
+        cache_key = None
+        if not search_term:
+            digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+            cache_key = f"{CATALOG_CACHE_PREFIX}:{self.catalog_name}:{digest}"
+            cached_page = await cache.get(cache_key)
+            if cached_page is not None:
+                return cached_page
+
+        match: Dict[str, Any] = {}
+        if status:
+            match["status"] = status
+        pipeline: List[Dict[str, Any]] = [{"$match": match}]
+        sort: Dict[str, int] = {"_id": -1}
+        if search_term:
+            search_stages = await self._search_stages(search_term)
+            if search_stages is None:
+                return self._empty_page()
+            pipeline[0]["$match"].update(search_stages[0]["$match"])
+            pipeline += search_stages[1:]
+            sort = {"_relevance": -1, **sort}
+
+        facets: Dict[str, List[Dict[str, Any]]] = {
+            "items": [
+                {"$match": selected},
+                {"$sort": sort},
+                {"$skip": skip},
+                {"$limit": limit}
+            ],
+            "total": [{"$match": selected}, {"$count": "count"}]
+        }
+        for field in self.facet_fields:
+            others = {name: value for name, value in selected.items() if name != field}
+            facets[field] = [
+                {"$match": others},
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ]
+        pipeline.append({"$facet": facets})
+
+        collection = await self.get_collection()
+        result = (await collection.aggregate(pipeline).to_list(length=1))[0]
+
+        page = {
+            "items": [self._serialize(document) for document in result["items"]],
+            "total": result["total"][0]["count"] if result["total"] else 0,
+            "facets": {
+                field: [
+                    {"value": bucket["_id"], "count": bucket["count"]}
+                    for bucket in result[field]
+                    if bucket["_id"] is not None
+                ]
+                for field in self.facet_fields
+            }
+        }
+        if cache_key:
+            await cache.set(cache_key, page, ttl=settings.CATALOG_CACHE_TTL)
+        return page
+
+    async def invalidate(self) -> None:
+        """Drop every cached page of this catalog."""
+        await cache.clear_pattern(f"{CATALOG_CACHE_PREFIX}:{self.catalog_name}:*")
+
+    @abstractmethod
+    async def _search_stages(self, search_term: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Stages restricting the pipeline to the search matches: a `$match`
+        merged into the first stage, then stages setting a `_relevance` field.
+        Returns None when nothing can match.
+        """
+
+    @abstractmethod
+    def _serialize(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a catalog document into its API representation."""
+
+    def _empty_page(self) -> Dict[str, Any]:
+        return {"items": [], "total": 0, "facets": {field: [] for field in self.facet_fields}}
+
+
+class CourseCatalogService(CatalogService):
+    """Faceted course catalog (category, level, language)."""
+
+    catalog_name = "courses"
+    facet_fields = ("category", "level", "language")
+
+    def __init__(self):
+        super().__init__(COURSES_COLLECTION)
+
+    async def _search_stages(self, search_term: str) -> Optional[List[Dict[str, Any]]]:
+        # $text must sit in the first $match; relevance is the text score
+        return [
+            {"$match": {"$text": {"$search": search_term}}},
+            {"$addFields": {"_relevance": {"$meta": "textScore"}}}
+        ]
+
+    def _serialize(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        return Course.model_validate(document).model_dump(mode="json")
+
+
+class RoadmapCatalogService(CatalogService):
+    """Faceted roadmap catalog (category, difficulty)."""
+
+    catalog_name = "roadmaps"
+    facet_fields = ("category", "difficulty")
+
+    def __init__(self):
+        super().__init__(ROADMAPS_COLLECTION)
+        self.search_index = RoadmapSearchService()
+
+    async def _search_stages(self, search_term: str) -> Optional[List[Dict[str, Any]]]:
+        # Matches come ranked from the roadmap search index; relevance is
+        # the negated position in that ranking. Every match is kept so that
+        # the total and the facet counts are exact
+        roadmap_ids = await self.search_index.search(search_term, limit=None)
+        object_ids = [ObjectId(roadmap_id) for roadmap_id in roadmap_ids]
+        if not object_ids:
+            return None
+        return [
+            {"$match": {"_id": {"$in": object_ids}}},
+            {"$addFields": {"_relevance": {"$subtract": [0, {"$indexOfArray": [object_ids, "$_id"]}]}}}
+        ]
+
+    def _serialize(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        return Roadmap.model_validate(document).model_dump(mode="json")
@@ -1,15 +1,25 @@
 from typing import List, Optional, Dict, Any
+from bson import ObjectId
 from ...DB.database import COURSES_COLLECTION, MODULES_COLLECTION, LESSONS_COLLECTION
 from ...models.courses.course import Course, CourseCreate, CourseUpdate
 from ..base import BaseService
+from ..roadmaps.roadmap_service import RoadmapService
+from ..catalog.catalog_service import CourseCatalogService
+from ..modules.prerequisite_graph import PrerequisiteGraphService
+from ..search.suggest_service import SuggestService
 
 class CourseService(BaseService):
     def __init__(self):
         super().__init__(COURSES_COLLECTION)
+        self.catalog = CourseCatalogService()
+        self.suggestions = SuggestService()
+        self.prerequisite_graphs = PrerequisiteGraphService()
     
     async def create_course(self, course: CourseCreate) -> Course:
         """Create a new course."""
         course_dict = await self.create(course)
+        await self.catalog.invalidate()
+        self.suggestions.index_document("course", course_dict)
         return Course.model_validate(course_dict)
     
     async def get_course(self, course_id: str) -> Optional[Course]:
@@ -50,32 +60,44 @@ class CourseService(BaseService):
     async def update_course(self, course_id: str, course_update: CourseUpdate) -> Optional[Course]:
         """Update a course."""
         course_dict = await self.update(course_id, course_update)
+        if course_dict:
+            await RoadmapService().invalidate_course_details(course_id)
+            await self.catalog.invalidate()
+            self.suggestions.index_document("course", course_dict)
         return Course.model_validate(course_dict) if course_dict else None
     
     async def delete_course(self, course_id: str) -> bool:
         """Delete a course."""
-        return await self.delete(course_id)
+        deleted = await self.delete(course_id)
+        if deleted:
+            await RoadmapService().invalidate_course_details(course_id)
+            await self.catalog.invalidate()
+            await self.prerequisite_graphs.invalidate(course_id)
+            self.suggestions.remove_document("course", course_id)
+        return deleted
     
     async def add_module_to_course(self, course_id: str, module_id: str) -> Optional[Course]:
         """Add a module to a course's module list."""
         collection = await self.get_collection()
         result = await collection.update_one(
-            {"_id": course_id},
+            {"_id": ObjectId(course_id)},
             {"$addToSet": {"module_ids": module_id}}
         )
         if result.modified_count == 0:
             return None
+        await self.prerequisite_graphs.invalidate(course_id)
         return await self.get_course(course_id)
     
     async def remove_module_from_course(self, course_id: str, module_id: str) -> Optional[Course]:
         """Remove a module from a course's module list."""
         collection = await self.get_collection()
         result = await collection.update_one(
-            {"_id": course_id},
+            {"_id": ObjectId(course_id)},
             {"$pull": {"module_ids": module_id}}
         )
         if result.modified_count == 0:
             return None
+        await self.prerequisite_graphs.invalidate(course_id)
         return await self.get_course(course_id)
     
     async def update_course_metrics(
@@ -103,7 +125,7 @@ class CourseService(BaseService):
             
         collection = await self.get_collection()
         result = await collection.update_one(
-            {"_id": course_id},
+            {"_id": ObjectId(course_id)},
             {"$set": update_data}
         )
         
@@ -124,7 +146,7 @@ class CourseService(BaseService):
             modules_collection = await self.get_db_collection(MODULES_COLLECTION)
             modules_cursor = modules_collection.find(
                 {"course_id": str(course.id)},
-                sort=[("order", 1)]
+                sort=[("rank", 1)]
             )
             modules = await modules_cursor.to_list(length=None)
             
@@ -134,7 +156,7 @@ class CourseService(BaseService):
                 lessons_collection = await self.get_db_collection(LESSONS_COLLECTION)
                 lessons_cursor = lessons_collection.find(
                     {"module_id": str(module["_id"])},
-                    sort=[("order", 1)]
+                    sort=[("rank", 1)]
                 )
                 lessons = await lessons_cursor.to_list(length=None)
                 
@@ -1,35 +1,30 @@
 from typing import List, Optional, Dict, Any
 from ...DB.database import LESSONS_COLLECTION
 from ...models.lessons.lesson import Lesson, LessonCreate, LessonUpdate
-from ..base import BaseService
+from ..ordering import OrderedService
+from ..search.suggest_service import SuggestService
+from ..search.lesson_search_service import LessonSearchService
 from ...core.decorators import cached
+from ...core.cache import cache
 
-class LessonService(BaseService):
+class LessonService(OrderedService):
     def __init__(self):
-        super().__init__(LESSONS_COLLECTION)
+        super().__init__(LESSONS_COLLECTION, parent_field="module_id")
+        self.suggestions = SuggestService()
+        self.search_index = LessonSearchService()
     
     @cached("lesson", invalidate_patterns=["lesson:*", "module_lessons:*"])
     async def create_lesson(self, lesson: LessonCreate) -> Lesson:
-        """Create a new lesson."""
-        # Ensure the order is unique within the module
-        if await self.exists({"module_id": lesson.module_id, "order": lesson.order}):
-            # If order exists, shift all lessons with >= order up by 1
-            collection = await self.get_collection()
-            await collection.update_many(
-                {
-                    "module_id": lesson.module_id,
-                    "order": {"$gte": lesson.order}
-                },
-                {"$inc": {"order": 1}}
-            )
-        
-        lesson_dict = await self.create(lesson)
+        """Create a new lesson at the position given by its order."""
+        lesson_dict = await self.create_ordered(lesson)
+        self.suggestions.index_document("lesson", lesson_dict)
+        self.search_index.index_lesson(lesson_dict)
         return Lesson.model_validate(lesson_dict)
     
     @cached("lesson")
     async def get_lesson(self, lesson_id: str) -> Optional[Lesson]:
         """Get a lesson by ID."""
-        lesson_dict = await self.get_by_id(lesson_id)
+        lesson_dict = await self.get_ordered(lesson_id)
         return Lesson.model_validate(lesson_dict) if lesson_dict else None
     
     @cached("module_lessons")
@@ -46,64 +41,44 @@ class LessonService(BaseService):
         if not include_archived:
             filter_query["status"] = {"$ne": "archived"}
             
-        lessons = await self.get_all(
+        lessons = await self.list_ordered(
+            filter_query,
             skip=skip,
-            limit=limit,
-            filter_query=filter_query,
-            sort=[("order", 1)]  # Sort by order ascending
+            limit=limit
         )
         return [Lesson.model_validate(lesson) for lesson in lessons]
     
     @cached("lesson", invalidate_patterns=["lesson:*", "module_lessons:*"])
     async def update_lesson(self, lesson_id: str, lesson_update: LessonUpdate) -> Optional[Lesson]:
-        """Update a lesson."""
-        current_lesson = await self.get_lesson(lesson_id)
-        if not current_lesson:
-            return None
-            
-        # If order is being updated, handle reordering
-        if lesson_update.order is not None and lesson_update.order != current_lesson.order:
-            collection = await self.get_collection()
-            if lesson_update.order > current_lesson.order:
-                # Moving down: decrease order of lessons in between
-                await collection.update_many(
-                    {
-                        "module_id": current_lesson.module_id,
-                        "order": {"$gt": current_lesson.order, "$lte": lesson_update.order}
-                    },
-                    {"$inc": {"order": -1}}
-                )
-            else:
-                # Moving up: increase order of lessons in between
-                await collection.update_many(
-                    {
-                        "module_id": current_lesson.module_id,
-                        "order": {"$gte": lesson_update.order, "$lt": current_lesson.order}
-                    },
-                    {"$inc": {"order": 1}}
-                )
-        
-        lesson_dict = await self.update(lesson_id, lesson_update)
+        """Update a lesson. Changing the order moves only this lesson."""
+        lesson_dict = await self.update_ordered(lesson_id, lesson_update)
+        if lesson_dict:
+            self.suggestions.index_document("lesson", lesson_dict)
+            self.search_index.index_lesson(lesson_dict)
         return Lesson.model_validate(lesson_dict) if lesson_dict else None
     
     @cached("lesson", invalidate_patterns=["lesson:*", "module_lessons:*"])
     async def delete_lesson(self, lesson_id: str) -> bool:
-        """Delete a lesson."""
-        current_lesson = await self.get_lesson(lesson_id)
-        if not current_lesson:
-            return False
-            
-        # Shift all lessons with higher order down by 1
-        collection = await self.get_collection()
-        await collection.update_many(
-            {
-                "module_id": current_lesson.module_id,
-                "order": {"$gt": current_lesson.order}
-            },
-            {"$inc": {"order": -1}}
-        )
-        
-        return await self.delete(lesson_id)
+        """Delete a lesson. Siblings keep their ranks, so nothing is shifted."""
+        deleted = await self.delete(lesson_id)
+        if deleted:
+            self.suggestions.remove_document("lesson", lesson_id)
+            self.search_index.remove_lesson(lesson_id)
+        return deleted
+    
+    async def reorder_lessons(self, module_id: str, lesson_ids: List[str]) -> List[Lesson]:
+        """Apply a complete new lesson ordering for a module."""
+        lessons = await self.reorder(module_id, lesson_ids)
+        await cache.clear_pattern("lesson:*")
+        await cache.clear_pattern("module_lessons:*")
+        return [Lesson.model_validate(lesson) for lesson in lessons]
+    
+    def _sequence_fields(self, ordered_ids: List[str], index: int) -> Dict[str, Any]:
+        """Recompute next/previous lesson links in the same pass as the ranks."""
+        return {
+            "previous_lesson_id": ordered_ids[index - 1] if index > 0 else None,
+            "next_lesson_id": ordered_ids[index + 1] if index + 1 < len(ordered_ids) else None
+        }
     
     async def update_lesson_sequence(
         self,
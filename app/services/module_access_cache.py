@@ -0,0 +1,55 @@
+import logging
+from typing import Any, List, Optional, Tuple
+
+from ..core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+ACCESS_CACHE_PREFIX = "module_access"
+GENERATION_FIELD = "_generation"
+
+
+class ModuleAccessCache:
+    """
+    Cache of module-access decisions per student.
+
+    Decisions live in the Redis hash ``module_access:{email}``, one field
+    per course or check, next to a ``_generation`` counter that
+    GradesService bumps whenever one of the student's grades is written.
+    Entries carry the generation read before they were computed and the
+    version of the rules they were computed against (e.g. the prerequisite
+    graph version), and are ignored once either changes. A decision
+    computed while a grade was being written is therefore stored under the
+    old generation and never served, and every worker sees an invalidation
+    at once: there is no per-worker copy to go stale.
+    """
+
+    async def get(self, email: str, field: str, version: str = "") -> Tuple[Optional[Any], int]:
+        """
+        Get a cached decision computed against `version`, in one round-trip.
+
+        Returns:
+            The decision (None if missing or stale) and the student's current
+            generation, to be passed to set() with a freshly computed decision
+        """
+        generation, entry = await cache.hmget(f"{ACCESS_CACHE_PREFIX}:{email}", [GENERATION_FIELD, field])
+        generation = generation or 0
+        if entry is None or entry.get("version") != version or entry.get("generation") != generation:
+            return None, generation
+        return entry["value"], generation
+
+    async def set(self, email: str, field: str, value: Any, version: str, generation: int) -> None:
+        """Cache a decision computed against `version` from data read at `generation`."""
+        entry = {"version": version, "generation": generation, "value": value}
+        await cache.hset(f"{ACCESS_CACHE_PREFIX}:{email}", field, entry)
+
+    async def invalidate(self, emails: List[str]) -> None:
+        """
+        Retire every cached decision of these students by moving them to a
+        new generation. Errors are logged, not raised: the grades are
+        already written and stale entries expire with the hash TTL.
+        """
+        try:
+            await cache.hincr_many([f"{ACCESS_CACHE_PREFIX}:{email}" for email in emails], GENERATION_FIELD)
+        except Exception:
+            logger.exception("Could not invalidate module access for %d students", len(emails))
@@ -1,7 +1,17 @@
-from typing import List, Dict, Any, Optional
+import hashlib
+from typing import AsyncIterator, List, Dict, Any, Optional
+from ..core.config import settings
+from ..DB.database import get_database, STUDENT_GRADES_COLLECTION
 from .studentGrades import GradesService
+from .studentGradeSummaries import GradeSummaryService
 from .courses.course_service import CourseService
 from .modules.module_service import ModuleService
+from .modules.prerequisite_graph import PrerequisiteGraph
+from .modules.assessment_mapping import AssessmentMappingService
+from .module_access_cache import ModuleAccessCache
+
+# Students evaluated per grade summary read in bulk access checks
+ACCESS_BATCH_SIZE = 500
 
 class ModuleAccessService:
     """
@@ -10,138 +20,153 @@ class ModuleAccessService:
     
     def __init__(self):
         self.grades_service = GradesService()
+        self.grade_summaries = GradeSummaryService()
         self.course_service = CourseService()
         self.module_service = ModuleService()
+        self.assessment_mapping = AssessmentMappingService()
+        self.access_cache = ModuleAccessCache()
     
-    async def check_module_access(self, student_email: str, course_id: str, module_id: str) -> Dict[str, Any]:
+    async def check_module_access(
+        self,
+        student_email: str,
+        course_id: str,
+        module_id: str,
+        grades: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
         """
         Check if a student has access to a specific module based on prerequisites and grades.
         
+        Modules of the course's module list are answered from the student's
+        cached course decision, so repeated checks cost one cache read; other
+        modules, or calls passing `grades`, are evaluated on their own.
+        
         Args:
             student_email: Student's email address
             course_id: Course ID
             module_id: Module ID to check access for
+            grades: The student's grade summary, if already loaded
             
         Returns:
             Dict containing access status and reason
         """
         try:
-            # Get the module information
-            module = await self.module_service.get_module(module_id)
-            if not module:
-                return {
-                    "has_access": False,
-                    "reason": "Module not found",
-                    "required_grade": None,
-                    "current_grade": None
-                }
+            if grades is None:
+                course_access = await self.get_student_module_access_for_course(student_email, course_id)
+                module_access = course_access.get("module_access", {}).get(module_id)
+                if module_access is not None:
+                    return module_access
             
-            # Check if module has prerequisites
-            prerequisites = getattr(module, 'prerequisites', [])
+            await self.assessment_mapping.ensure_loaded()
             
-            # If no prerequisites, module is accessible
-            if not prerequisites:
-                return {
-                    "has_access": True,
-                    "reason": "No prerequisites required",
-                    "required_grade": None,
-                    "current_grade": None
-                }
+            # Get the module information
+            module = await self.module_service.get_by_id(module_id)
             
-            # Check each prerequisite
-            for prerequisite_module_id in prerequisites:
-                prerequisite_access = await self._check_prerequisite_completion(
-                    student_email, prerequisite_module_id
-                )
-                if not prerequisite_access["completed"]:
-                    return {
-                        "has_access": False,
-                        "reason": f"Prerequisite module {prerequisite_module_id} not completed",
-                        "required_grade": prerequisite_access["required_grade"],
-                        "current_grade": prerequisite_access["current_grade"],
-                        "prerequisite_module": prerequisite_module_id
-                    }
+            # One summary read covers every prerequisite
+            if grades is None and module and module.get("prerequisites"):
+                grades = await self.grade_summaries.get_summary(student_email)
+            
+            return self._evaluate_module_access(module, grades or {})
             
+        except Exception as e:
             return {
-                "has_access": True,
-                "reason": "All prerequisites completed",
+                "has_access": False,
+                "reason": f"Error checking access: {str(e)}",
                 "required_grade": None,
                 "current_grade": None
             }
-            
-        except Exception as e:
+    
+    def _evaluate_module_access(self, module: Optional[Dict[str, Any]], grades: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Evaluate access to a module in memory from its document and the
+        student's grade summary.
+        """
+        if not module:
             return {
                 "has_access": False,
-                "reason": f"Error checking access: {str(e)}",
+                "reason": "Module not found",
+                "required_grade": None,
+                "current_grade": None
+            }
+        
+        # Check if module has prerequisites
+        prerequisites = module.get("prerequisites") or []
+        
+        # If no prerequisites, module is accessible
+        if not prerequisites:
+            return {
+                "has_access": True,
+                "reason": "No prerequisites required",
                 "required_grade": None,
                 "current_grade": None
             }
+        
+        # Check each prerequisite
+        for prerequisite_module_id in prerequisites:
+            prerequisite_access = self._check_prerequisite_completion(
+                grades, prerequisite_module_id
+            )
+            if not prerequisite_access["completed"]:
+                return {
+                    "has_access": False,
+                    "reason": f"Prerequisite module {prerequisite_module_id} not completed",
+                    "required_grade": prerequisite_access["required_grade"],
+                    "current_grade": prerequisite_access["current_grade"],
+                    "prerequisite_module": prerequisite_module_id
+                }
+        
+        return {
+            "has_access": True,
+            "reason": "All prerequisites completed",
+            "required_grade": None,
+            "current_grade": None
+        }
     
-    async def _check_prerequisite_completion(self, student_email: str, module_id: str, passing_grade: float = 40.0) -> Dict[str, Any]:
+    def _check_prerequisite_completion(
+        self,
+        grades: Dict[str, float],
+        module_id: str,
+        passing_grade: float = settings.PASSING_GRADE
+    ) -> Dict[str, Any]:
         """
         Check if a student has completed a prerequisite module with a passing grade.
         
         Args:
-            student_email: Student's email address
+            grades: The student's grade per assessment (grade summary)
             module_id: Module ID to check completion for
-            passing_grade: Minimum grade required to pass (default: 40.0)
+            passing_grade: Minimum grade required to pass (default: settings.PASSING_GRADE)
             
         Returns:
             Dict containing completion status and grade information
         """
-        try:
-            # Get the student's grade for this module
-            # Note: We need to map module_id to the assessment name used in grades
-            # For now, we'll use a simple mapping based on your frontend structure
-            assessment_name = self._get_assessment_name_for_module(module_id)
-            
-            grade_record = self.grades_service.get_grades_by_token(student_email, assessment_name)
-            
-            if not grade_record:
-                return {
-                    "completed": False,
-                    "current_grade": None,
-                    "required_grade": passing_grade,
-                    "reason": "No grade found for prerequisite module"
-                }
-            
-            current_grade = grade_record.get("grade", 0.0)
-            
-            return {
-                "completed": current_grade >= passing_grade,
-                "current_grade": current_grade,
-                "required_grade": passing_grade,
-                "reason": f"Grade: {current_grade}/{passing_grade}"
-            }
-            
-        except Exception as e:
+        # A renamed gating assessment keeps passing under its earlier keys
+        recorded = [
+            grades[grade_key] for grade_key in self.assessment_mapping.grade_keys_for(module_id)
+            if grades.get(grade_key) is not None
+        ]
+        current_grade = max(recorded) if recorded else None
+        if current_grade is None:
             return {
                 "completed": False,
                 "current_grade": None,
                 "required_grade": passing_grade,
-                "reason": f"Error checking prerequisite: {str(e)}"
+                "reason": "No grade found for prerequisite module"
             }
-    
-    def _get_assessment_name_for_module(self, module_id: str) -> str:
-        """
-        Map module ID to assessment name used in the grades system.
-        This is a temporary mapping based on your current frontend structure.
-        """
-        # Based on your frontend, Assessment1 unlocks Module 2
-        module_assessment_mapping = {
-            "python-module1": "Assessment1",
-            "python-module2": "Assessment2",
-            "js-module1": "js-assessment1",
-            "js-module2": "js-advanced-assessment",
-            "java-module1": "java-assessment1",
-            "java-module2": "java-advanced-assessment"
-        }
         
-        return module_assessment_mapping.get(module_id, f"{module_id}-assessment")
+        return {
+            "completed": current_grade >= passing_grade,
+            "current_grade": current_grade,
+            "required_grade": passing_grade,
+            "reason": f"Grade: {current_grade}/{passing_grade}"
+        }
     
     async def get_student_module_access_for_course(self, student_email: str, course_id: str) -> Dict[str, Any]:
         """
         Get access status for all modules in a course for a specific student.
+        Uses the course's cached prerequisite graph and the student's grade
+        summary, then evaluates every module in memory.
+        
+        Results are cached per (student, course) until one of the student's
+        grades is written or the course's modules, graph or grade keys change.
         
         Args:
             student_email: Student's email address
@@ -151,27 +176,177 @@ class ModuleAccessService:
             Dict containing access status for each module
         """
         try:
-            # Get course with modules
-            course = await self.course_service.get_course(course_id)
-            if not course:
+            await self.assessment_mapping.ensure_loaded()
+            graph = await self.module_service.prerequisite_graphs.get_graph(course_id)
+            # The graph carries the course's module list, so the cached
+            # decision and its version always describe the same modules
+            if graph.course_module_ids is None:
                 return {"error": "Course not found"}
+            version = self._access_version(graph)
+            cached_access, generation = await self.access_cache.get(student_email, course_id, version)
+            if cached_access is not None:
+                return cached_access
             
-            module_access = {}
+            grades = await self.grade_summaries.get_summary(student_email)
             
             # For each module in the course
-            for module_id in getattr(course, 'module_ids', []):
-                access_info = await self.check_module_access(student_email, course_id, module_id)
-                module_access[module_id] = access_info
+            module_access = {
+                module_id: self._evaluate_graph_module(graph, module_id, grades)
+                for module_id in graph.course_module_ids
+            }
             
-            return {
+            result = {
                 "course_id": course_id,
                 "student_email": student_email,
                 "module_access": module_access
             }
+            await self.access_cache.set(student_email, course_id, result, version, generation)
+            return result
             
         except Exception as e:
             return {"error": f"Error getting module access: {str(e)}"}
     
+    async def stream_course_access_for_students(
+        self,
+        course_id: str,
+        emails: Optional[List[str]] = None,
+        grade_key: Optional[str] = None
+    ) -> Optional[AsyncIterator[Dict[str, Any]]]:
+        """
+        Evaluate module access of a course for many students.
+        
+        The course's prerequisite graph, which carries its module list, is
+        loaded once; grade summaries are read ACCESS_BATCH_SIZE students at a
+        time, so the number of queries grows with the batches, not with
+        students or modules.
+        
+        Args:
+            course_id: Course ID
+            emails: Students to evaluate. Defaults to the cohort given by
+                `grade_key`, or to every student graded in a module of the course
+            grade_key: Grade key selecting the cohort when no emails are given
+            
+        Returns:
+            Async iterator of one access row per student, or None if the
+            course does not exist
+        """
+        await self.assessment_mapping.ensure_loaded()
+        graph = await self.module_service.prerequisite_graphs.get_graph(course_id)
+        # The graph carries the course's module list; None means no course
+        if graph.course_module_ids is None:
+            return None
+        module_ids = graph.course_module_ids
+        
+        if emails is None:
+            grade_keys = [grade_key] if grade_key else [
+                key for module_id in module_ids for key in self.assessment_mapping.grade_keys_for(module_id)
+            ]
+            db = await get_database()
+            emails = sorted(await db[STUDENT_GRADES_COLLECTION].distinct(
+                "email", {"module": {"$in": grade_keys}}
+            ))
+        
+        return self._iter_course_access(course_id, graph, module_ids, list(dict.fromkeys(emails)))
+    
+    async def _iter_course_access(
+        self,
+        course_id: str,
+        graph: PrerequisiteGraph,
+        module_ids: List[str],
+        emails: List[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        for start in range(0, len(emails), ACCESS_BATCH_SIZE):
+            batch = emails[start:start + ACCESS_BATCH_SIZE]
+            summaries = await self.grade_summaries.get_summaries(batch)
+            for email in batch:
+                grades = summaries.get(email, {})
+                yield {
+                    "course_id": course_id,
+                    "student_email": email,
+                    "module_access": {
+                        module_id: self._evaluate_graph_module(graph, module_id, grades)
+                        for module_id in module_ids
+                    }
+                }
+    
+    async def get_next_unlocks(self, student_email: str, course_id: str) -> Dict[str, Any]:
+        """
+        Classify the modules of a course for a student, in prerequisite order:
+        completed (own assessment passed), available (accessible, not yet
+        completed) and next (locked, but every missing prerequisite is an
+        available module, so passing those unlocks it).
+        
+        Args:
+            student_email: Student's email address
+            course_id: Course ID
+            
+        Returns:
+            Dict with the completed, available and next module lists
+        """
+        await self.assessment_mapping.ensure_loaded()
+        graph = await self.module_service.prerequisite_graphs.get_graph(course_id)
+        grades = await self.grade_summaries.get_summary(student_email)
+        
+        completed, available, next_modules = [], [], []
+        available_ids = set()
+        for module_id in graph.order:
+            if self._check_prerequisite_completion(grades, module_id)["completed"]:
+                completed.append(module_id)
+                continue
+            missing = [
+                prerequisite_id for prerequisite_id in graph.prerequisites[module_id]
+                if not self._check_prerequisite_completion(grades, prerequisite_id)["completed"]
+            ]
+            if not missing:
+                available.append(module_id)
+                available_ids.add(module_id)
+            elif all(prerequisite_id in available_ids for prerequisite_id in missing):
+                # Topological order guarantees every prerequisite was classified already
+                next_modules.append({"module_id": module_id, "unlocked_by": missing})
+        
+        return {
+            "course_id": course_id,
+            "student_email": student_email,
+            "completed": completed,
+            "available": available,
+            "next": next_modules,
+            "cyclic": sorted(graph.cyclic)
+        }
+    
+    def _access_version(self, graph: PrerequisiteGraph) -> str:
+        """
+        Version of a course's access rules: its prerequisite graph (which
+        includes the course's module list) plus the grade keys of its
+        modules. Cached decisions from older rules are ignored.
+        """
+        module_ids = list(graph.module_order) + sorted(
+            {prerequisite_id for prerequisite_ids in graph.dangling.values() for prerequisite_id in prerequisite_ids}
+            | set(graph.course_module_ids or []) - set(graph.module_order)
+        )
+        grade_keys = "|".join(
+            ",".join(self.assessment_mapping.grade_keys_for(module_id)) for module_id in module_ids
+        )
+        keys_digest = hashlib.sha1(grade_keys.encode("utf-8")).hexdigest()[:16]
+        return f"{graph.version}:{keys_digest}:{settings.PASSING_GRADE}"
+    
+    def _evaluate_graph_module(
+        self,
+        graph: PrerequisiteGraph,
+        module_id: str,
+        grades: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """Evaluate access to a module of a compiled course graph."""
+        if module_id in graph.cyclic:
+            return {
+                "has_access": False,
+                "reason": "Prerequisite cycle detected",
+                "required_grade": None,
+                "current_grade": None
+            }
+        prerequisites = graph.prerequisites.get(module_id)
+        module = {"prerequisites": prerequisites} if prerequisites is not None else None
+        return self._evaluate_module_access(module, grades)
+    
     async def check_python_module2_access(self, student_email: str) -> bool:
         """
         Specific check for Python Module 2 access based on Assessment1 grade.
@@ -184,13 +359,17 @@ class ModuleAccessService:
             Boolean indicating if Module 2 should be unlocked
         """
         try:
-            grade_record = self.grades_service.get_grades_by_token(student_email, "Assessment1")
+            version = str(settings.PASSING_GRADE)
+            cached_access, generation = await self.access_cache.get(student_email, "python-module2", version)
+            if cached_access is not None:
+                return cached_access
             
-            if not grade_record:
-                return False
+            grade_record = await self.grades_service.get_grades_by_email(student_email, "Assessment1")
             
-            current_grade = grade_record.get("grade", 0.0)
-            return current_grade >= 40.0
+            current_grade = grade_record.get("grade", 0.0) if grade_record else None
+            has_access = current_grade is not None and current_grade >= settings.PASSING_GRADE
+            await self.access_cache.set(student_email, "python-module2", has_access, version, generation)
+            return has_access
             
         except Exception:
             return False 
\ No newline at end of file
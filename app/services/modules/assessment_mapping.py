@@ -0,0 +1,147 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from ...DB.database import get_database, ASSESSMENTS_COLLECTION, MODULES_COLLECTION, MODULE_GRADE_KEYS_COLLECTION
+from ..base import BaseService
+
+# Mapping used before it was stored as data. Seeded into the collection so
+# the existing frontend modules keep their grade keys.
+LEGACY_GRADE_KEYS = {
+    "python-module1": "Assessment1",
+    "python-module2": "Assessment2",
+    "js-module1": "js-assessment1",
+    "js-module2": "js-advanced-assessment",
+    "java-module1": "java-assessment1",
+    "java-module2": "java-advanced-assessment"
+}
+
+# Seconds before a worker reloads the mapping written by other workers
+MAPPING_REFRESH_SECONDS = 60
+
+# In-memory copy shared by every service instance of this worker:
+# module ID -> grade keys, current key first
+_grade_keys: Dict[str, List[str]] = {}
+_loaded_at: Optional[float] = None
+
+
+def assessment_grade_key(assessment: Dict[str, Any]) -> str:
+    """The key under which grades for an assessment are recorded (its route, else its title)."""
+    return (assessment.get("route") or assessment.get("title") or "").strip()
+
+
+class AssessmentMappingService(BaseService):
+    """
+    Service for the module → grade key mapping used by access checks.
+
+    A module is passed when a grade recorded under its gating assessment's
+    keys reaches the passing grade. The gate is the last, by rank, of the
+    assessments listed in the module's `assessment_ids`, identified by its
+    ID: when that assessment's route or title changes, its previous keys
+    stay valid, so students who already passed keep their access.
+
+    The mapping is stored in `module_grade_keys` (`_id` is the module ID,
+    indexed by grade key), recomputed on assessment and module writes and
+    held in memory, so resolving a key never queries the database.
+    """
+
+    def __init__(self):
+        super().__init__(MODULE_GRADE_KEYS_COLLECTION)
+
+    def grade_key_for(self, module_id: str) -> str:
+        """Resolve the current grade key of a module from memory."""
+        return self.grade_keys_for(module_id)[0]
+
+    def grade_keys_for(self, module_id: str) -> List[str]:
+        """Every grade key that passes a module (current key first), from memory."""
+        return _grade_keys.get(module_id) or [f"{module_id}-assessment"]
+
+    def modules_for_grade_key(self, grade_key: str) -> List[str]:
+        """Modules gated by a grade key, resolved from memory."""
+        return [module_id for module_id, keys in _grade_keys.items() if grade_key in keys]
+
+    async def ensure_loaded(self) -> None:
+        """Load the mapping if this worker has none or it is older than MAPPING_REFRESH_SECONDS."""
+        if _loaded_at is None or time.monotonic() - _loaded_at > MAPPING_REFRESH_SECONDS:
+            await self.reload()
+
+    async def reload(self) -> None:
+        """Replace the in-memory mapping with the stored one."""
+        global _loaded_at
+        collection = await self.get_collection()
+        documents = await collection.find({}, {"grade_key": 1, "grade_keys": 1}).to_list(length=None)
+        _grade_keys.clear()
+        _grade_keys.update({document["_id"]: self._keys(document) for document in documents})
+        _loaded_at = time.monotonic()
+
+    async def refresh_module(self, module_id: str) -> Optional[str]:
+        """
+        Recompute a module's gate from its `assessment_ids` and store it.
+        Returns the current grade key, or None if no listed assessment is left
+        (legacy modules then fall back to their seeded key).
+        """
+        db = await get_database()
+        collection = await self.get_collection()
+        module = None
+        if ObjectId.is_valid(module_id):
+            module = await db[MODULES_COLLECTION].find_one(
+                {"_id": ObjectId(module_id)},
+                {"assessment_ids": 1, "course_id": 1}
+            )
+        assessment_ids = [
+            ObjectId(assessment_id) for assessment_id in (module or {}).get("assessment_ids") or []
+            if ObjectId.is_valid(assessment_id)
+        ]
+        gate = await db[ASSESSMENTS_COLLECTION].find(
+            {"_id": {"$in": assessment_ids}},
+            {"title": 1, "route": 1}
+        ).sort("rank", -1).limit(1).to_list(1) if assessment_ids else []
+        grade_key = assessment_grade_key(gate[0]) if gate else ""
+
+        if not grade_key:
+            if module_id in LEGACY_GRADE_KEYS:
+                document = {"grade_key": LEGACY_GRADE_KEYS[module_id], "source": "legacy"}
+                await collection.replace_one({"_id": module_id}, document, upsert=True)
+                _grade_keys[module_id] = self._keys(document)
+            else:
+                await collection.delete_one({"_id": module_id})
+                _grade_keys.pop(module_id, None)
+            return None
+
+        assessment_id = str(gate[0]["_id"])
+        current = await collection.find_one({"_id": module_id}) or {}
+        grade_keys = [grade_key]
+        if current.get("assessment_id") == assessment_id:
+            # Same gate renamed: earlier keys keep passing it
+            grade_keys += [key for key in self._keys(current) if key != grade_key]
+        document = {
+            "grade_key": grade_key,
+            "grade_keys": grade_keys,
+            "assessment_id": assessment_id,
+            "course_id": module.get("course_id"),
+            "source": "assessment"
+        }
+        await collection.replace_one({"_id": module_id}, document, upsert=True)
+        _grade_keys[module_id] = grade_keys
+        return grade_key
+
+    async def refresh_assessment(self, assessment: Dict[str, Any]) -> None:
+        """Recompute the gate of every module listing an assessment."""
+        db = await get_database()
+        modules = await db[MODULES_COLLECTION].find(
+            {"assessment_ids": str(assessment["_id"])},
+            {"_id": 1}
+        ).to_list(length=None)
+        for module in modules:
+            await self.refresh_module(str(module["_id"]))
+
+    async def remove_module(self, module_id: str) -> None:
+        """Forget a deleted module."""
+        collection = await self.get_collection()
+        await collection.delete_one({"_id": module_id})
+        _grade_keys.pop(module_id, None)
+
+    @staticmethod
+    def _keys(document: Dict[str, Any]) -> List[str]:
+        return list(document.get("grade_keys") or [document["grade_key"]])
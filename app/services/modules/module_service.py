@@ -1,32 +1,31 @@
 from typing import List, Optional, Dict, Any
+from bson import ObjectId
 from ...DB.database import MODULES_COLLECTION
 from ...models.modules.module import Module, ModuleCreate, ModuleUpdate
-from ..base import BaseService
+from ..ordering import OrderedService
+from .prerequisite_graph import PrerequisiteGraphService
+from .assessment_mapping import AssessmentMappingService
+from ..search.suggest_service import SuggestService
+from ..progress.course_structure import CourseStructureService
 
-class ModuleService(BaseService):
+class ModuleService(OrderedService):
     def __init__(self):
-        super().__init__(MODULES_COLLECTION)
+        super().__init__(MODULES_COLLECTION, parent_field="course_id")
+        self.prerequisite_graphs = PrerequisiteGraphService()
+        self.assessment_mapping = AssessmentMappingService()
+        self.suggestions = SuggestService()
     
     async def create_module(self, module: ModuleCreate) -> Module:
-        """Create a new module."""
-        # Ensure the order is unique within the course
-        if await self.exists({"course_id": module.course_id, "order": module.order}):
-            # If order exists, shift all modules with >= order up by 1
-            collection = await self.get_collection()
-            await collection.update_many(
-                {
-                    "course_id": module.course_id,
-                    "order": {"$gte": module.order}
-                },
-                {"$inc": {"order": 1}}
-            )
-        
-        module_dict = await self.create(module)
+        """Create a new module at the position given by its order."""
+        module_dict = await self.create_ordered(module)
+        await self.prerequisite_graphs.invalidate(module.course_id)
+        CourseStructureService.invalidate(module.course_id)
+        self.suggestions.index_document("module", module_dict)
         return Module.model_validate(module_dict)
     
     async def get_module(self, module_id: str) -> Optional[Module]:
         """Get a module by ID."""
-        module_dict = await self.get_by_id(module_id)
+        module_dict = await self.get_ordered(module_id)
         return Module.model_validate(module_dict) if module_dict else None
     
     async def list_modules(
@@ -42,105 +41,105 @@ class ModuleService(BaseService):
         if not include_archived:
             filter_query["status"] = {"$ne": "archived"}
             
-        modules = await self.get_all(
+        modules = await self.list_ordered(
+            filter_query,
             skip=skip,
-            limit=limit,
-            filter_query=filter_query
+            limit=limit
         )
         return [Module.model_validate(module) for module in modules]
     
     async def update_module(self, module_id: str, module_update: ModuleUpdate) -> Optional[Module]:
-        """Update a module."""
-        current_module = await self.get_module(module_id)
-        if not current_module:
+        """
+        Update a module. Changing the order moves only this module.
+        New prerequisites are applied to the course's cached prerequisite graph.
+        """
+        module_dict = await self.update_ordered(module_id, module_update)
+        if not module_dict:
             return None
-            
-        # If order is being updated, handle reordering
-        if module_update.order is not None and module_update.order != current_module.order:
-            collection = await self.get_collection()
-            if module_update.order > current_module.order:
-                # Moving down: decrease order of modules in between
-                await collection.update_many(
-                    {
-                        "course_id": current_module.course_id,
-                        "order": {"$gt": current_module.order, "$lte": module_update.order}
-                    },
-                    {"$inc": {"order": -1}}
-                )
-            else:
-                # Moving up: increase order of modules in between
-                await collection.update_many(
-                    {
-                        "course_id": current_module.course_id,
-                        "order": {"$gte": module_update.order, "$lt": current_module.order}
-                    },
-                    {"$inc": {"order": 1}}
-                )
         
-        module_dict = await self.update(module_id, module_update)
-        return Module.model_validate(module_dict) if module_dict else None
+        if module_update.order is not None:
+            await self.prerequisite_graphs.invalidate(module_dict["course_id"])
+        elif module_update.prerequisites is not None:
+            await self.prerequisite_graphs.update_module_prerequisites(
+                module_dict["course_id"], module_id, module_update.prerequisites
+            )
+        self.suggestions.index_document("module", module_dict)
+        return Module.model_validate(module_dict)
     
     async def delete_module(self, module_id: str) -> bool:
-        """Delete a module."""
-        current_module = await self.get_module(module_id)
-        if not current_module:
-            return False
-            
-        # Shift all modules with higher order down by 1
-        collection = await self.get_collection()
-        await collection.update_many(
-            {
-                "course_id": current_module.course_id,
-                "order": {"$gt": current_module.order}
-            },
-            {"$inc": {"order": -1}}
-        )
-        
-        return await self.delete(module_id)
+        """Delete a module. Siblings keep their ranks, so nothing is shifted."""
+        module_dict = await self.get_by_id(module_id)
+        deleted = await self.delete(module_id)
+        if deleted and module_dict:
+            await self.prerequisite_graphs.invalidate(module_dict["course_id"])
+            await self.assessment_mapping.remove_module(module_id)
+            CourseStructureService.invalidate(module_dict["course_id"])
+            self.suggestions.remove_document("module", module_id)
+        return deleted
+    
+    async def reorder_modules(self, course_id: str, module_ids: List[str]) -> List[Module]:
+        """Apply a complete new module ordering for a course."""
+        modules = await self.reorder(course_id, module_ids)
+        await self.prerequisite_graphs.invalidate(course_id)
+        return [Module.model_validate(module) for module in modules]
     
     async def add_lesson_to_module(self, module_id: str, lesson_id: str) -> Optional[Module]:
         """Add a lesson to a module's lesson list."""
         collection = await self.get_collection()
         result = await collection.update_one(
-            {"_id": module_id},
+            {"_id": ObjectId(module_id)},
             {"$addToSet": {"lesson_ids": lesson_id}}
         )
         if result.modified_count == 0:
             return None
-        return await self.get_module(module_id)
+        module = await self.get_module(module_id)
+        if module:
+            CourseStructureService.invalidate(module.course_id)
+        return module
     
     async def add_assessment_to_module(self, module_id: str, assessment_id: str) -> Optional[Module]:
         """Add an assessment to a module's assessment list."""
         collection = await self.get_collection()
         result = await collection.update_one(
-            {"_id": module_id},
+            {"_id": ObjectId(module_id)},
             {"$addToSet": {"assessment_ids": assessment_id}}
         )
         if result.modified_count == 0:
             return None
-        return await self.get_module(module_id)
+        await self.assessment_mapping.refresh_module(module_id)
+        module = await self.get_module(module_id)
+        if module:
+            CourseStructureService.invalidate(module.course_id)
+        return module
     
     async def remove_lesson_from_module(self, module_id: str, lesson_id: str) -> Optional[Module]:
         """Remove a lesson from a module's lesson list."""
         collection = await self.get_collection()
         result = await collection.update_one(
-            {"_id": module_id},
+            {"_id": ObjectId(module_id)},
             {"$pull": {"lesson_ids": lesson_id}}
         )
         if result.modified_count == 0:
             return None
-        return await self.get_module(module_id)
+        module = await self.get_module(module_id)
+        if module:
+            CourseStructureService.invalidate(module.course_id)
+        return module
     
     async def remove_assessment_from_module(self, module_id: str, assessment_id: str) -> Optional[Module]:
         """Remove an assessment from a module's assessment list."""
         collection = await self.get_collection()
         result = await collection.update_one(
-            {"_id": module_id},
+            {"_id": ObjectId(module_id)},
             {"$pull": {"assessment_ids": assessment_id}}
         )
         if result.modified_count == 0:
             return None
-        return await self.get_module(module_id)
+        await self.assessment_mapping.refresh_module(module_id)
+        module = await self.get_module(module_id)
+        if module:
+            CourseStructureService.invalidate(module.course_id)
+        return module
     
     async def update_module_completion(
         self,
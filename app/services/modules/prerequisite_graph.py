@@ -0,0 +1,224 @@
+import hashlib
+import heapq
+import json
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from bson import ObjectId
+
+from ...core.cache import cache
+from ...core.local_cache import LocalCache
+from ...DB.database import COURSES_COLLECTION, MODULES_COLLECTION, get_database
+from ..base import BaseService
+
+GRAPH_CACHE_PREFIX = "prerequisite_graph"
+
+# Compiled graphs shared by every service instance of this worker
+_compiled_graphs = LocalCache(maxsize=512, ttl=60)
+
+
+class PrerequisiteGraph:
+    """
+    Compiled prerequisite DAG of the modules of one course.
+
+    Built from each module's ``prerequisites`` list (edges point from a
+    prerequisite to the module requiring it). Compilation computes:
+
+    - ``order``: topological order, ties broken by module rank
+    - ``ancestors``: transitive closure of every module's prerequisites
+    - ``dependents``: modules directly requiring each module
+    - ``cyclic``: modules on or behind a prerequisite cycle
+    - ``dangling``: prerequisite IDs that are not modules of the course
+    - ``version``: digest of the source data, changing with any edit
+
+    ``course_module_ids`` is the course's own module list (None if the
+    course does not exist), part of the source data so that adding or
+    removing a module changes the version.
+    """
+
+    def __init__(
+        self,
+        course_id: str,
+        prerequisites: Dict[str, List[str]],
+        module_order: List[str],
+        course_module_ids: Optional[List[str]] = None,
+        previous: Optional["PrerequisiteGraph"] = None,
+        changed: Optional[str] = None
+    ):
+        self.course_id = course_id
+        self.prerequisites = prerequisites
+        self.module_order = module_order
+        self.course_module_ids = course_module_ids
+        self._compile(previous, changed)
+
+    def _compile(self, previous: Optional["PrerequisiteGraph"], changed: Optional[str]) -> None:
+        """
+        Compile the graph. Given the `previous` graph and the one module
+        whose prerequisites `changed`, only the closures of that module and
+        of the modules depending on it are recomputed; the order, cycle and
+        dangling checks are linear passes.
+        """
+        self.version = hashlib.sha1(
+            json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        position = {module_id: index for index, module_id in enumerate(self.module_order)}
+        self.dependents: Dict[str, List[str]] = {module_id: [] for module_id in self.prerequisites}
+        self.dangling: Dict[str, List[str]] = {}
+        in_degree = {module_id: 0 for module_id in self.prerequisites}
+
+        for module_id, prerequisites in self.prerequisites.items():
+            for prerequisite_id in prerequisites:
+                if prerequisite_id in self.prerequisites:
+                    self.dependents[prerequisite_id].append(module_id)
+                    in_degree[module_id] += 1
+                else:
+                    self.dangling.setdefault(module_id, []).append(prerequisite_id)
+
+        # Kahn's algorithm; the heap keeps modules in course order when free to
+        ready = [(position.get(module_id, len(position)), module_id) for module_id, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        self.order: List[str] = []
+        while ready:
+            _, module_id = heapq.heappop(ready)
+            self.order.append(module_id)
+            for dependent_id in self.dependents[module_id]:
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    heapq.heappush(ready, (position.get(dependent_id, len(position)), dependent_id))
+
+        # Whatever Kahn could not release is on a cycle or depends on one
+        self.cyclic: Set[str] = {module_id for module_id, degree in in_degree.items() if degree > 0}
+
+        stale: Optional[Set[str]] = None
+        if previous is not None and changed is not None:
+            stale = self._reachable(changed, self.dependents) | self._reachable(changed, previous.dependents)
+
+        self.ancestors: Dict[str, Set[str]] = {}
+        for module_id in self.order:
+            if stale is not None and module_id not in stale and module_id in previous.ancestors:
+                self.ancestors[module_id] = previous.ancestors[module_id]
+                continue
+            closure: Set[str] = set()
+            for prerequisite_id in self.prerequisites[module_id]:
+                closure.add(prerequisite_id)
+                closure |= self.ancestors.get(prerequisite_id, set())
+            self.ancestors[module_id] = closure
+
+    @staticmethod
+    def _reachable(start: str, edges: Dict[str, Iterable[str]]) -> Set[str]:
+        """`start` and every module reachable from it through `edges`."""
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for next_id in edges.get(queue.popleft(), ()):
+                if next_id not in seen:
+                    seen.add(next_id)
+                    queue.append(next_id)
+        return seen
+
+    @property
+    def has_cycle(self) -> bool:
+        return bool(self.cyclic)
+
+    def with_prerequisites(self, module_id: str, prerequisites: List[str]) -> "PrerequisiteGraph":
+        """
+        Return the graph with new prerequisites for one module, reusing the
+        closures of every module that does not depend on it.
+        """
+        updated = dict(self.prerequisites)
+        updated[module_id] = list(prerequisites)
+        module_order = self.module_order if module_id in self.module_order else self.module_order + [module_id]
+        return PrerequisiteGraph(
+            self.course_id, updated, module_order, self.course_module_ids, previous=self, changed=module_id
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable source data; compiled fields are rebuilt on load."""
+        return {
+            "course_id": self.course_id,
+            "prerequisites": self.prerequisites,
+            "module_order": self.module_order,
+            "course_module_ids": self.course_module_ids
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PrerequisiteGraph":
+        return cls(data["course_id"], data["prerequisites"], data["module_order"], data.get("course_module_ids"))
+
+    def summary(self) -> Dict[str, Any]:
+        """Describe the compiled graph for API responses."""
+        return {
+            "course_id": self.course_id,
+            "version": self.version,
+            "order": self.order,
+            "prerequisites": self.prerequisites,
+            "ancestors": {module_id: sorted(ancestors) for module_id, ancestors in self.ancestors.items()},
+            "cyclic": sorted(self.cyclic),
+            "dangling": self.dangling
+        }
+
+
+class PrerequisiteGraphService(BaseService):
+    """
+    Service building and caching the compiled prerequisite graph of a course.
+
+    Graphs are compiled once per worker and kept in an in-process cache, with
+    their source data in Redis so other workers skip the module query.
+    Redis copies are keyed by a per-course generation that every change
+    bumps, so a change never rewrites a shared copy (no read-modify-write
+    across workers) and a copy built from data read before the change is
+    never served after it. The changing worker updates its own compiled
+    graph incrementally.
+    """
+
+    def __init__(self):
+        super().__init__(MODULES_COLLECTION)
+
+    async def get_graph(self, course_id: str) -> PrerequisiteGraph:
+        """Get the compiled graph of a course."""
+        graph = _compiled_graphs.get(course_id)
+        if graph is not None:
+            return graph
+
+        generation = await cache.get(f"{GRAPH_CACHE_PREFIX}:{course_id}:generation") or 0
+        cache_key = f"{GRAPH_CACHE_PREFIX}:{course_id}:{generation}"
+        data = await cache.get(cache_key)
+        if data is not None:
+            graph = PrerequisiteGraph.from_dict(data)
+        else:
+            graph = await self._build(course_id)
+            await cache.set(cache_key, graph.to_dict())
+
+        _compiled_graphs.set(course_id, graph)
+        return graph
+
+    async def update_module_prerequisites(self, course_id: str, module_id: str, prerequisites: List[str]) -> None:
+        """
+        Apply a module's new prerequisites to this worker's compiled graph
+        without reloading the course, and retire the shared copy.
+        """
+        graph = _compiled_graphs.get(course_id)
+        if graph is not None:
+            # Keeps the entry's expiry, so a graph another worker has since
+            # changed is still reloaded within the local TTL
+            _compiled_graphs.replace(course_id, graph.with_prerequisites(module_id, prerequisites))
+        await cache.incr(f"{GRAPH_CACHE_PREFIX}:{course_id}:generation")
+
+    async def invalidate(self, course_id: str) -> None:
+        """Drop the cached graph of a course (modules added, removed or reordered, or course deleted)."""
+        _compiled_graphs.delete(course_id)
+        await cache.incr(f"{GRAPH_CACHE_PREFIX}:{course_id}:generation")
+
+    async def _build(self, course_id: str) -> PrerequisiteGraph:
+        collection = await self.get_collection()
+        modules = await collection.find(
+            {"course_id": course_id},
+            {"prerequisites": 1}
+        ).sort("rank", 1).to_list(length=None)
+        prerequisites = {str(module["_id"]): list(module.get("prerequisites") or []) for module in modules}
+        course = None
+        if ObjectId.is_valid(course_id):
+            db = await get_database()
+            course = await db[COURSES_COLLECTION].find_one({"_id": ObjectId(course_id)}, {"module_ids": 1})
+        course_module_ids = list(course.get("module_ids") or []) if course else None
+        return PrerequisiteGraph(course_id, prerequisites, list(prerequisites), course_module_ids)
@@ -0,0 +1,271 @@
+import bisect
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from pydantic import BaseModel
+
+from .base import BaseService
+
+# Distance between consecutive ranks after a rebalance. Inserting between two
+# siblings takes the midpoint, so about log2(RANK_GAP) inserts can land in the
+# same gap before the parent has to be rebalanced.
+RANK_GAP = 1024
+
+# Attempts at allocating a rank before giving up (covers a rebalance and a
+# concurrent writer taking the same rank).
+MAX_RANK_ATTEMPTS = 3
+
+
+class OrderedService(BaseService):
+    """
+    Base service for documents ordered among their siblings (modules in a
+    course, lessons and assessments in a module).
+
+    Documents store a sparse integer ``rank``; inserting or moving a document
+    writes only that document. The dense 1-based ``order`` exposed by the API
+    is derived from the rank when reading.
+    """
+
+    parent_field: str = ""
+
+    def __init__(self, collection_name: str, parent_field: str):
+        super().__init__(collection_name)
+        self.parent_field = parent_field
+
+    async def create_ordered(self, create_schema: BaseModel) -> Dict[str, Any]:
+        """Insert a document at the position given by its ``order`` field."""
+        collection = await self.get_collection()
+        data = create_schema.model_dump(exclude_unset=True, exclude={"order"})
+        parent_id = data[self.parent_field]
+        position = getattr(create_schema, "order", None)
+
+        for _ in range(MAX_RANK_ATTEMPTS):
+            data["rank"] = await self.rank_for_position(parent_id, position)
+            try:
+                result = await collection.insert_one(dict(data))
+                break
+            except DuplicateKeyError:
+                # A concurrent insert took the same rank; pick a new one
+                continue
+        else:
+            raise ValueError("Failed to allocate a position")
+
+        created = await self.get_ordered(str(result.inserted_id))
+        if not created:
+            raise ValueError("Failed to create document")
+        return created
+
+    async def get_ordered(self, id: str) -> Optional[Dict[str, Any]]:
+        """Get a document by ID with its dense ``order``."""
+        document = await self.get_by_id(id)
+        if not document:
+            return None
+        document["order"] = await self.dense_order(document)
+        return document
+
+    async def list_ordered(
+        self,
+        filter_query: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        List siblings sorted by rank with their dense ``order``.
+
+        ``order`` counts every sibling of the parent, as dense_order does, so
+        a filtered listing (e.g. without archived documents) shows the same
+        position as reading the document alone.
+        """
+        documents = await self.get_all(
+            skip=skip,
+            limit=limit,
+            filter_query=filter_query,
+            sort=[("rank", 1)]
+        )
+        if documents:
+            collection = await self.get_collection()
+            siblings = await collection.find(
+                {self.parent_field: documents[0][self.parent_field]},
+                {"rank": 1, "_id": 0}
+            ).to_list(length=None)
+            ranks = sorted(sibling.get("rank", 0) for sibling in siblings)
+            for document in documents:
+                document["order"] = bisect.bisect_left(ranks, document.get("rank", 0)) + 1
+        return documents
+
+    async def update_ordered(
+        self,
+        id: str,
+        update_schema: BaseModel
+    ) -> Optional[Dict[str, Any]]:
+        """Update a document, moving it if ``order`` changes."""
+        current = await self.get_by_id(id)
+        if not current:
+            return None
+
+        position = getattr(update_schema, "order", None)
+        if position is None or position == await self.dense_order(current):
+            updated = await self.update(id, update_schema, exclude={"order"})
+        else:
+            for _ in range(MAX_RANK_ATTEMPTS):
+                rank = await self.rank_for_position(
+                    current[self.parent_field], position, exclude_id=current["_id"]
+                )
+                try:
+                    updated = await self.update(id, update_schema, exclude={"order"}, extra_fields={"rank": rank})
+                    break
+                except DuplicateKeyError:
+                    # A concurrent write took the same rank; pick a new one
+                    continue
+            else:
+                raise ValueError("Failed to allocate a position")
+
+        if not updated:
+            return None
+        updated["order"] = await self.dense_order(updated)
+        return updated
+
+    async def reorder(self, parent_id: str, ordered_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Apply a complete new ordering of the children of ``parent_id`` in a
+        single ordered bulk_write and return them in their new sequence.
+
+        Ranks are renumbered from RANK_GAP. The write is not transactional:
+        if it fails partway the parent can be left in a mixed order, but the
+        final ranks depend only on ``ordered_ids``, so retrying the same
+        reorder completes it.
+
+        Raises:
+            ValueError: If ``ordered_ids`` is not exactly the set of children
+        """
+        collection = await self.get_collection()
+        siblings = await collection.find({self.parent_field: parent_id}).to_list(length=None)
+        by_id = {str(sibling["_id"]): sibling for sibling in siblings}
+
+        if len(ordered_ids) != len(set(ordered_ids)):
+            raise ValueError("The new ordering contains duplicate IDs")
+        if set(ordered_ids) != set(by_id):
+            raise ValueError("The new ordering must list every item of the parent exactly once")
+
+        # Every item first moves to a temporary rank below both the current
+        # ranks and the final ones, so no write collides with a rank still
+        # held by a sibling that has not been moved yet
+        lowest = min([sibling.get("rank", 0) for sibling in siblings] + [0])
+        operations = [
+            UpdateOne({"_id": by_id[document_id]["_id"]}, {"$set": {"rank": lowest - len(ordered_ids) + index}})
+            for index, document_id in enumerate(ordered_ids)
+        ]
+        documents = []
+        for index, document_id in enumerate(ordered_ids):
+            document = by_id[document_id]
+            fields = {
+                "rank": (index + 1) * RANK_GAP,
+                **self._sequence_fields(ordered_ids, index)
+            }
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$set": fields}))
+            document.update(fields)
+            document["order"] = index + 1
+            documents.append(document)
+
+        if documents:
+            await collection.bulk_write(operations, ordered=True)
+        return documents
+
+    def _sequence_fields(self, ordered_ids: List[str], index: int) -> Dict[str, Any]:
+        """Extra fields to set on the item at ``index`` when reordering."""
+        return {}
+
+    async def dense_order(self, document: Dict[str, Any]) -> int:
+        """Return the 1-based position of a document among its siblings."""
+        return await self.count({
+            self.parent_field: document[self.parent_field],
+            "rank": {"$lt": document.get("rank", 0)}
+        }) + 1
+
+    async def rank_for_position(
+        self,
+        parent_id: str,
+        position: Optional[int],
+        exclude_id: Optional[ObjectId] = None
+    ) -> int:
+        """
+        Return a free rank placing a document at ``position`` (1-based) among
+        its siblings. Appends when ``position`` is None or past the end.
+        Rebalances the parent when the target gap is exhausted.
+        """
+        for _ in range(MAX_RANK_ATTEMPTS):
+            rank = await self._free_rank(parent_id, position, exclude_id)
+            if rank is not None:
+                return rank
+            await self.rebalance(parent_id)
+        raise ValueError("Failed to allocate a position")
+
+    async def _free_rank(
+        self,
+        parent_id: str,
+        position: Optional[int],
+        exclude_id: Optional[ObjectId]
+    ) -> Optional[int]:
+        collection = await self.get_collection()
+        query: Dict[str, Any] = {self.parent_field: parent_id}
+        if exclude_id is not None:
+            query["_id"] = {"$ne": exclude_id}
+
+        if position is not None and position <= 1:
+            first = await collection.find(query, {"rank": 1}).sort("rank", 1).limit(1).to_list(1)
+            return first[0]["rank"] - RANK_GAP if first else RANK_GAP
+
+        neighbours: List[Dict[str, Any]] = []
+        if position is not None:
+            # The siblings currently at position - 1 and position
+            neighbours = await collection.find(query, {"rank": 1}).sort("rank", 1).skip(position - 2).limit(2).to_list(2)
+
+        if len(neighbours) == 1:
+            # The target is right after the last sibling
+            return neighbours[0]["rank"] + RANK_GAP
+        if not neighbours:
+            # Appending: place after the last sibling
+            last = await collection.find(query, {"rank": 1}).sort("rank", -1).limit(1).to_list(1)
+            return last[0]["rank"] + RANK_GAP if last else RANK_GAP
+
+        before, after = neighbours[0]["rank"], neighbours[1]["rank"]
+        if after - before < 2:
+            return None
+        return (before + after) // 2
+
+    async def rebalance(self, parent_id: str) -> None:
+        """Respread the ranks of every sibling of ``parent_id`` by RANK_GAP."""
+        collection = await self.get_collection()
+        siblings = await collection.find(
+            {self.parent_field: parent_id},
+            {"rank": 1}
+        ).sort("rank", 1).to_list(length=None)
+        operations = self._rank_operations(
+            [(sibling["_id"], sibling.get("rank")) for sibling in siblings]
+        )
+        if operations:
+            await collection.bulk_write(operations, ordered=True)
+
+    def _rank_operations(self, current: List[Any]) -> List[UpdateOne]:
+        """
+        Build the updates assigning ``(index + 1) * RANK_GAP`` to each
+        ``(_id, current_rank)`` pair of a rank-sorted sibling list.
+
+        The updates are ordered so that no document is ever moved onto a rank
+        still held by another one: documents moving up are written from the
+        end of the sequence, documents moving down from the start. This keeps
+        the unique ``(parent, rank)`` index valid after every single write.
+        """
+        moving_up, moving_down = [], []
+        for index, (document_id, rank) in enumerate(current):
+            target = (index + 1) * RANK_GAP
+            if rank is None or target > rank:
+                moving_up.append((document_id, target))
+            elif target < rank:
+                moving_down.append((document_id, target))
+
+        return [
+            UpdateOne({"_id": document_id}, {"$set": {"rank": target}})
+            for document_id, target in list(reversed(moving_up)) + moving_down
+        ]
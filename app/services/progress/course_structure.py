@@ -0,0 +1,42 @@
+from typing import Dict, Set
+
+from ...core.local_cache import LocalCache
+from ...DB.database import MODULES_COLLECTION
+from ..base import BaseService
+
+# course_id -> {module_id: lesson and assessment IDs}, shared by this worker
+_course_structures = LocalCache(maxsize=1024, ttl=60)
+
+
+class CourseStructureService(BaseService):
+    """
+    Cached lookup of the content items (lessons and assessments) of every
+    module of a course, used to seed and maintain progress counters.
+    """
+
+    def __init__(self):
+        super().__init__(MODULES_COLLECTION)
+
+    async def get_module_contents(self, course_id: str) -> Dict[str, Set[str]]:
+        """
+        Get the lesson and assessment IDs of every module of a course,
+        keyed by module ID, with one projected query per cache miss.
+        """
+        structure = _course_structures.get(course_id)
+        if structure is None:
+            collection = await self.get_collection()
+            modules = await collection.find(
+                {"course_id": course_id},
+                {"lesson_ids": 1, "assessment_ids": 1}
+            ).to_list(length=None)
+            structure = {
+                str(module["_id"]): set(module.get("lesson_ids") or []) | set(module.get("assessment_ids") or [])
+                for module in modules
+            }
+            _course_structures.set(course_id, structure)
+        return structure
+
+    @staticmethod
+    def invalidate(course_id: str) -> None:
+        """Drop this worker's cached structure of a course."""
+        _course_structures.delete(course_id)
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from ...core.config import settings
+from ...core.metrics import PROGRESS_BUFFERED_CONTENTS, PROGRESS_FLUSHES
+from .progress_service import ContentProgressEvent, ProgressService, ProgressWriteError
+
+logger = logging.getLogger(__name__)
+
+# (user_id, course_id, module_id, content_id)
+ContentKey = Tuple[str, str, str, str]
+
+# Heartbeats buffered by this worker, aggregated per content
+_pending: Dict[ContentKey, ContentProgressEvent] = {}
+_buffered_events = 0
+_flush_lock = asyncio.Lock()
+_flush_task: Optional[asyncio.Task] = None
+# Set to make the flush task write the buffer before its interval is up
+_flush_requested: Optional[asyncio.Event] = None
+
+
+class ProgressBuffer:
+    """
+    Write-behind buffer for progress heartbeats.
+
+    Heartbeats are aggregated in memory per (user, course, content): time
+    spent is summed and the latest position kept. The buffer is written
+    with one bulk_write every PROGRESS_FLUSH_INTERVAL_SECONDS, as soon as
+    PROGRESS_FLUSH_MAX_EVENTS heartbeats are buffered (by the flush task,
+    not by the request that crossed the threshold), and on shutdown.
+    A completion is written immediately, together with the time buffered
+    for that content.
+
+    Heartbeats not yet flushed are lost if the worker dies abruptly; at most
+    one flush interval of time spent is at stake.
+    """
+
+    def __init__(self):
+        self.progress_service = ProgressService()
+
+    async def add(self, event: ContentProgressEvent) -> None:
+        """
+        Buffer a heartbeat, or write it at once if it completes the content.
+
+        Raises:
+            ValueError: If an ID cannot be used as a field name
+            ProgressWriteError: If a completion could not be written
+        """
+        global _buffered_events
+        ProgressService.validate_field_ids(event.module_id, event.content_id)
+        key = (event.user_id, event.course_id, event.module_id, event.content_id)
+
+        if event.completed:
+            async with _flush_lock:
+                buffered = _pending.pop(key, None)
+                if buffered is not None:
+                    self._update_gauge()
+                    completion = ContentProgressEvent(**vars(buffered))
+                    completion.merge(event)
+                    event = completion
+                try:
+                    await self.progress_service.apply_content_events([event])
+                except ProgressWriteError:
+                    # Nothing was written; any other error comes after the
+                    # buffered time was, and restoring it would count it twice
+                    if buffered is not None:
+                        self._restore([buffered])
+                    raise
+            return
+
+        if key in _pending:
+            _pending[key].merge(event)
+        else:
+            _pending[key] = event
+        _buffered_events += 1
+        self._update_gauge()
+
+        if _buffered_events >= settings.PROGRESS_FLUSH_MAX_EVENTS:
+            if _flush_requested is not None:
+                _flush_requested.set()
+            else:
+                # No flush task in this process (e.g. a script): write now
+                await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write every buffered heartbeat with one bulk_write.
+        Heartbeats whose time spent was not written go back into the buffer
+        for the next flush; a failure after that write (e.g. of the status
+        rollups) is only logged.
+
+        Returns:
+            The number of content items written
+        """
+        global _buffered_events
+        async with _flush_lock:
+            if not _pending:
+                return 0
+            events = list(_pending.values())
+            _pending.clear()
+            _buffered_events = 0
+            self._update_gauge()
+            try:
+                await self.progress_service.apply_content_events(events)
+            except ProgressWriteError as error:
+                PROGRESS_FLUSHES.labels(result="error").inc()
+                logger.exception("Failed to flush %d of %d buffered progress updates", len(error.unwritten), len(events))
+                self._restore(error.unwritten)
+                return len(events) - len(error.unwritten)
+            except Exception:
+                PROGRESS_FLUSHES.labels(result="error").inc()
+                logger.exception("Flushed %d buffered progress updates but failed to roll them up", len(events))
+            else:
+                PROGRESS_FLUSHES.labels(result="ok").inc()
+            return len(events)
+
+    async def run(self, flush_requested: asyncio.Event) -> None:
+        """
+        Flush the buffer every PROGRESS_FLUSH_INTERVAL_SECONDS, or earlier
+        when `flush_requested` is set, until cancelled.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(flush_requested.wait(), timeout=settings.PROGRESS_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            flush_requested.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start this worker's periodic flush task."""
+        global _flush_task, _flush_requested
+        if _flush_task is None or _flush_task.done():
+            _flush_requested = asyncio.Event()
+            _flush_task = asyncio.create_task(self.run(_flush_requested))
+
+    async def stop(self) -> None:
+        """Stop the periodic flush task and drain the buffer."""
+        global _flush_task, _flush_requested
+        _flush_requested = None
+        if _flush_task is not None:
+            _flush_task.cancel()
+            try:
+                await _flush_task
+            except asyncio.CancelledError:
+                pass
+            _flush_task = None
+        await self.flush()
+
+    @staticmethod
+    def _restore(events: List[ContentProgressEvent]) -> None:
+        """Put unwritten heartbeats back in front of the ones buffered since."""
+        global _buffered_events
+        for event in events:
+            key = (event.user_id, event.course_id, event.module_id, event.content_id)
+            newer = _pending.get(key)
+            if newer is not None:
+                event.merge(newer)
+            _pending[key] = event
+        _buffered_events = len(_pending)
+        ProgressBuffer._update_gauge()
+
+    @staticmethod
+    def _update_gauge() -> None:
+        PROGRESS_BUFFERED_CONTENTS.set(len(_pending))
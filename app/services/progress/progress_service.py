@@ -1,18 +1,84 @@
-from typing import Optional, Dict, Any, List
+import logging
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Set, Tuple
 from datetime import datetime
-from ...DB.database import PROGRESS_COLLECTION
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from ...core.config import settings
+from ...core.metrics import PROGRESS_WRITE_CONFLICTS
+from ...DB.database import get_database, PROGRESS_COLLECTION, CONTENT_PROGRESS_COLLECTION
 from ...models.progress.progress import (
     CourseProgress,
-    ModuleProgress,
-    ContentProgress,
-    ProgressStatus,
-    ContentType
+    ProgressStatus
 )
 from ..base import BaseService
+from .course_structure import CourseStructureService
+
+logger = logging.getLogger(__name__)
+
+# Storage layouts of content progress:
+# - embedded: every content entry lives inside its CourseProgress document
+# - normalized: one content_progress document per content entry; the
+#   CourseProgress document only holds module and course rollups
+PROGRESS_LAYOUTS = ("embedded", "normalized")
+
+# Fields of a content progress entry
+CONTENT_FIELDS = ("status", "started_at", "completed_at", "time_spent_seconds", "last_position")
+
+@dataclass
+class ContentProgressEvent:
+    """One content progress report (a heartbeat or a completion)."""
+    user_id: str
+    course_id: str
+    module_id: str
+    content_id: str
+    time_spent: int
+    last_position: Optional[Dict[str, Any]] = None
+    completed: bool = False
+
+    def merge(self, later: "ContentProgressEvent") -> None:
+        """Fold a later report for the same content into this one."""
+        self.time_spent += later.time_spent
+        if later.last_position is not None:
+            self.last_position = later.last_position
+        self.completed = self.completed or later.completed
+
+
+class ProgressWriteError(Exception):
+    """
+    The time spent of some progress events was not written. `unwritten`
+    lists them (coalesced per content) so they can be retried without
+    counting the others twice.
+    """
+
+    def __init__(self, unwritten: List[ContentProgressEvent]):
+        super().__init__(f"{len(unwritten)} progress updates were not written")
+        self.unwritten = unwritten
+
 
 class ProgressService(BaseService):
-    def __init__(self):
+    """
+    Service for course progress.
+
+    Content progress is stored according to PROGRESS_STORAGE_LAYOUT (see
+    PROGRESS_LAYOUTS); both layouts return the same CourseProgress.
+    """
+
+    def __init__(self, layout: Optional[str] = None):
         super().__init__(PROGRESS_COLLECTION)
+        self.course_structure = CourseStructureService()
+        self.layout = layout or settings.PROGRESS_STORAGE_LAYOUT
+        if self.layout not in PROGRESS_LAYOUTS:
+            raise ValueError(f"Unknown progress storage layout: {self.layout}")
+
+    @property
+    def normalized(self) -> bool:
+        return self.layout == "normalized"
+
+    async def get_content_collection(self):
+        db = await get_database()
+        return db[CONTENT_PROGRESS_COLLECTION]
 
     async def get_course_progress(
         self,
@@ -21,7 +87,10 @@ class ProgressService(BaseService):
     ) -> Optional[CourseProgress]:
         """Get a user's progress in a course."""
         progress_dict = await self.get_one({"user_id": user_id, "course_id": course_id})
-        return CourseProgress.model_validate(progress_dict) if progress_dict else None
+        if not progress_dict:
+            return None
+        await self._attach_contents([progress_dict])
+        return CourseProgress.model_validate(progress_dict)
 
     async def list_user_progress(
         self,
@@ -35,6 +104,7 @@ class ProgressService(BaseService):
             limit=limit,
             filter_query={"user_id": user_id}
         )
+        await self._attach_contents(progress_list)
         return [CourseProgress.model_validate(p) for p in progress_list]
 
     async def initialize_course_progress(
@@ -42,19 +112,19 @@ class ProgressService(BaseService):
         user_id: str,
         course_id: str
     ) -> CourseProgress:
-        """Initialize progress tracking for a course."""
-        # Check if progress already exists
-        existing = await self.get_course_progress(user_id, course_id)
-        if existing:
-            return existing
-
-        # Create new progress
-        progress = CourseProgress(
-            user_id=user_id,
-            course_id=course_id,
-            started_at=datetime.utcnow()
+        """
+        Initialize progress tracking for a course.
+        Single upsert round-trip; an existing progress document is returned unchanged.
+        """
+        now = datetime.utcnow()
+        progress = CourseProgress(user_id=user_id, course_id=course_id, started_at=now)
+        collection = await self.get_collection()
+        progress_dict = await collection.find_one_and_update(
+            {"user_id": user_id, "course_id": course_id},
+            {"$setOnInsert": progress.model_dump(exclude={"id", "completion_percentage"})},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
-        progress_dict = await self.create(progress)
         return CourseProgress.model_validate(progress_dict)
 
     async def update_content_progress(
@@ -63,73 +133,521 @@ class ProgressService(BaseService):
         course_id: str,
         module_id: str,
         content_id: str,
-        content_type: ContentType,
         time_spent: int,
         last_position: Optional[Dict[str, Any]] = None,
         completed: bool = False
     ) -> Optional[CourseProgress]:
-        """Update progress for a specific content item (lesson or assessment)."""
-        # Get or create course progress
-        progress = await self.get_course_progress(user_id, course_id)
-        if not progress:
-            progress = await self.initialize_course_progress(user_id, course_id)
-
-        # Initialize module progress if needed
-        if module_id not in progress.module_progress:
-            progress.module_progress[module_id] = ModuleProgress(
-                module_id=module_id,
-                started_at=datetime.utcnow()
-            )
+        """
+        Update progress for a specific content item (lesson or assessment).
+
+        Only the touched paths are written, with one atomic upsert (two in
+        the normalized layout: the content entry and the rollups), so
+        concurrent updates of the same course never overwrite each other.
+        A first completion costs one more conditional write that flips the
+        content status and bumps the counters exactly once; module and
+        course statuses only cost a write when they change.
 
-        module_prog = progress.module_progress[module_id]
-        
-        # Initialize or update content progress
-        if content_id not in module_prog.content_progress:
-            content_prog = ContentProgress(
-                status=ProgressStatus.IN_PROGRESS,
-                started_at=datetime.utcnow(),
-                time_spent_seconds=time_spent,
-                last_position=last_position
+        Raises:
+            ValueError: If an ID cannot be used as a field name, or the
+                module is not part of the course
+        """
+        self.validate_field_ids(module_id, content_id)
+        now = datetime.utcnow()
+        structure = await self.course_structure.get_module_contents(course_id)
+        if structure and module_id not in structure:
+            raise ValueError(f"Module {module_id} is not part of course {course_id}")
+        collection = await self.get_collection()
+        document_filter = {"user_id": user_id, "course_id": course_id}
+
+        if self.normalized:
+            content_collection = await self.get_content_collection()
+            content_filter = {**document_filter, "module_id": module_id, "content_id": content_id}
+            await content_collection.update_one(
+                content_filter,
+                self._entry_update(time_spent, last_position, now),
+                upsert=True
+            )
+            progress_dict = await collection.find_one_and_update(
+                document_filter,
+                self._rollup_update(module_id, structure, now),
+                upsert=True,
+                return_document=ReturnDocument.AFTER
             )
+            if completed:
+                entry_filter, entry_update, counters = self._completion_update(module_id, content_id, structure, now)
+                result = await content_collection.update_one({**content_filter, **entry_filter}, entry_update)
+                if result.modified_count and counters:
+                    progress_dict = await collection.find_one_and_update(
+                        {"_id": progress_dict["_id"]},
+                        {"$inc": {**counters, "version": 1}},
+                        return_document=ReturnDocument.AFTER
+                    )
         else:
-            content_prog = module_prog.content_progress[content_id]
-            content_prog.time_spent_seconds += time_spent
-            content_prog.last_position = last_position
-            content_prog.status = ProgressStatus.COMPLETED if completed else ProgressStatus.IN_PROGRESS
+            progress_dict = await collection.find_one_and_update(
+                document_filter,
+                self._content_update(module_id, content_id, time_spent, last_position, structure, now),
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            if completed:
+                content_path = f"module_progress.{module_id}.content_progress.{content_id}"
+                entry_filter, entry_update, counters = self._completion_update(
+                    module_id, content_id, structure, now, prefix=f"{content_path}."
+                )
+                entry_update["$inc"] = {**counters, "version": 1}
+                progress_dict = await collection.find_one_and_update(
+                    {"_id": progress_dict["_id"], **entry_filter},
+                    entry_update,
+                    return_document=ReturnDocument.AFTER
+                ) or progress_dict
+
+        progress_dict = await self._roll_up_status(progress_dict, [module_id], now)
+        await self._attach_contents([progress_dict])
+        return CourseProgress.model_validate(progress_dict) if progress_dict else None
 
-        if completed and not content_prog.completed_at:
-            content_prog.completed_at = datetime.utcnow()
+    async def apply_content_events(self, events: List[ContentProgressEvent]) -> List[Dict[str, Any]]:
+        """
+        Apply an ordered list of content progress events.
 
-        module_prog.content_progress[content_id] = content_prog
+        Events are coalesced per content (time summed, latest position kept)
+        and then per progress document, so every affected CourseProgress gets
+        exactly one update, all sent in one unordered bulk_write (plus one
+        for the content entries in the normalized layout). First completions
+        follow as conditional updates. The statuses of the touched modules
+        and courses are then reconciled from one read of the affected
+        documents. Events for modules outside their course's structure are
+        ignored.
 
-        # Update module status
-        all_completed = all(
-            p.status == ProgressStatus.COMPLETED
-            for p in module_prog.content_progress.values()
-        )
-        if all_completed:
-            module_prog.status = ProgressStatus.COMPLETED
-            module_prog.completed_at = datetime.utcnow()
-        else:
-            module_prog.status = ProgressStatus.IN_PROGRESS
+        Returns:
+            The affected progress documents after the update
 
-        # Update course status
-        all_modules_completed = all(
-            m.status == ProgressStatus.COMPLETED
-            for m in progress.module_progress.values()
-        )
-        if all_modules_completed:
-            progress.status = ProgressStatus.COMPLETED
-            progress.completed_at = datetime.utcnow()
+        Raises:
+            ValueError: If an ID cannot be used as a field name
+            ProgressWriteError: If the time spent of some events was not
+                written (the others, their completions and rollups were)
+        """
+        if not events:
+            return []
+        now = datetime.utcnow()
+
+        contents: Dict[tuple, ContentProgressEvent] = {}
+        for event in events:
+            self.validate_field_ids(event.module_id, event.content_id)
+            key = (event.user_id, event.course_id, event.module_id, event.content_id)
+            if key in contents:
+                contents[key].merge(event)
+            else:
+                contents[key] = ContentProgressEvent(**vars(event))
+
+        try:
+            structures = {
+                course_id: await self.course_structure.get_module_contents(course_id)
+                for course_id in dict.fromkeys(event.course_id for event in contents.values())
+            }
+        except Exception as error:
+            raise ProgressWriteError(list(contents.values())) from error
+        # Events may be replayed long after a module left its course
+        for key, event in list(contents.items()):
+            if structures[event.course_id] and event.module_id not in structures[event.course_id]:
+                logger.warning(
+                    "Ignoring progress of user %s in module %s, not part of course %s",
+                    event.user_id, event.module_id, event.course_id
+                )
+                del contents[key]
+        if not contents:
+            return []
+        updates: Dict[tuple, Dict[str, Dict[str, Any]]] = {}
+        entry_updates: List[UpdateOne] = []
+        completions: List[Tuple[tuple, Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, int]]] = []
+        touched: Dict[tuple, List[str]] = {}
+        document_events: Dict[tuple, List[ContentProgressEvent]] = {}
+        for event in contents.values():
+            document_key = (event.user_id, event.course_id)
+            structure = structures[event.course_id]
+            if self.normalized:
+                content_filter = {
+                    "user_id": event.user_id,
+                    "course_id": event.course_id,
+                    "module_id": event.module_id,
+                    "content_id": event.content_id
+                }
+                entry_updates.append(UpdateOne(
+                    content_filter,
+                    self._entry_update(event.time_spent, event.last_position, now),
+                    upsert=True
+                ))
+                document_update = self._rollup_update(event.module_id, structure, now)
+                prefix = ""
+            else:
+                content_filter = {"user_id": event.user_id, "course_id": event.course_id}
+                document_update = self._content_update(
+                    event.module_id, event.content_id, event.time_spent,
+                    event.last_position, structure, now
+                )
+                prefix = f"module_progress.{event.module_id}.content_progress.{event.content_id}."
+            update = updates.setdefault(document_key, {})
+            for operator, fields in document_update.items():
+                update.setdefault(operator, {}).update(fields)
+            if event.completed:
+                entry_filter, entry_update, counters = self._completion_update(
+                    event.module_id, event.content_id, structure, now, prefix=prefix
+                )
+                completions.append((document_key, content_filter, entry_filter, entry_update, counters))
+            touched.setdefault(document_key, [])
+            if event.module_id not in touched[document_key]:
+                touched[document_key].append(event.module_id)
+            document_events.setdefault(document_key, []).append(event)
+
+        collection = await self.get_collection()
+        content_collection = await self.get_content_collection()
+        document_updates = [
+            UpdateOne({"user_id": user_id, "course_id": course_id}, update, upsert=True)
+            for (user_id, course_id), update in updates.items()
+        ]
+        # Time spent is the one non-idempotent write: the content entries in
+        # the normalized layout, the progress documents in the embedded one.
+        # Only events whose time write failed are reported as unwritten;
+        # everything after it is safe to repeat.
+        if self.normalized:
+            unwritten = await self._write_time(
+                content_collection, entry_updates, [[event] for event in contents.values()]
+            )
         else:
-            progress.status = ProgressStatus.IN_PROGRESS
+            unwritten = await self._write_time(collection, document_updates, list(document_events.values()))
+
+        try:
+            progress_docs = await self._complete_and_roll_up(
+                collection, content_collection, document_updates, completions, touched, now
+            )
+        except Exception as error:
+            if unwritten:
+                raise ProgressWriteError(unwritten) from error
+            raise
+        if unwritten:
+            raise ProgressWriteError(unwritten)
+        return progress_docs
+
+    @staticmethod
+    async def _write_time(
+        collection: AsyncIOMotorCollection,
+        operations: List[UpdateOne],
+        operation_events: List[List[ContentProgressEvent]]
+    ) -> List[ContentProgressEvent]:
+        """
+        Send the bulk_write carrying the time spent of the events, where
+        `operation_events[i]` are the events of `operations[i]`.
+
+        Returns:
+            The events of the operations that failed in a partial failure
 
-        # Update last accessed time
-        progress.last_accessed_at = datetime.utcnow()
+        Raises:
+            ProgressWriteError: If the bulk_write failed as a whole
+        """
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as error:
+            failed = {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+            if not failed:
+                raise ProgressWriteError([event for events in operation_events for event in events]) from error
+            return [event for index in sorted(failed) for event in operation_events[index]]
+        except Exception as error:
+            raise ProgressWriteError([event for events in operation_events for event in events]) from error
+        return []
 
-        # Save changes
-        updated_dict = await self.update(
-            progress.id,
-            progress.model_dump(exclude={"id"})
+    async def _complete_and_roll_up(
+        self,
+        collection: AsyncIOMotorCollection,
+        content_collection: AsyncIOMotorCollection,
+        document_updates: List[UpdateOne],
+        completions: List[Tuple[tuple, Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, int]]],
+        touched: Dict[tuple, List[str]],
+        now: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply the idempotent part of apply_content_events once the time
+        spent is written: the rollups of the normalized layout, first
+        completions and the status reconciliation.
+        """
+        if self.normalized:
+            await collection.bulk_write(document_updates, ordered=False)
+
+        if completions and self.normalized:
+            # Which completions matched decides the counters, so each one is
+            # its own conditional write; the counters then go in one bulk_write
+            counted: Dict[tuple, Dict[str, int]] = {}
+            for document_key, content_filter, entry_filter, entry_update, counters in completions:
+                result = await content_collection.update_one({**content_filter, **entry_filter}, entry_update)
+                if result.modified_count:
+                    for field, amount in counters.items():
+                        document_counters = counted.setdefault(document_key, {})
+                        document_counters[field] = document_counters.get(field, 0) + amount
+            if counted:
+                await collection.bulk_write(
+                    [
+                        UpdateOne({"user_id": user_id, "course_id": course_id}, {"$inc": {**counters, "version": 1}})
+                        for (user_id, course_id), counters in counted.items()
+                    ],
+                    ordered=False
+                )
+        elif completions:
+            operations = []
+            for _, content_filter, entry_filter, entry_update, counters in completions:
+                entry_update["$inc"] = {**counters, "version": 1}
+                operations.append(UpdateOne({**content_filter, **entry_filter}, entry_update))
+            await collection.bulk_write(operations, ordered=False)
+
+        progress_docs = await collection.find({
+            "$or": [{"user_id": user_id, "course_id": course_id} for user_id, course_id in touched]
+        }).to_list(length=None)
+        progress_docs = [
+            await self._roll_up_status(
+                progress_dict,
+                touched.get((progress_dict["user_id"], progress_dict["course_id"]), []),
+                now
+            )
+            for progress_dict in progress_docs
+        ]
+        await self._attach_contents(progress_docs)
+        return progress_docs
+
+    async def _attach_contents(self, progress_docs: List[Dict[str, Any]]) -> None:
+        """
+        In the normalized layout, load the content entries of these progress
+        documents with one query and nest them as in the embedded layout.
+        """
+        if not self.normalized or not progress_docs:
+            return
+        by_document = {(progress["user_id"], progress["course_id"]): progress for progress in progress_docs}
+        content_collection = await self.get_content_collection()
+        cursor = content_collection.find({
+            "$or": [{"user_id": user_id, "course_id": course_id} for user_id, course_id in by_document]
+        })
+        async for entry in cursor:
+            progress = by_document[(entry["user_id"], entry["course_id"])]
+            module = progress.setdefault("module_progress", {}).setdefault(
+                entry["module_id"], {"module_id": entry["module_id"]}
+            )
+            module.setdefault("content_progress", {})[entry["content_id"]] = {
+                field: entry[field] for field in CONTENT_FIELDS if field in entry
+            }
+
+    @staticmethod
+    def validate_field_ids(*ids: str) -> None:
+        """
+        Check that IDs can be used as field names in update paths.
+
+        Raises:
+            ValueError: If an ID is empty, contains '.' or starts with '$'
+        """
+        for key in ids:
+            if not key or "." in key or key.startswith("$"):
+                raise ValueError(f"Invalid ID: {key!r}")
+
+    @staticmethod
+    def _content_update(
+        module_id: str,
+        content_id: str,
+        time_spent: int,
+        last_position: Optional[Dict[str, Any]],
+        structure: Dict[str, Set[str]],
+        now: datetime
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Build the update applying one content progress event to an embedded
+        CourseProgress document, short of completing the content (see
+        _completion_update).
+
+        Statuses only move forward through `$min`: their values sort as
+        "completed" < "in_progress" < "not_started", so a later heartbeat
+        never reopens completed content. Start times are first-write-wins
+        through `$min` as well.
+        """
+        ProgressService.validate_field_ids(module_id, content_id)
+        content_path = f"module_progress.{module_id}.content_progress.{content_id}"
+        update = ProgressService._rollup_update(module_id, structure, now)
+        entry_update = ProgressService._entry_update(time_spent, last_position, now, prefix=f"{content_path}.")
+        for operator, fields in entry_update.items():
+            update.setdefault(operator, {}).update(fields)
+        return update
+
+    @staticmethod
+    def _entry_update(
+        time_spent: int,
+        last_position: Optional[Dict[str, Any]],
+        now: datetime,
+        prefix: str = ""
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Build the update of the content entry fields, found under `prefix`
+        (the entry path inside an embedded document, or nothing for a
+        content_progress document).
+        """
+        update: Dict[str, Dict[str, Any]] = {
+            "$inc": {f"{prefix}time_spent_seconds": time_spent},
+            "$min": {
+                f"{prefix}status": ProgressStatus.IN_PROGRESS.value,
+                f"{prefix}started_at": now
+            }
+        }
+        if last_position is not None:
+            update["$set"] = {f"{prefix}last_position": last_position}
+        return update
+
+    @staticmethod
+    def _rollup_update(
+        module_id: str,
+        structure: Dict[str, Set[str]],
+        now: datetime
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Build the update of the module and course rollups touched by a
+        content progress event. Totals are refreshed from the course
+        structure and `$inc` by 0 creates missing counters.
+        """
+        module_path = f"module_progress.{module_id}"
+        return {
+            "$set": {
+                f"{module_path}.module_id": module_id,
+                f"{module_path}.total_count": len(structure.get(module_id, ())),
+                "total_count": sum(len(contents) for contents in structure.values()),
+                "total_modules": len(structure),
+                "last_accessed_at": now,
+                "updated_at": now
+            },
+            "$inc": {
+                f"{module_path}.completed_count": 0,
+                "completed_count": 0,
+                "completed_modules": 0,
+                "version": 1
+            },
+            "$min": {
+                f"{module_path}.status": ProgressStatus.IN_PROGRESS.value,
+                f"{module_path}.started_at": now,
+                "status": ProgressStatus.IN_PROGRESS.value,
+                "started_at": now
+            },
+            "$setOnInsert": {"created_at": now}
+        }
+
+    @staticmethod
+    def _completion_update(
+        module_id: str,
+        content_id: str,
+        structure: Dict[str, Set[str]],
+        now: datetime,
+        prefix: str = ""
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], Dict[str, int]]:
+        """
+        Build the (extra filter, entry update, counter increments) completing
+        one content item, whose fields are found under `prefix`.
+
+        The filter only matches while the content is not completed yet, so
+        the counters are incremented exactly once however many completion
+        events race. Content outside the module's lessons and assessments
+        is marked completed without being counted.
+        """
+        update: Dict[str, Dict[str, Any]] = {
+            "$set": {f"{prefix}status": ProgressStatus.COMPLETED.value},
+            "$min": {f"{prefix}completed_at": now}
+        }
+        counters: Dict[str, int] = {}
+        if content_id in structure.get(module_id, ()):
+            counters = {f"module_progress.{module_id}.completed_count": 1, "completed_count": 1}
+        return {f"{prefix}status": {"$ne": ProgressStatus.COMPLETED.value}}, update, counters
+
+    async def _roll_up_status(
+        self,
+        progress_dict: Dict[str, Any],
+        module_ids: List[str],
+        now: datetime
+    ) -> Dict[str, Any]:
+        """
+        Complete or reopen the touched modules, then the course, from their
+        counters, with one optimistic write: it only applies if the document
+        `version` is still the one the decision was made on. On a conflict
+        the document is read again and the decision retried, up to
+        PROGRESS_WRITE_RETRIES times; nothing is written when no status
+        changes.
+
+        Only modules of the course structure count toward
+        `completed_modules`. Modules and courses without a known structure
+        (total 0) fall back to checking every tracked entry.
+        """
+        completed = ProgressStatus.COMPLETED.value
+        collection = await self.get_collection()
+        structure = await self.course_structure.get_module_contents(progress_dict["course_id"])
+
+        for _ in range(settings.PROGRESS_WRITE_RETRIES):
+            update: Dict[str, Dict[str, Any]] = {}
+
+            def settle(path: str, document: Dict[str, Any], done: bool) -> int:
+                """Add a status change to the update; returns +1/-1 when the status flips."""
+                prefix = f"{path}." if path else ""
+                if done == (document.get("status") == completed):
+                    return 0
+                if done:
+                    update.setdefault("$set", {}).update({f"{prefix}status": completed, f"{prefix}completed_at": now})
+                    return 1
+                update.setdefault("$set", {})[f"{prefix}status"] = ProgressStatus.IN_PROGRESS.value
+                update.setdefault("$unset", {})[f"{prefix}completed_at"] = ""
+                return -1
+
+            modules = progress_dict.get("module_progress", {})
+            module_statuses = {module_id: module.get("status") for module_id, module in modules.items()}
+            completed_modules = progress_dict.get("completed_modules", 0)
+            for module_id in module_ids:
+                module = modules.get(module_id, {})
+                statuses = [content.get("status") for content in module.get("content_progress", {}).values()]
+                if self.normalized and not module.get("total_count"):
+                    statuses = await self._tracked_statuses(progress_dict, module_id)
+                flipped = settle(f"module_progress.{module_id}", module, self._is_done(module, statuses))
+                if flipped:
+                    if module_id in structure:
+                        completed_modules += flipped
+                    module_statuses[module_id] = completed if flipped > 0 else ProgressStatus.IN_PROGRESS.value
+
+            settle("", progress_dict, self._is_done(
+                {"completed_count": completed_modules, "total_count": progress_dict.get("total_modules", 0)},
+                list(module_statuses.values())
+            ))
+            if not update:
+                return progress_dict
+
+            update["$inc"] = {"version": 1}
+            if completed_modules != progress_dict.get("completed_modules", 0):
+                update["$inc"]["completed_modules"] = completed_modules - progress_dict.get("completed_modules", 0)
+            written = await collection.find_one_and_update(
+                {"_id": progress_dict["_id"], "version": progress_dict.get("version")},
+                update,
+                return_document=ReturnDocument.AFTER
+            )
+            if written is not None:
+                return written
+            PROGRESS_WRITE_CONFLICTS.inc()
+            progress_dict = await collection.find_one({"_id": progress_dict["_id"]}) or progress_dict
+
+        logger.warning(
+            "Gave up rolling up progress %s after %d conflicts",
+            progress_dict["_id"], settings.PROGRESS_WRITE_RETRIES
         )
-        return CourseProgress.model_validate(updated_dict) if updated_dict else None 
\ No newline at end of file
+        return progress_dict
+
+    async def _tracked_statuses(self, progress_dict: Dict[str, Any], module_id: str) -> List[Optional[str]]:
+        """Statuses of a module's content entries in the normalized layout."""
+        content_collection = await self.get_content_collection()
+        entries = await content_collection.find(
+            {"user_id": progress_dict["user_id"], "course_id": progress_dict["course_id"], "module_id": module_id},
+            {"status": 1}
+        ).to_list(length=None)
+        return [entry.get("status") for entry in entries]
+
+    @staticmethod
+    def _is_done(counters: Dict[str, Any], statuses: List[Optional[str]]) -> bool:
+        """
+        Completion from the counters in O(1); without a known total, every
+        tracked entry must be completed.
+        """
+        total = counters.get("total_count", 0)
+        if total:
+            return counters.get("completed_count", 0) >= total
+        return bool(statuses) and all(status == ProgressStatus.COMPLETED.value for status in statuses)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...core.text_index import InvertedIndex
+from ...DB.database import ROADMAPS_COLLECTION
+from ..base import BaseService
+
+# Seconds before a worker rebuilds its index to pick up other workers' writes
+INDEX_REFRESH_SECONDS = 300
+
+# Fields kept beside the index so filters never need the database
+FILTER_FIELDS = ("category", "difficulty", "status", "instructor_id")
+
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "description": 1.0}
+
+logger = logging.getLogger(__name__)
+
+# Index shared by every service instance of this worker
+_index = InvertedIndex(FIELD_WEIGHTS)
+_filters: Dict[str, Dict[str, Any]] = {}
+_loaded_at: Optional[float] = None
+_reload_task: Optional[asyncio.Task] = None
+# Writes made while a rebuild runs, one log per rebuild, replayed onto the
+# new index before it is swapped in
+_rebuild_logs: List[List[Tuple[str, Any]]] = []
+
+
+class RoadmapSearchService(BaseService):
+    """
+    Ranked full-text search over roadmap titles, descriptions and tags.
+
+    Roadmaps are held in an in-process BM25 inverted index (accent folding
+    and light Spanish/English stemming) built with one projected query and
+    updated in place by RoadmapService writes.
+    """
+
+    def __init__(self):
+        super().__init__(ROADMAPS_COLLECTION)
+
+    async def search(
+        self,
+        search_term: str,
+        filters: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: Optional[int] = 10
+    ) -> List[str]:
+        """
+        Return the IDs of the best matching roadmaps, best first.
+        `filters` maps filter fields to the exact value required; a `limit`
+        of None returns every match.
+        """
+        await self.ensure_loaded()
+        required = {field: value for field, value in (filters or {}).items() if value is not None}
+
+        def accept(doc_id: str) -> bool:
+            values = _filters.get(doc_id, {})
+            return all(values.get(field) == value for field, value in required.items())
+
+        ranked = _index.search(
+            search_term,
+            accept=accept if required else None,
+            limit=skip + limit if limit is not None else None
+        )
+        return [doc_id for doc_id, _ in ranked[skip:]]
+
+    async def ensure_loaded(self) -> None:
+        """
+        Build the index if this worker has none. Once it is older than
+        INDEX_REFRESH_SECONDS it is rebuilt in the background, and searches
+        keep using the current index meanwhile. Concurrent callers share
+        one rebuild.
+        """
+        global _reload_task
+        if _loaded_at is not None and time.monotonic() - _loaded_at <= INDEX_REFRESH_SECONDS:
+            return
+        if _reload_task is None or _reload_task.done():
+            _reload_task = asyncio.create_task(self.reload())
+            _reload_task.add_done_callback(_log_reload_failure)
+        if _loaded_at is None:
+            # Nothing to serve yet: wait for the first build
+            await asyncio.shield(_reload_task)
+
+    async def reload(self) -> None:
+        """
+        Rebuild the index from the roadmaps collection into a new index and
+        swap it in. Writes made meanwhile are replayed onto it first.
+        """
+        global _index, _filters, _loaded_at
+        log: List[Tuple[str, Any]] = []
+        _rebuild_logs.append(log)
+        try:
+            collection = await self.get_collection()
+            projection = {"title": 1, "description": 1, "tags": 1, **{field: 1 for field in FILTER_FIELDS}}
+            roadmaps = await collection.find({}, projection).to_list(length=None)
+
+            index: InvertedIndex = InvertedIndex(FIELD_WEIGHTS)
+            filters: Dict[str, Dict[str, Any]] = {}
+
+            def build() -> None:
+                for roadmap in roadmaps:
+                    self._add(index, filters, roadmap)
+
+            # Built in a thread so searches keep being served
+            await asyncio.to_thread(build)
+            for action, value in log:
+                if action == "add":
+                    self._add(index, filters, value)
+                else:
+                    self._remove(index, filters, value)
+            _index, _filters = index, filters
+            _loaded_at = time.monotonic()
+        finally:
+            _rebuild_logs.remove(log)
+
+    def index_roadmap(self, roadmap: Dict[str, Any]) -> None:
+        """Add or replace a roadmap in this worker's index."""
+        for log in _rebuild_logs:
+            log.append(("add", roadmap))
+        if _loaded_at is not None:
+            self._add(_index, _filters, roadmap)
+
+    def remove_roadmap(self, roadmap_id: str) -> None:
+        """Remove a roadmap from this worker's index."""
+        for log in _rebuild_logs:
+            log.append(("remove", roadmap_id))
+        self._remove(_index, _filters, roadmap_id)
+
+    @staticmethod
+    def _add(index: InvertedIndex, filters: Dict[str, Dict[str, Any]], roadmap: Dict[str, Any]) -> None:
+        doc_id = str(roadmap["_id"])
+        index.add(doc_id, roadmap)
+        filters[doc_id] = {field: roadmap.get(field) for field in FILTER_FIELDS}
+
+    @staticmethod
+    def _remove(index: InvertedIndex, filters: Dict[str, Dict[str, Any]], roadmap_id: str) -> None:
+        index.remove(roadmap_id)
+        filters.pop(roadmap_id, None)
+
+
+def _log_reload_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Could not rebuild the roadmap search index", exc_info=task.exception())
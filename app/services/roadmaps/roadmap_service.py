@@ -1,7 +1,25 @@
 from typing import List, Optional, Dict, Any
-from ...DB.database import get_database
+from bson import ObjectId
+from ...DB.database import get_database, COURSES_COLLECTION
+from ...core.cache import cache
+from ...core.config import settings
 from ...models.roadmaps.roadmap import Roadmap, RoadmapCreate, RoadmapUpdate, RoadmapStatus, RoadmapCategory, RoadmapDifficulty
 from ..base import BaseService
+from .roadmap_search import RoadmapSearchService
+from ..catalog.catalog_service import RoadmapCatalogService
+
+# Cached course details of a roadmap, and the reverse index course -> roadmaps
+ROADMAP_COURSES_CACHE_PREFIX = "roadmap_courses"
+COURSE_ROADMAPS_CACHE_PREFIX = "course_roadmaps"
+
+# Course fields returned with a roadmap's details
+COURSE_DETAIL_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "level": 1,
+    "estimated_duration": 1,
+    "status": 1
+}
 
 class RoadmapService(BaseService):
     """
@@ -10,10 +28,14 @@ class RoadmapService(BaseService):
     
     def __init__(self):
         super().__init__("roadmaps")
+        self.search_index = RoadmapSearchService()
+        self.catalog = RoadmapCatalogService()
     
     async def create_roadmap(self, roadmap: RoadmapCreate) -> Roadmap:
         """Create a new roadmap."""
         roadmap_dict = await self.create(roadmap)
+        self.search_index.index_roadmap(roadmap_dict)
+        await self.catalog.invalidate()
         return Roadmap.model_validate(roadmap_dict)
     
     async def get_roadmap(self, roadmap_id: str) -> Optional[Roadmap]:
@@ -31,7 +53,32 @@ class RoadmapService(BaseService):
         instructor_id: Optional[str] = None,
         search_term: Optional[str] = None
     ) -> List[Roadmap]:
-        """List roadmaps with filtering and search."""
+        """
+        List roadmaps with filtering and search.
+        Searches are ranked by relevance through the in-process search index.
+        """
+        if search_term:
+            roadmap_ids = await self.search_index.search(
+                search_term,
+                filters={
+                    "category": category,
+                    "difficulty": difficulty,
+                    "status": status,
+                    "instructor_id": instructor_id
+                },
+                skip=skip,
+                limit=limit
+            )
+            roadmaps_by_id = {
+                str(roadmap["_id"]): roadmap
+                for roadmap in await self.get_by_ids(roadmap_ids)
+            }
+            return [
+                Roadmap.model_validate(roadmaps_by_id[roadmap_id])
+                for roadmap_id in roadmap_ids
+                if roadmap_id in roadmaps_by_id
+            ]
+        
         filter_query: Dict[str, Any] = {}
         
         if category:
@@ -42,12 +89,6 @@ class RoadmapService(BaseService):
             filter_query["status"] = status
         if instructor_id:
             filter_query["instructor_id"] = instructor_id
-        if search_term:
-            filter_query["$or"] = [
-                {"title": {"$regex": search_term, "$options": "i"}},
-                {"description": {"$regex": search_term, "$options": "i"}},
-                {"tags": {"$in": [search_term]}}
-            ]
         
         roadmaps = await self.get_all(skip=skip, limit=limit, filter_query=filter_query)
         return [Roadmap.model_validate(roadmap) for roadmap in roadmaps]
@@ -55,11 +96,20 @@ class RoadmapService(BaseService):
     async def update_roadmap(self, roadmap_id: str, roadmap_update: RoadmapUpdate) -> Optional[Roadmap]:
         """Update a roadmap."""
         roadmap_dict = await self.update(roadmap_id, roadmap_update)
+        if roadmap_dict:
+            self.search_index.index_roadmap(roadmap_dict)
+            await self.catalog.invalidate()
+        await self.invalidate_roadmap_details(roadmap_id)
         return Roadmap.model_validate(roadmap_dict) if roadmap_dict else None
     
     async def delete_roadmap(self, roadmap_id: str) -> bool:
         """Delete a roadmap."""
-        return await self.delete(roadmap_id)
+        deleted = await self.delete(roadmap_id)
+        if deleted:
+            self.search_index.remove_roadmap(roadmap_id)
+            await self.catalog.invalidate()
+        await self.invalidate_roadmap_details(roadmap_id)
+        return deleted
     
     async def get_roadmaps_by_category(self, category: RoadmapCategory) -> List[Roadmap]:
         """Get all roadmaps in a specific category."""
@@ -82,6 +132,7 @@ class RoadmapService(BaseService):
         )
         if result.modified_count == 0:
             return None
+        await self.invalidate_roadmap_details(roadmap_id)
         return await self.get_roadmap(roadmap_id)
     
     async def remove_course_from_roadmap(self, roadmap_id: str, course_id: str) -> Optional[Roadmap]:
@@ -93,6 +144,7 @@ class RoadmapService(BaseService):
         )
         if result.modified_count == 0:
             return None
+        await self.invalidate_roadmap_details(roadmap_id)
         return await self.get_roadmap(roadmap_id)
     
     async def update_roadmap_metrics(
@@ -132,24 +184,40 @@ class RoadmapService(BaseService):
         
         if result.modified_count == 0:
             return None
-            
+        
+        await self.invalidate_roadmap_details(roadmap_id)
         return await self.get_roadmap(roadmap_id)
     
     async def get_roadmap_with_courses_details(self, roadmap_id: str) -> Optional[Dict[str, Any]]:
-        """Get a roadmap with detailed course information."""
-        from ...DB.database import get_database
+        """
+        Get a roadmap with detailed course information.
+        All courses are fetched with one projected `$in` query; the result is
+        cached until the roadmap or one of its courses changes.
+        """
+        cache_key = f"{ROADMAP_COURSES_CACHE_PREFIX}:{roadmap_id}"
+        cached_details = await cache.get(cache_key)
+        if cached_details is not None:
+            return cached_details
         
         roadmap = await self.get_roadmap(roadmap_id)
         if not roadmap:
             return None
         
-        # Get course details for each course in the roadmap
+        # Course IDs are stored as strings; match both ObjectId and string _ids
+        course_ids = [course_in_roadmap.course_id for course_in_roadmap in roadmap.courses]
+        lookup_ids: List[Any] = list(course_ids)
+        lookup_ids += [ObjectId(course_id) for course_id in course_ids if ObjectId.is_valid(course_id)]
+        
         db = await get_database()
-        courses_collection = db["courses"]
+        courses = await db[COURSES_COLLECTION].find(
+            {"_id": {"$in": lookup_ids}},
+            COURSE_DETAIL_PROJECTION
+        ).to_list(length=None)
+        courses_by_id = {str(course["_id"]): course for course in courses}
         
         detailed_courses = []
         for course_in_roadmap in roadmap.courses:
-            course_detail = await courses_collection.find_one({"_id": course_in_roadmap.course_id})
+            course_detail = courses_by_id.get(course_in_roadmap.course_id)
             if course_detail:
                 detailed_courses.append({
                     "roadmap_info": course_in_roadmap.model_dump(),
@@ -163,13 +231,35 @@ class RoadmapService(BaseService):
                     }
                 })
         
-        return {
-            "roadmap": roadmap.model_dump(),
+        details = {
+            "roadmap": roadmap.model_dump(mode="json"),
             "courses": detailed_courses
         }
+        await cache.set(cache_key, details)
+        await cache.add_to_sets(
+            [f"{COURSE_ROADMAPS_CACHE_PREFIX}:{course_id}" for course_id in course_ids],
+            roadmap_id
+        )
+        return details
+    
+    async def invalidate_roadmap_details(self, roadmap_id: str) -> None:
+        """Drop the cached course details of a roadmap."""
+        await cache.delete(f"{ROADMAP_COURSES_CACHE_PREFIX}:{roadmap_id}")
+    
+    async def invalidate_course_details(self, course_id: str) -> None:
+        """Drop the cached details of every roadmap containing a course."""
+        reverse_key = f"{COURSE_ROADMAPS_CACHE_PREFIX}:{course_id}"
+        roadmap_ids = await cache.smembers(reverse_key)
+        await cache.delete_many(
+            [f"{ROADMAP_COURSES_CACHE_PREFIX}:{roadmap_id}" for roadmap_id in roadmap_ids] + [reverse_key]
+        )
     
     async def get_student_roadmap_progress(self, student_email: str, roadmap_id: str) -> Dict[str, Any]:
-        """Get a student's progress through a roadmap."""
+        """
+        Get a student's progress through a roadmap and each of its milestones.
+        A course counts as completed when its `{course_id}-final` grade passes;
+        all of them are fetched with a single `$in` query.
+        """
         from ..studentGrades import GradesService
         
         roadmap = await self.get_roadmap(roadmap_id)
@@ -177,18 +267,19 @@ class RoadmapService(BaseService):
             return {"error": "Roadmap not found"}
         
         grades_service = GradesService()
+        course_ids = [course_in_roadmap.course_id for course_in_roadmap in roadmap.courses]
+        grades = await grades_service.get_grades_for_modules(
+            student_email, [f"{course_id}-final" for course_id in course_ids]
+        )
+        
         course_progress = {}
         total_courses = len(roadmap.courses)
         completed_courses = 0
         
-        for course_in_roadmap in roadmap.courses:
-            course_id = course_in_roadmap.course_id
-            
-            # Check if student has completed this course
-            # This is a simplified check - you might want to implement more sophisticated logic
-            grade_record = grades_service.get_grades_by_token(student_email, f"{course_id}-final")
+        for course_id in course_ids:
+            grade_record = grades.get(f"{course_id}-final")
             
-            if grade_record and grade_record.get("grade", 0) >= 40:
+            if grade_record and grade_record.get("grade", 0) >= settings.PASSING_GRADE:
                 course_progress[course_id] = {
                     "completed": True,
                     "grade": grade_record.get("grade"),
@@ -202,6 +293,21 @@ class RoadmapService(BaseService):
                     "completion_date": None
                 }
         
+        milestone_progress = {}
+        for milestone in roadmap.milestones:
+            milestone_total = len(milestone.course_ids)
+            milestone_completed = sum(
+                1 for course_id in milestone.course_ids
+                if course_progress.get(course_id, {}).get("completed")
+            )
+            milestone_progress[milestone.id] = {
+                "title": milestone.title,
+                "completed_courses": milestone_completed,
+                "total_courses": milestone_total,
+                "progress_percentage": (milestone_completed / milestone_total * 100) if milestone_total > 0 else 0,
+                "completed": milestone_completed == milestone_total
+            }
+        
         progress_percentage = (completed_courses / total_courses * 100) if total_courses > 0 else 0
         
         return {
@@ -211,5 +317,6 @@ class RoadmapService(BaseService):
             "completed_courses": completed_courses,
             "total_courses": total_courses,
             "course_progress": course_progress,
+            "milestone_progress": milestone_progress,
             "roadmap_completed": completed_courses == total_courses
-        } 
\ No newline at end of file
+        }
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...core.text_index import CODE_STOP_WORDS, InvertedIndex, snippet
+from ...DB.database import LESSONS_COLLECTION
+from ..base import BaseService
+
+# Seconds before a worker rebuilds its index to pick up other workers' writes
+INDEX_REFRESH_SECONDS = 300
+
+# Searchable fields of each content block type. Exercise solutions are
+# deliberately left out so a search never reveals them.
+BLOCK_TEXT_FIELDS = {
+    "text": ("text",),
+    "code": ("code", "explanation"),
+    "exercise": ("instructions", "hints"),
+    "image": ("alt_text", "caption")
+}
+
+FIELD_WEIGHTS = {"title": 3.0, "text": 1.0}
+
+logger = logging.getLogger(__name__)
+
+
+class _LessonIndex:
+    """
+    A worker's lesson index. Each lesson is indexed as one entry for its
+    title and description ("<id>:") and one per content block
+    ("<id>:<block index>"). Lessons teach code, so keywords such as "for",
+    "in" or "this" stay searchable.
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex(FIELD_WEIGHTS, stop_words=CODE_STOP_WORDS)
+        self.entry_texts: Dict[str, str] = {}
+        self.lessons: Dict[str, Dict[str, Any]] = {}
+
+
+# Index shared by every service instance of this worker
+_current = _LessonIndex()
+_loaded_at: Optional[float] = None
+_reload_task: Optional[asyncio.Task] = None
+# Writes made while a rebuild runs, one log per rebuild, replayed onto the
+# new index before it is swapped in
+_rebuild_logs: List[List[Tuple[str, Any]]] = []
+
+
+class LessonSearchService(BaseService):
+    """
+    BM25-ranked full-text search over the content blocks of published lessons.
+
+    Every block is indexed separately, so each result points at the block
+    that matched best, with a snippet around the first matching word.
+    The index is built with one projected query and updated in place by
+    LessonService writes.
+    """
+
+    def __init__(self):
+        super().__init__(LESSONS_COLLECTION)
+
+    async def search(
+        self,
+        search_term: str,
+        course_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Search lessons, best first, with one result per lesson.
+
+        Returns:
+            Lessons with their ids, title, score, the best matching `block`
+            (index in `content_blocks`, order and type; None when the title
+            or description matched best) and a `snippet` of it
+        """
+        await self.ensure_loaded()
+        current = _current
+
+        def accept(entry_id: str) -> bool:
+            return current.lessons[entry_id.split(":", 1)[0]]["course_id"] == course_id
+
+        best: Dict[str, Any] = {}
+        for entry_id, score in current.index.search(search_term, accept=accept if course_id else None):
+            lesson_id, block_index = entry_id.split(":", 1)
+            if lesson_id not in best:
+                best[lesson_id] = (entry_id, block_index, score)
+            if len(best) >= skip + limit:
+                break
+
+        results = []
+        for lesson_id, (entry_id, block_index, score) in list(best.items())[skip:]:
+            lesson = current.lessons[lesson_id]
+            block = None
+            if block_index:
+                block = {"index": int(block_index), **lesson["blocks"][int(block_index)]}
+            results.append({
+                "lesson_id": lesson_id,
+                "title": lesson["title"],
+                "module_id": lesson["module_id"],
+                "course_id": lesson["course_id"],
+                "score": round(score, 4),
+                "block": block,
+                "snippet": snippet(current.entry_texts[entry_id], search_term, stop_words=CODE_STOP_WORDS)
+            })
+        return results
+
+    async def ensure_loaded(self) -> None:
+        """
+        Build the index if this worker has none. Once it is older than
+        INDEX_REFRESH_SECONDS it is rebuilt in the background, and searches
+        keep using the current index meanwhile. Concurrent callers share
+        one rebuild.
+        """
+        global _reload_task
+        if _loaded_at is not None and time.monotonic() - _loaded_at <= INDEX_REFRESH_SECONDS:
+            return
+        if _reload_task is None or _reload_task.done():
+            _reload_task = asyncio.create_task(self.reload())
+            _reload_task.add_done_callback(_log_reload_failure)
+        if _loaded_at is None:
+            # Nothing to serve yet: wait for the first build
+            await asyncio.shield(_reload_task)
+
+    async def reload(self) -> None:
+        """
+        Rebuild the index from the published lessons into a new index and
+        swap it in. Writes made meanwhile are replayed onto it first.
+        """
+        global _current, _loaded_at
+        log: List[Tuple[str, Any]] = []
+        _rebuild_logs.append(log)
+        try:
+            collection = await self.get_collection()
+            projection = {"title": 1, "description": 1, "module_id": 1, "course_id": 1, "content_blocks": 1}
+            lessons = await collection.find({"status": "published"}, projection).to_list(length=None)
+
+            target = _LessonIndex()
+
+            def build() -> None:
+                for lesson in lessons:
+                    self._add(target, lesson)
+
+            # Built in a thread so searches keep being served
+            await asyncio.to_thread(build)
+            for action, value in log:
+                if action == "add":
+                    self._add(target, value)
+                else:
+                    self._remove(target, value)
+            _current = target
+            _loaded_at = time.monotonic()
+        finally:
+            _rebuild_logs.remove(log)
+
+    def index_lesson(self, lesson: Dict[str, Any]) -> None:
+        """Add, replace or drop a lesson after a write, depending on whether it is published."""
+        if lesson.get("status") != "published":
+            self.remove_lesson(str(lesson["_id"]))
+            return
+        for log in _rebuild_logs:
+            log.append(("add", lesson))
+        if _loaded_at is not None:
+            self._add(_current, lesson)
+
+    def remove_lesson(self, lesson_id: str) -> None:
+        """Remove a lesson and its blocks from this worker's index."""
+        for log in _rebuild_logs:
+            log.append(("remove", lesson_id))
+        self._remove(_current, lesson_id)
+
+    @staticmethod
+    def _remove(target: _LessonIndex, lesson_id: str) -> None:
+        lesson = target.lessons.pop(lesson_id, None)
+        if lesson is None:
+            return
+        for entry_id in [f"{lesson_id}:"] + [f"{lesson_id}:{index}" for index in range(len(lesson["blocks"]))]:
+            target.index.remove(entry_id)
+            target.entry_texts.pop(entry_id, None)
+
+    def _add(self, target: _LessonIndex, lesson: Dict[str, Any]) -> None:
+        lesson_id = str(lesson["_id"])
+        self._remove(target, lesson_id)
+        blocks = lesson.get("content_blocks") or []
+        target.lessons[lesson_id] = {
+            "title": lesson.get("title", ""),
+            "module_id": lesson.get("module_id"),
+            "course_id": lesson.get("course_id"),
+            "blocks": [{"order": block.get("order"), "type": block.get("type")} for block in blocks]
+        }
+
+        summary = " ".join(filter(None, [lesson.get("title"), lesson.get("description")]))
+        target.index.add(f"{lesson_id}:", {"title": lesson.get("title"), "text": lesson.get("description")})
+        target.entry_texts[f"{lesson_id}:"] = summary
+        for index, block in enumerate(blocks):
+            text = self._block_text(block)
+            if text:
+                target.index.add(f"{lesson_id}:{index}", {"text": text})
+                target.entry_texts[f"{lesson_id}:{index}"] = text
+
+    @staticmethod
+    def _block_text(block: Dict[str, Any]) -> str:
+        """Extract the searchable text of a content block."""
+        content = block.get("content") or {}
+        texts = []
+        for field in BLOCK_TEXT_FIELDS.get(block.get("type"), ()):
+            value = content.get(field)
+            if isinstance(value, list):
+                texts.extend(str(item) for item in value)
+            elif value:
+                texts.append(str(value))
+        return "\n".join(texts)
+
+
+def _log_reload_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Could not rebuild the lesson search index", exc_info=task.exception())
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ...core.text_index import PrefixIndex
+from ...DB.database import get_database, COURSES_COLLECTION, MODULES_COLLECTION, LESSONS_COLLECTION
+
+# Seconds before a worker rebuilds its index to pick up other workers' writes
+SUGGEST_REFRESH_SECONDS = 300
+
+# Suggestion type -> collection it is built from
+SUGGESTION_SOURCES = {
+    "course": COURSES_COLLECTION,
+    "module": MODULES_COLLECTION,
+    "lesson": LESSONS_COLLECTION
+}
+
+SUGGESTION_PROJECTION = {"title": 1, "tags": 1, "course_id": 1, "module_id": 1}
+
+logger = logging.getLogger(__name__)
+
+# Index shared by every service instance of this worker
+_index = PrefixIndex()
+_loaded_at: Optional[float] = None
+_refresh_task: Optional[asyncio.Task] = None
+# Writes made while a rebuild runs, one log per rebuild, replayed onto the
+# new index before it is swapped in
+_rebuild_logs: List[List[Tuple[str, Any]]] = []
+
+
+class SuggestService:
+    """
+    Typeahead suggestions over the titles (and course tags) of published
+    courses, modules and lessons.
+
+    Titles are held in an in-process prefix index built with one projected
+    query per collection and updated in place by the course, module and
+    lesson services, so a lookup never reaches the database.
+    """
+
+    async def suggest(
+        self,
+        query: str,
+        types: Optional[Sequence[str]] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Suggest titles completing the query, best first.
+
+        Args:
+            query: Text typed so far; its last word is matched as a prefix
+            types: Suggestion types to include (course, module, lesson), all by default
+            limit: Maximum number of suggestions
+        """
+        await self.ensure_loaded()
+        accept = None
+        if types:
+            wanted = set(types)
+            accept = lambda payload: payload["type"] in wanted
+        return _index.lookup(query, accept=accept, limit=limit)
+
+    async def ensure_loaded(self) -> None:
+        """
+        Build the index if this worker has none. Once it is older than
+        SUGGEST_REFRESH_SECONDS it is rebuilt in the background, and
+        lookups keep using the current index meanwhile. Concurrent callers
+        share one rebuild.
+        """
+        global _refresh_task
+        if _loaded_at is not None and time.monotonic() - _loaded_at <= SUGGEST_REFRESH_SECONDS:
+            return
+        if _refresh_task is None or _refresh_task.done():
+            _refresh_task = asyncio.create_task(self.reload())
+            _refresh_task.add_done_callback(_log_refresh_failure)
+        if _loaded_at is None:
+            # Nothing to serve yet: wait for the first build
+            await asyncio.shield(_refresh_task)
+
+    async def reload(self) -> None:
+        """
+        Rebuild the index from the published courses, modules and lessons
+        into a new index and swap it in. Writes made meanwhile are replayed
+        onto it first.
+        """
+        global _index, _loaded_at
+        log: List[Tuple[str, Any]] = []
+        _rebuild_logs.append(log)
+        try:
+            db = await get_database()
+            documents = {
+                suggestion_type: await db[collection_name].find(
+                    {"status": "published"},
+                    SUGGESTION_PROJECTION
+                ).to_list(length=None)
+                for suggestion_type, collection_name in SUGGESTION_SOURCES.items()
+            }
+            # Built in a thread so lookups keep being served
+            index = PrefixIndex()
+            await asyncio.to_thread(index.load, [
+                self._entry(suggestion_type, document)
+                for suggestion_type, type_documents in documents.items()
+                for document in type_documents
+            ])
+            for action, value in log:
+                if action == "add":
+                    index.add(*value)
+                else:
+                    index.remove(value)
+            _index = index
+            _loaded_at = time.monotonic()
+        finally:
+            _rebuild_logs.remove(log)
+
+    def index_document(self, suggestion_type: str, document: Dict[str, Any]) -> None:
+        """
+        Add, replace or drop a course, module or lesson after a write,
+        depending on whether it is published.
+        """
+        if document.get("status") != "published":
+            self.remove_document(suggestion_type, str(document["_id"]))
+            return
+        entry = self._entry(suggestion_type, document)
+        for log in _rebuild_logs:
+            log.append(("add", entry))
+        if _loaded_at is not None:
+            _index.add(*entry)
+
+    def remove_document(self, suggestion_type: str, document_id: str) -> None:
+        """Remove a course, module or lesson from this worker's index."""
+        entry_id = f"{suggestion_type}:{document_id}"
+        for log in _rebuild_logs:
+            log.append(("remove", entry_id))
+        _index.remove(entry_id)
+
+    @staticmethod
+    def _entry(
+        suggestion_type: str,
+        document: Dict[str, Any]
+    ) -> Tuple[str, str, Dict[str, Any], Iterable[str]]:
+        """The (entry ID, label, payload, extra texts) of a document in the index."""
+        document_id = str(document["_id"])
+        payload = {"type": suggestion_type, "id": document_id, "title": document.get("title", "")}
+        for parent_field in ("course_id", "module_id"):
+            if document.get(parent_field):
+                payload[parent_field] = document[parent_field]
+        return f"{suggestion_type}:{document_id}", payload["title"], payload, document.get("tags") or ()
+
+
+def _log_refresh_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Could not refresh the suggestion index", exc_info=task.exception())
@@ -0,0 +1,180 @@
+from typing import Any, Dict, List, Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.DB.database import get_database, STUDENT_GRADES_COLLECTION, STUDENT_GRADE_SUMMARIES_COLLECTION
+from app.services.base import BaseService
+
+
+def encode_grade_key(key: str) -> str:
+    """Escape a grade key so it is a valid MongoDB field name."""
+    return key.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def decode_grade_key(key: str) -> str:
+    """Reverse encode_grade_key."""
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+
+class GradeSummaryService(BaseService):
+    """
+    Service for the materialized per-student grade summary.
+
+    One document per student (`_id` is the email) maps every assessment to
+    the student's grade, as stored in `student_grades`, so all access checks
+    for a student need a single read. Grade writes `$set` the new value, so
+    a lowered or corrected grade reaches the summary too.
+
+    Summaries created by a write before the student's older grades were
+    summarized lack the `complete` flag; they are completed from
+    `student_grades` on first read. Every grade write bumps the summary
+    `version`, and a rebuild only writes over the version it started from,
+    so a grade recorded while the rebuild was reading is never overwritten
+    with the older value.
+    """
+
+    def __init__(self):
+        super().__init__(STUDENT_GRADE_SUMMARIES_COLLECTION)
+
+    async def record_grades(self, email: str, grades: Dict[str, float]) -> None:
+        """Store the student's new grades."""
+        if not grades:
+            return
+        collection = await self.get_collection()
+        await collection.update_one(
+            {"_id": email},
+            self._set_update(grades),
+            upsert=True
+        )
+
+    async def record_many(self, grades_by_email: Dict[str, Dict[str, float]]) -> None:
+        """Update the summaries of several students in one bulk_write."""
+        operations = [
+            UpdateOne({"_id": email}, self._set_update(grades), upsert=True)
+            for email, grades in grades_by_email.items()
+            if grades
+        ]
+        if operations:
+            collection = await self.get_collection()
+            await collection.bulk_write(operations, ordered=False)
+
+    async def get_summary(self, email: str) -> Dict[str, float]:
+        """
+        Get the student's grade per assessment.
+        One read, plus a one-time rebuild for students not yet summarized.
+        """
+        collection = await self.get_collection()
+        summary = await collection.find_one({"_id": email})
+        if not summary or not summary.get("complete"):
+            return await self.rebuild(email)
+        return self._decode(summary)
+
+    async def get_summaries(self, emails: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Get the summaries of several students with one `$in` read, plus one
+        batched rebuild for the students not yet summarized.
+        """
+        collection = await self.get_collection()
+        summaries = await collection.find({"_id": {"$in": emails}}).to_list(length=None)
+        result: Dict[str, Dict[str, float]] = {
+            summary["_id"]: self._decode(summary)
+            for summary in summaries
+            if summary.get("complete")
+        }
+
+        missing = [email for email in emails if email not in result]
+        if missing:
+            rebuilt = await self.rebuild_many(missing)
+            for email in missing:
+                result[email] = rebuilt.get(email, {})
+        return result
+
+    async def rebuild_many(self, emails: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize several students from `student_grades` with one `$in` read
+        and one bulk_write, marking their summaries complete.
+        """
+        db = await get_database()
+        collection = await self.get_collection()
+        versions = {
+            summary["_id"]: summary.get("version")
+            for summary in await collection.find({"_id": {"$in": emails}}, {"version": 1}).to_list(length=None)
+        }
+        grades_by_email: Dict[str, Dict[str, float]] = {email: {} for email in emails}
+        cursor = db[STUDENT_GRADES_COLLECTION].find(
+            {"email": {"$in": emails}},
+            {"_id": 0, "email": 1, "module": 1, "grade": 1}
+        )
+        async for grade in cursor:
+            if grade.get("grade") is None:
+                continue
+            grades_by_email.setdefault(grade["email"], {})[grade["module"]] = grade["grade"]
+
+        operations = []
+        for email, grades in grades_by_email.items():
+            update = self._set_update(grades)
+            update.setdefault("$set", {})["complete"] = True
+            operations.append(UpdateOne(self._version_filter(email, versions.get(email)), update, upsert=True))
+        if operations:
+            try:
+                await collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Summaries written since their version was read are left
+                # incomplete and rebuilt on their next read
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+        return grades_by_email
+
+    async def rebuild(self, email: str) -> Dict[str, float]:
+        """Summarize the student's grades from `student_grades` and mark the summary complete."""
+        db = await get_database()
+        collection = await self.get_collection()
+        current = await collection.find_one({"_id": email}, {"version": 1})
+        grades: Dict[str, float] = {}
+        async for grade in db[STUDENT_GRADES_COLLECTION].find({"email": email}, {"_id": 0, "module": 1, "grade": 1}):
+            if grade.get("grade") is None:
+                continue
+            grades[grade["module"]] = grade["grade"]
+
+        update = self._set_update(grades)
+        update.setdefault("$set", {})["complete"] = True
+        try:
+            summary = await collection.find_one_and_update(
+                self._version_filter(email, current.get("version") if current else None),
+                update,
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A grade was recorded since the version was read: keep that
+            # write and leave the summary to be rebuilt on its next read
+            return grades
+        return self._decode(summary) if summary else grades
+
+    async def delete_summary(self, email: str) -> None:
+        """Drop the student's summary (rebuilt on next read)."""
+        collection = await self.get_collection()
+        await collection.delete_one({"_id": email})
+
+    @staticmethod
+    def _set_update(grades: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+        if not grades:
+            return {"$setOnInsert": {"grades": {}}, "$inc": {"version": 1}}
+        return {
+            "$set": {f"grades.{encode_grade_key(key)}": grade for key, grade in grades.items()},
+            "$inc": {"version": 1}
+        }
+
+    @staticmethod
+    def _version_filter(email: str, version: Optional[int]) -> Dict[str, Any]:
+        """
+        Match the student's summary only while it is still at `version`.
+        When it has moved on, the upsert collides with the existing `_id`
+        and fails instead of overwriting newer grades.
+        """
+        return {"_id": email, "version": version if version is not None else {"$exists": False}}
+
+    @staticmethod
+    def _decode(summary: Optional[dict]) -> Dict[str, float]:
+        if not summary:
+            return {}
+        return {decode_grade_key(key): grade for key, grade in summary.get("grades", {}).items()}
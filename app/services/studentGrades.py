@@ -1,84 +1,281 @@
-from typing import Optional
-from pymongo.results import InsertOneResult, UpdateResult
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.core.streaming import ParsedRow
 from app.models.studentGrades import StudentGrades  # Importamos el modelo correcto
-from app.DB.database import get_database
+from app.DB.database import STUDENT_GRADES_COLLECTION
+from app.services.base import BaseService
+from app.services.analytics.grade_analytics_service import GradeAnalyticsService
+from app.services.studentGradeSummaries import GradeSummaryService
+from app.services.module_access_cache import ModuleAccessCache
 
-class GradesService:
+# Maximum number of row errors echoed back by a bulk import (the count is always exact)
+MAX_IMPORT_ERRORS = 100
+
+# Fields returned by listings and exports
+GRADE_FIELDS = ["email", "module", "grade", "date_assigned"]
+
+# Documents fetched per cursor round-trip while exporting
+EXPORT_BATCH_SIZE = 1000
+
+class GradesService(BaseService):
     """
     Service for managing student grades in the database.
     Handles all operations related to storing and updating student grades.
+    Grades are unique per (email, module), enforced by a unique index.
+    Every write also updates the student's materialized grade summary.
     """
 
     def __init__(self):
-        self.db = get_database()
-        if self.db is None:
-            raise Exception("Could not connect to the database")
-        self.collection = self.db["student_grades"]
+        super().__init__(STUDENT_GRADES_COLLECTION)
+        self.summaries = GradeSummaryService()
+        self.access_cache = ModuleAccessCache()
 
-    def create_grade(self, student_grades: StudentGrades) -> dict:
+    async def create_grade(self, student_grades: StudentGrades) -> dict:
         """
-        Create  the student's grade in the database.
+        Create the student's grade in the database.
+        Single upsert round-trip: inserts only if no grade exists for (email, module).
         """
         email = student_grades.email.strip()
         module = student_grades.module.strip()
-        existing_grades = self.get_grades_by_email(email, module)
-        if not existing_grades:
-            # Si no existe, se crea una nueva entrada
-            data = student_grades.dict()
-            data['email'] = email
-            data['module'] = module
-            result = self.collection.insert_one(data)
-            return {"message": "Grade created successfully", "inserted_id": str(result.inserted_id)}
-        # Add this line to handle the case when the grade already exists
-        return {"message": "Grade already exists"}
-        
+        data = student_grades.model_dump()
+        data['email'] = email
+        data['module'] = module
 
+        collection = await self.get_collection()
+        try:
+            result = await collection.update_one(
+                {"email": email, "module": module},
+                {"$setOnInsert": data},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # A concurrent request inserted the same grade first
+            return {"message": "Grade already exists"}
 
-    def update_grades(self, student_grades: StudentGrades) -> dict:
+        if result.upserted_id is None:
+            return {"message": "Grade already exists"}
+        await self.summaries.record_grades(email, {module: student_grades.grade})
+        await self._after_write([email])
+        return {"message": "Grade created successfully", "inserted_id": str(result.upserted_id)}
+
+    async def update_grades(self, student_grades: StudentGrades) -> dict:
         """
         Update the student's grade in the database.
         If the student already has grades for a specific module, update them.
         """
         email = student_grades.email.strip()
         module = student_grades.module.strip()
-        existing_grades = self.get_grades_by_email(email, module)
-
-        if existing_grades:
-            # Si la calificación ya existe, se actualiza
-            update_data = {"grade": student_grades.grade}
-            result = self.collection.update_one(
-                {"email": email, "module": module},
-                {"$set": update_data}
-            )
-            return {"message": "Grade updated successfully", "updated_count": result.modified_count}
-        return {"message": "Grade not found"}
 
+        collection = await self.get_collection()
+        result = await collection.update_one(
+            {"email": email, "module": module},
+            {"$set": {"grade": student_grades.grade}}
+        )
+        if result.matched_count == 0:
+            return {"message": "Grade not found"}
+        if result.modified_count:
+            await self.summaries.record_grades(email, {module: student_grades.grade})
+            await self._after_write([email])
+        return {"message": "Grade updated successfully", "updated_count": result.modified_count}
 
-    def get_grades_by_email(self, email: str, module: str) -> Optional[dict]:
+    async def get_grades_by_email(self, email: str, module: str) -> Optional[dict]:
         """
         Retrieve student grades by their email and module.
         """
-        print(f"Buscando: email='{email}', module='{module}'")
-        student_grades = self.collection.find_one({"email": email.strip(), "module": module.strip()})
-        print(f"Resultado: {student_grades}")
+        collection = await self.get_collection()
+        student_grades = await collection.find_one({"email": email.strip(), "module": module.strip()})
         if student_grades:
             student_grades["_id"] = str(student_grades["_id"])  # Convertimos el ObjectId a string
         return student_grades
 
-    def list_grades(self) -> list:
+    async def get_grades_for_modules(self, email: str, modules: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve a student's grades for several modules with one `$in` query.
+        Returns the grades keyed by module; modules without a grade are absent.
+        """
+        collection = await self.get_collection()
+        cursor = collection.find(
+            {"email": email.strip(), "module": {"$in": [module.strip() for module in modules]}},
+            {"_id": 0, "module": 1, "grade": 1, "date_assigned": 1}
+        )
+        return {grade["module"]: grade async for grade in cursor}
+
+    async def list_grades(
+        self,
+        module: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        after: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List one page of grades in `_id` order.
+
+        `after` is the cursor returned with the previous page. Returns the page
+        and the cursor of the next one (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is not a valid ID
+        """
+        query = self._grades_query(module, date_from, date_to)
+        if after:
+            if not ObjectId.is_valid(after):
+                raise ValueError("Invalid cursor")
+            query["_id"] = {"$gt": ObjectId(after)}
+
+        collection = await self.get_collection()
+        projection = {field: 1 for field in GRADE_FIELDS}
+        grades = await collection.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(grades) > limit:
+            grades = grades[:limit]
+            next_cursor = str(grades[-1]["_id"])
+        return [{**grade, "_id": str(grade["_id"])} for grade in grades], next_cursor
+
+    async def iter_grades(
+        self,
+        module: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        List all grades in the database.
+        Stream every matching grade from a batched cursor.
+        Only one cursor batch is held in memory at a time.
         """
-        grades = list(self.collection.find())
-        return [{**grade, "_id": str(grade["_id"])} for grade in grades]
+        collection = await self.get_collection()
+        projection = {"_id": 0, **{field: 1 for field in GRADE_FIELDS}}
+        cursor = collection.find(self._grades_query(module, date_from, date_to), projection).batch_size(EXPORT_BATCH_SIZE)
+        async for grade in cursor:
+            yield grade
 
-    def delete_grades_by_email(self, email: str) -> dict:
+    @staticmethod
+    def _grades_query(
+        module: Optional[str],
+        date_from: Optional[date],
+        date_to: Optional[date]
+    ) -> Dict[str, Any]:
+        """
+        Build the filter shared by listings and exports.
+        `date_assigned` is an ISO date string, so ranges compare as strings;
+        `date_to` is inclusive of the whole day.
+        """
+        query: Dict[str, Any] = {}
+        if module:
+            query["module"] = module.strip()
+        date_range: Dict[str, str] = {}
+        if date_from:
+            date_range["$gte"] = date_from.isoformat()
+        if date_to:
+            date_range["$lt"] = (date_to + timedelta(days=1)).isoformat()
+        if date_range:
+            query["date_assigned"] = date_range
+        return query
+
+    async def delete_grades_by_email(self, email: str) -> dict:
         """
         Delete all grades for a student by their email.
         """
         email = email.strip()
-        result = self.collection.delete_many({"email": email})
+        collection = await self.get_collection()
+        result = await collection.delete_many({"email": email})
+        await self.summaries.delete_summary(email)
+        if result.deleted_count:
+            await self._after_write([email])
         return {
             "message": f"Deleted {result.deleted_count} grades for student with email: {email}",
             "deleted_count": result.deleted_count
         }
+
+    async def import_grades(self, rows: AsyncIterator[ParsedRow], batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Upsert a stream of grade rows in bulk_write batches.
+        Invalid rows are reported and skipped; they never abort the import.
+        Memory stays bounded by the batch size and the reported errors.
+        """
+        report: Dict[str, Any] = {
+            "processed": 0,
+            "upserted": 0,
+            "modified": 0,
+            "failed": 0,
+            "errors": []
+        }
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        async for line_number, row in rows:
+            report["processed"] += 1
+            if isinstance(row, Exception):
+                self._record_import_error(report, line_number, str(row))
+                continue
+            try:
+                student_grades = StudentGrades.model_validate(row)
+            except ValidationError as e:
+                reason = "; ".join(
+                    f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                )
+                self._record_import_error(report, line_number, reason)
+                continue
+
+            data = student_grades.model_dump()
+            data["email"] = student_grades.email.strip()
+            data["module"] = student_grades.module.strip()
+            batch.append((line_number, data))
+
+            if len(batch) >= batch_size:
+                await self._write_import_batch(batch, report)
+                batch = []
+
+        if batch:
+            await self._write_import_batch(batch, report)
+        return report
+
+    async def _after_write(self, emails: List[str]) -> None:
+        """Invalidate data derived from the grades of these students."""
+        await GradeAnalyticsService.invalidate()
+        await self.access_cache.invalidate(emails)
+
+    async def _write_import_batch(
+        self,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        report: Dict[str, Any]
+    ) -> None:
+        """
+        Write one import batch, mapping write errors back to their lines,
+        then update the summaries of the rows that were written.
+        """
+        operations = [
+            UpdateOne({"email": data["email"], "module": data["module"]}, {"$set": data}, upsert=True)
+            for _, data in batch
+        ]
+        failed_indexes = set()
+        collection = await self.get_collection()
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            report["upserted"] += result.upserted_count
+            report["modified"] += result.modified_count
+        except BulkWriteError as e:
+            details = e.details
+            report["upserted"] += details.get("nUpserted", 0)
+            report["modified"] += details.get("nModified", 0)
+            for error in details.get("writeErrors", []):
+                failed_indexes.add(error["index"])
+                self._record_import_error(report, batch[error["index"]][0], error.get("errmsg", "Write error"))
+
+        grades_by_email: Dict[str, Dict[str, float]] = {}
+        for index, (_, data) in enumerate(batch):
+            if index not in failed_indexes:
+                grades_by_email.setdefault(data["email"], {})[data["module"]] = data["grade"]
+        if grades_by_email:
+            await self.summaries.record_many(grades_by_email)
+            await self._after_write(list(grades_by_email))
+
+    @staticmethod
+    def _record_import_error(report: Dict[str, Any], line_number: int, reason: str) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_IMPORT_ERRORS:
+            report["errors"].append({"line": line_number, "error": reason})
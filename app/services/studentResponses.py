@@ -1,60 +1,122 @@
 # src/services/responses_service.py
-from typing import Optional, List
-from pymongo.results import InsertOneResult, UpdateResult
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.models.studentResponses import StudentResponses
-from app.DB.database import get_database
+from app.DB.database import STUDENT_RESPONSES_COLLECTION
+from app.services.base import BaseService
 
-class ResponsesService:
+# Columns of the CSV export, one row per answer
+RESPONSE_CSV_FIELDS = ["email", "question_id", "answer"]
+
+# Documents fetched per cursor round-trip while exporting
+EXPORT_BATCH_SIZE = 500
+
+class ResponsesService(BaseService):
     """
     Service for managing student responses in the database.
     Handles all operations related to storing and updating student responses.
+    Responses are unique per email, enforced by a unique index.
     """
 
     def __init__(self):
-        self.db = get_database()
-        if self.db is None:
-            raise Exception("Could not connect to the database")
-        self.collection = self.db["student_responses"]
+        super().__init__(STUDENT_RESPONSES_COLLECTION)
 
-    def create_responses(self, student_responses: StudentResponses) -> dict:
+    async def create_responses(self, student_responses: StudentResponses) -> dict:
         """
         Create or update the student's responses in the database.
-        If the student already has responses, updates them.
+        If the student already has responses, updates them. Single upsert round-trip.
         """
-        existing_responses = self.get_responses_by_token(student_responses.email)
-        if existing_responses:
-            update_data = student_responses.dict(exclude_unset=True)
-            result = self.collection.update_one(
-                {"email": student_responses.email},
-                {"$set": update_data}
-            )
-            return {"updated_count": result.modified_count}
+        provided = student_responses.model_dump(exclude_unset=True)
+        update: Dict[str, Any] = {"$set": provided}
+        defaults = {
+            field: value for field, value in student_responses.model_dump().items()
+            if field not in provided
+        }
+        if defaults:
+            # New documents still store every field, as the old insert did
+            update["$setOnInsert"] = defaults
 
-        result = self.collection.insert_one(student_responses.dict())
-        return {"inserted_id": str(result.inserted_id)}
+        collection = await self.get_collection()
+        for attempt in range(2):
+            try:
+                result = await collection.update_one(
+                    {"email": student_responses.email},
+                    update,
+                    upsert=True
+                )
+                break
+            except DuplicateKeyError:
+                # A concurrent request inserted the student's document first;
+                # retrying matches it and updates it instead
+                if attempt:
+                    raise
+        if result.upserted_id is not None:
+            return {"inserted_id": str(result.upserted_id)}
+        return {"updated_count": result.modified_count}
 
-    def get_responses_by_token(self, email: str) -> Optional[dict]:
+    async def get_responses_by_token(self, email: str) -> Optional[dict]:
         """
         Retrieve student responses by their token.
         """
-        student_responses = self.collection.find_one({"email": email})
+        collection = await self.get_collection()
+        student_responses = await collection.find_one({"email": email})
         if student_responses:
             student_responses["_id"] = str(student_responses["_id"])
         return student_responses
 
-    def list_all_responses(self) -> List[dict]:
+    async def list_all_responses(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """
-        List all responses from the database.
+        List one page of responses in `_id` order.
+
+        `after` is the cursor returned with the previous page. Returns the page
+        and the cursor of the next one (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is not a valid ID
         """
-        responses = list(self.collection.find())
-        return [{**response, "_id": str(response["_id"])} for response in responses]
+        query: Dict[str, Any] = {}
+        if after:
+            if not ObjectId.is_valid(after):
+                raise ValueError("Invalid cursor")
+            query["_id"] = {"$gt": ObjectId(after)}
+
+        collection = await self.get_collection()
+        responses = await collection.find(query).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(responses) > limit:
+            responses = responses[:limit]
+            next_cursor = str(responses[-1]["_id"])
+        return [{**response, "_id": str(response["_id"])} for response in responses], next_cursor
+
+    async def iter_responses(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every student's responses from a batched cursor.
+        Only one cursor batch is held in memory at a time.
+        """
+        collection = await self.get_collection()
+        cursor = collection.find({}, {"_id": 0, "email": 1, "responses": 1}).batch_size(EXPORT_BATCH_SIZE)
+        async for response in cursor:
+            yield response
+
+    async def iter_answers(self) -> AsyncIterator[Dict[str, Any]]:
+        """Stream responses flattened to one `email, question_id, answer` row per answer."""
+        async for response in self.iter_responses():
+            for answer in response.get("responses", []):
+                yield {"email": response.get("email"), **answer}
 
-    def delete_responses_by_email(self, email: str) -> dict:
+    async def delete_responses_by_email(self, email: str) -> dict:
         """
         Delete all responses for a student by their email.
         """
         email = email.strip()
-        result = self.collection.delete_many({"email": email})
+        collection = await self.get_collection()
+        result = await collection.delete_many({"email": email})
         return {
             "message": f"Deleted {result.deleted_count} responses for student with email: {email}",
             "deleted_count": result.deleted_count
@@ -0,0 +1,125 @@
+"""
+Compare the two content progress storage layouts (see PROGRESS_LAYOUTS).
+
+    python -m app.tools.benchmark_progress_layout [--sizes 10 100 1000] [--repeats 50]
+
+For courses of each size, one user's progress is filled with every content
+item, then the latency of one more content update and of reading the
+progress back is measured, along with the size of the CourseProgress
+document. Runs against a scratch "<DATABASE_NAME>_progress_benchmark"
+database that is dropped afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List, Sequence
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from ..DB import database
+from ..DB.database import (
+    DATABASE_NAME,
+    MONGODB_URL,
+    MODULES_COLLECTION,
+    PROGRESS_COLLECTION,
+    CONTENT_PROGRESS_COLLECTION
+)
+from ..services.progress.progress_service import PROGRESS_LAYOUTS, ProgressService
+
+CONTENTS_PER_MODULE = 10
+
+
+async def _seed_course(course_id: str, size: int) -> List[tuple]:
+    """Create the modules of a course with `size` lessons; returns (module_id, lesson_id) pairs."""
+    db = await database.get_database()
+    contents = []
+    for first in range(0, size, CONTENTS_PER_MODULE):
+        lesson_ids = [f"{course_id}-l{index}" for index in range(first, min(first + CONTENTS_PER_MODULE, size))]
+        result = await db[MODULES_COLLECTION].insert_one({"course_id": course_id, "lesson_ids": lesson_ids})
+        contents.extend((str(result.inserted_id), lesson_id) for lesson_id in lesson_ids)
+    return contents
+
+
+async def _measure(layout: str, size: int, repeats: int) -> Dict[str, Any]:
+    service = ProgressService(layout=layout)
+    course_id = f"{layout}-{size}"
+    contents = await _seed_course(course_id, size)
+
+    for index, (module_id, content_id) in enumerate(contents):
+        await service.update_content_progress(
+            "user", course_id, module_id, content_id,
+            time_spent=30, last_position={"offset": index}, completed=index % 2 == 0
+        )
+
+    write_ms = []
+    read_ms = []
+    module_id, content_id = contents[-1]
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await service.update_content_progress(
+            "user", course_id, module_id, content_id, time_spent=5
+        )
+        write_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await service.get_course_progress("user", course_id)
+        read_ms.append((time.perf_counter() - started) * 1000)
+
+    db = await database.get_database()
+    course_document = await db[PROGRESS_COLLECTION].find_one({"user_id": "user", "course_id": course_id})
+    return {
+        "layout": layout,
+        "contents": size,
+        "write_ms": statistics.median(write_ms),
+        "read_ms": statistics.median(read_ms),
+        "document_bytes": len(bson.encode(course_document))
+    }
+
+
+async def run_benchmark(sizes: Sequence[int] = (10, 100, 1000), repeats: int = 50) -> List[Dict[str, Any]]:
+    """
+    Measure both layouts for every course size.
+
+    Returns:
+        One row per (layout, size) with the median write and read latencies
+        in milliseconds and the CourseProgress document size in bytes
+    """
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[f"{DATABASE_NAME}_progress_benchmark"]
+    await client.drop_database(db.name)
+    await db[PROGRESS_COLLECTION].create_index([("user_id", 1), ("course_id", 1)], unique=True)
+    await db[CONTENT_PROGRESS_COLLECTION].create_index(
+        [("user_id", 1), ("course_id", 1), ("module_id", 1), ("content_id", 1)],
+        unique=True
+    )
+    await db[MODULES_COLLECTION].create_index("course_id")
+
+    previous_db = database._db
+    database._db = db
+    try:
+        return [await _measure(layout, size, repeats) for size in sizes for layout in PROGRESS_LAYOUTS]
+    finally:
+        database._db = previous_db
+        await client.drop_database(db.name)
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the content progress storage layouts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = asyncio.run(run_benchmark(args.sizes, args.repeats))
+    print(f"{'layout':<12}{'contents':>10}{'write ms':>12}{'read ms':>12}{'doc bytes':>12}")
+    for row in rows:
+        print(
+            f"{row['layout']:<12}{row['contents']:>10}{row['write_ms']:>12.2f}"
+            f"{row['read_ms']:>12.2f}{row['document_bytes']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Bring data written by earlier versions up to the current schema, then build
+the unique indexes that the legacy data prevented.
+
+    python -m app.tools.migrate_legacy_data
+
+- modules, lessons and assessments: the dense stored `order` becomes a sparse `rank`
+- student grades and responses: documents duplicating an older one's key are deleted
+- progress documents: the completion counters are seeded and module statuses made to match them
+
+Every step only touches documents still in the old shape, so the command can
+be run again after an interruption (or on an already migrated database).
+Run it once when upgrading, before starting the new version.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+from ..DB import database
+from ..DB.database import (
+    get_database,
+    ASSESSMENTS_COLLECTION,
+    LESSONS_COLLECTION,
+    MODULES_COLLECTION,
+    PROGRESS_COLLECTION,
+    STUDENT_GRADES_COLLECTION,
+    STUDENT_RESPONSES_COLLECTION
+)
+from ..models.progress.progress import ProgressStatus
+from ..services.ordering import RANK_GAP
+
+# Legacy progress documents read per batch when seeding their counters
+PROGRESS_BACKFILL_BATCH_SIZE = 500
+
+
+async def migrate_order_to_rank(collection_name: str, parent_field: str) -> None:
+    """
+    Converts documents still using the dense stored `order` field to the sparse
+    `rank` field and drops the old unique (order, parent) index.
+    Ranks follow the legacy order, ties (duplicate or missing `order`) broken
+    by `_id`, so the unique (parent, rank) index can always be built.
+    Legacy documents of a parent that already has ranked documents go last.
+    """
+    db = await get_database()
+    collection = db[collection_name]
+
+    try:
+        await collection.drop_index(f"order_1_{parent_field}_1")
+    except OperationFailure:
+        # Index already dropped
+        pass
+
+    legacy: Dict[Any, list] = {}
+    async for document in collection.find(
+        {"rank": {"$exists": False}},
+        {parent_field: 1, "order": 1}
+    ).sort([(parent_field, 1), ("order", 1), ("_id", 1)]):
+        legacy.setdefault(document.get(parent_field), []).append(document["_id"])
+
+    for parent_id, document_ids in legacy.items():
+        last = await collection.find(
+            {parent_field: parent_id, "rank": {"$exists": True}},
+            {"rank": 1}
+        ).sort("rank", -1).limit(1).to_list(1)
+        base = last[0]["rank"] if last else 0
+        await collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": document_id},
+                    {"$set": {"rank": base + (index + 1) * RANK_GAP}, "$unset": {"order": ""}}
+                )
+                for index, document_id in enumerate(document_ids)
+            ],
+            ordered=False
+        )
+
+
+async def drop_duplicates(collection_name: str, key_fields: list) -> None:
+    """
+    Deletes documents duplicating the key of an older one, so a unique index
+    on `key_fields` can be built. The oldest document is kept: it is the one
+    the services read and updated before the key was unique.
+    Skipped once the unique index exists.
+    """
+    db = await get_database()
+    collection = db[collection_name]
+    index_name = "_".join(f"{field}_1" for field in key_fields)
+    if index_name in await collection.index_information():
+        return
+
+    duplicates = collection.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {field: f"${field}" for field in key_fields},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    async for group in duplicates:
+        await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+
+
+async def backfill_progress_counters(batch_size: int = PROGRESS_BACKFILL_BATCH_SIZE) -> None:
+    """
+    Seeds the completion counters of progress documents written before they
+    existed, from the modules' lesson and assessment IDs. A module counts as
+    completed when every one of its contents is, whatever its legacy status
+    said; the status is rewritten to agree with the counters.
+    Documents are read in `_id` order, `batch_size` at a time, and each batch
+    is written before the next one is read, so memory stays bounded and an
+    interrupted run resumes where it stopped: only documents without
+    counters are touched.
+    """
+    db = await get_database()
+    completed_status = ProgressStatus.COMPLETED.value
+    now = datetime.utcnow()
+    structures: Dict[str, Dict[str, set]] = {}
+    last_id = None
+    while True:
+        legacy_filter: Dict[str, Any] = {"completed_count": {"$exists": False}}
+        if last_id is not None:
+            legacy_filter["_id"] = {"$gt": last_id}
+        legacy = await db[PROGRESS_COLLECTION].find(
+            legacy_filter,
+            {"course_id": 1, "module_progress": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not legacy:
+            return
+        last_id = legacy[-1]["_id"]
+
+        course_ids = list({progress["course_id"] for progress in legacy} - set(structures))
+        structures.update({course_id: {} for course_id in course_ids})
+        if course_ids:
+            async for module in db[MODULES_COLLECTION].find(
+                {"course_id": {"$in": course_ids}},
+                {"course_id": 1, "lesson_ids": 1, "assessment_ids": 1}
+            ):
+                structures[module["course_id"]][str(module["_id"])] = (
+                    set(module.get("lesson_ids") or []) | set(module.get("assessment_ids") or [])
+                )
+
+        operations = []
+        for progress in legacy:
+            structure = structures[progress["course_id"]]
+            fields: Dict[str, Any] = {
+                "total_count": sum(len(contents) for contents in structure.values()),
+                "total_modules": len(structure),
+                "completed_count": 0,
+                "completed_modules": 0
+            }
+            reopened: Dict[str, str] = {}
+            for module_id, module in (progress.get("module_progress") or {}).items():
+                contents = structure.get(module_id, set())
+                completed = sum(
+                    1 for content_id, content in (module.get("content_progress") or {}).items()
+                    if content_id in contents and content.get("status") == completed_status
+                )
+                fields[f"module_progress.{module_id}.completed_count"] = completed
+                fields[f"module_progress.{module_id}.total_count"] = len(contents)
+                fields["completed_count"] += completed
+                # Modules no longer in the course do not count, and keep their status
+                if module_id not in structure:
+                    continue
+                done = bool(contents) and completed == len(contents)
+                fields["completed_modules"] += done
+                if done == (module.get("status") == completed_status):
+                    continue
+                prefix = f"module_progress.{module_id}."
+                if done:
+                    fields[f"{prefix}status"] = completed_status
+                    fields[f"{prefix}completed_at"] = module.get("completed_at") or now
+                else:
+                    fields[f"{prefix}status"] = ProgressStatus.IN_PROGRESS.value
+                    reopened[f"{prefix}completed_at"] = ""
+            update: Dict[str, Any] = {"$set": fields}
+            if reopened:
+                update["$unset"] = reopened
+            operations.append(UpdateOne({"_id": progress["_id"]}, update))
+        await db[PROGRESS_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def migrate() -> None:
+    """Run every migration, then build the indexes they unblock."""
+    await migrate_order_to_rank(MODULES_COLLECTION, "course_id")
+    await migrate_order_to_rank(LESSONS_COLLECTION, "module_id")
+    await migrate_order_to_rank(ASSESSMENTS_COLLECTION, "module_id")
+    await drop_duplicates(STUDENT_GRADES_COLLECTION, ["email", "module"])
+    await drop_duplicates(STUDENT_RESPONSES_COLLECTION, ["email"])
+    await backfill_progress_counters()
+    await database._create_indexes()
+
+
+def main() -> None:
+    asyncio.run(migrate())
+    print("Legacy data migrated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Move content progress between the two storage layouts (see PROGRESS_LAYOUTS).
+
+    python -m app.tools.migrate_progress_layout --to normalized
+    python -m app.tools.migrate_progress_layout --to embedded
+
+Every batch is written to the target layout before it is removed from the
+source one, so an interrupted run can simply be started again. Stop the
+progress writers (or switch PROGRESS_STORAGE_LAYOUT) before migrating.
+"""
+import argparse
+import asyncio
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from ..DB.database import get_database, PROGRESS_COLLECTION, CONTENT_PROGRESS_COLLECTION
+from ..services.progress.progress_service import CONTENT_FIELDS, PROGRESS_LAYOUTS
+
+
+async def to_normalized(batch_size: int = 500) -> int:
+    """
+    Move the embedded content entries into content_progress documents.
+
+    Returns:
+        The number of content entries moved
+    """
+    db = await get_database()
+    moved = 0
+    last_id = None
+    while True:
+        id_filter = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        progress_docs = await db[PROGRESS_COLLECTION].find(
+            id_filter,
+            {"user_id": 1, "course_id": 1, "module_progress": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not progress_docs:
+            return moved
+        last_id = progress_docs[-1]["_id"]
+        progress_docs = [progress for progress in progress_docs if _has_entries(progress)]
+        if not progress_docs:
+            continue
+
+        entries: List[UpdateOne] = []
+        unsets: List[UpdateOne] = []
+        for progress in progress_docs:
+            paths = {}
+            for module_id, module in progress["module_progress"].items():
+                for content_id, content in (module.get("content_progress") or {}).items():
+                    key = {
+                        "user_id": progress["user_id"],
+                        "course_id": progress["course_id"],
+                        "module_id": module_id,
+                        "content_id": content_id
+                    }
+                    fields = {field: content[field] for field in CONTENT_FIELDS if field in content}
+                    entries.append(UpdateOne(key, {"$set": fields}, upsert=True))
+                paths[f"module_progress.{module_id}.content_progress"] = ""
+            unsets.append(UpdateOne({"_id": progress["_id"]}, {"$unset": paths, "$inc": {"version": 1}}))
+
+        if entries:
+            await db[CONTENT_PROGRESS_COLLECTION].bulk_write(entries, ordered=False)
+        await db[PROGRESS_COLLECTION].bulk_write(unsets, ordered=False)
+        moved += len(entries)
+
+
+async def to_embedded(batch_size: int = 500) -> int:
+    """
+    Move the content_progress documents back into their CourseProgress documents.
+
+    Returns:
+        The number of content entries moved
+    """
+    db = await get_database()
+    moved = 0
+    while True:
+        entries = await db[CONTENT_PROGRESS_COLLECTION].find({}).sort(
+            [("user_id", 1), ("course_id", 1)]
+        ).limit(batch_size).to_list(length=None)
+        if not entries:
+            return moved
+
+        paths: Dict[tuple, Dict[str, Any]] = {}
+        for entry in entries:
+            content_path = f"module_progress.{entry['module_id']}.content_progress.{entry['content_id']}"
+            fields = paths.setdefault((entry["user_id"], entry["course_id"]), {})
+            for field in CONTENT_FIELDS:
+                if field in entry:
+                    fields[f"{content_path}.{field}"] = entry[field]
+
+        await db[PROGRESS_COLLECTION].bulk_write(
+            [
+                UpdateOne({"user_id": user_id, "course_id": course_id}, {"$set": fields, "$inc": {"version": 1}}, upsert=True)
+                for (user_id, course_id), fields in paths.items()
+            ],
+            ordered=False
+        )
+        await db[CONTENT_PROGRESS_COLLECTION].delete_many({"_id": {"$in": [entry["_id"] for entry in entries]}})
+        moved += len(entries)
+
+
+def _has_entries(progress: Dict[str, Any]) -> bool:
+    return any(module.get("content_progress") for module in (progress.get("module_progress") or {}).values())
+
+
+async def migrate(layout: str, batch_size: int = 500) -> int:
+    """Move every content entry to the given layout."""
+    if layout == "normalized":
+        return await to_normalized(batch_size)
+    return await to_embedded(batch_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move content progress between storage layouts.")
+    parser.add_argument("--to", dest="layout", choices=PROGRESS_LAYOUTS, required=True)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    moved = asyncio.run(migrate(args.layout, args.batch_size))
+    print(f"Moved {moved} content progress entries to the {args.layout} layout")
+
+
+if __name__ == "__main__":
+    main()
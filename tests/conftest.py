@@ -0,0 +1,142 @@
+import asyncio
+import fnmatch
+import json
+
+import mongomock
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import DeleteOne, InsertOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.core.cache import cache
+from app.DB import database
+
+
+class MemoryRedis:
+    """In-memory stand-in for the few Redis commands CacheService uses."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    async def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    async def keys(self, pattern):
+        return [key for key in self.store if fnmatch.fnmatch(key, pattern)]
+
+    async def hget(self, key, field):
+        return self.store.get(key, {}).get(field)
+
+    async def hset(self, key, field, value):
+        self.store.setdefault(key, {})[field] = value
+
+    async def hmget(self, key, fields):
+        return [self.store.get(key, {}).get(field) for field in fields]
+
+    async def hincrby(self, key, field, amount):
+        fields = self.store.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+        return int(fields[field])
+
+    async def sadd(self, key, member):
+        self.store.setdefault(key, set()).add(member)
+
+    async def smembers(self, key):
+        return set(self.store.get(key, set()))
+
+    async def expire(self, key, ttl):
+        return key in self.store
+
+    async def close(self):
+        pass
+
+    def pipeline(self, transaction=False):
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        return lambda *args, **kwargs: self.commands.append((command, args, kwargs))
+
+    async def execute(self):
+        return [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+def _bulk_write(self, requests, ordered=True, **kwargs):
+    """
+    bulk_write for mongomock collections, which cannot read the operations
+    of current pymongo versions: applies them one at a time and reports
+    failed writes the way the server does.
+    """
+    counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0}
+    upserted, write_errors = [], []
+    for index, operation in enumerate(requests):
+        try:
+            if isinstance(operation, InsertOne):
+                self.insert_one(operation._doc)
+                counts["nInserted"] += 1
+            elif isinstance(operation, (UpdateOne, UpdateMany)):
+                update = self.update_one if isinstance(operation, UpdateOne) else self.update_many
+                result = update(operation._filter, operation._doc, upsert=bool(operation._upsert))
+                counts["nMatched"] += result.matched_count
+                counts["nModified"] += result.modified_count
+                if result.upserted_id is not None:
+                    counts["nUpserted"] += 1
+                    upserted.append({"index": index, "_id": result.upserted_id})
+            elif isinstance(operation, DeleteOne):
+                counts["nRemoved"] += self.delete_one(operation._filter).deleted_count
+        except DuplicateKeyError as error:
+            write_errors.append({"index": index, "code": 11000, "errmsg": str(error), "op": operation._doc})
+            if ordered:
+                break
+    details = {**counts, "upserted": upserted, "writeErrors": write_errors, "writeConcernErrors": []}
+    if write_errors:
+        raise BulkWriteError(details)
+    return mongomock.results.BulkWriteResult(details, True)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh in-memory database behind get_database()."""
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", _bulk_write)
+    database._db = AsyncMongoMockClient()["test"]
+    yield database._db
+    database._db = None
+
+
+@pytest.fixture
+def memory_cache():
+    """Route the Redis cache to memory."""
+    cache.redis = MemoryRedis()
+    yield cache.redis
+    cache.redis = None
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion."""
+    return lambda coroutine: asyncio.run(coroutine)
@@ -0,0 +1,89 @@
+from app.DB.database import _seed_legacy_grade_keys
+from app.models.assessments.assessment import AssessmentUpdate
+from app.services.assessments.assessment_service import AssessmentService
+from app.services.modules.assessment_mapping import AssessmentMappingService
+from app.services.modules.module_service import ModuleService
+
+
+async def _assessment(db, module_id: str, title: str, rank: int) -> str:
+    result = await db["assessments"].insert_one({
+        "title": title,
+        "description": "",
+        "module_id": module_id,
+        "course_id": "course",
+        "rank": rank,
+        "content": {"type": "quiz", "content": {}}
+    })
+    return str(result.inserted_id)
+
+
+async def _module(db, assessment_ids=()) -> str:
+    result = await db["modules"].insert_one({
+        "title": "Module",
+        "description": "",
+        "course_id": "course",
+        "rank": 1024,
+        "estimated_duration": 30,
+        "difficulty": "easy",
+        "assessment_ids": list(assessment_ids)
+    })
+    return str(result.inserted_id)
+
+
+def test_gate_follows_the_module_assessment_list(db, memory_cache, run):
+    async def scenario():
+        module_id = await _module(db)
+        first = await _assessment(db, module_id, "Quiz 1", 1024)
+        second = await _assessment(db, module_id, "Quiz 2", 2048)
+        # Listed elsewhere, so it must not gate this module
+        await _assessment(db, module_id, "Unlisted", 4096)
+        mapping = AssessmentMappingService()
+        modules = ModuleService()
+
+        await modules.add_assessment_to_module(module_id, first)
+        after_first = mapping.grade_keys_for(module_id)
+        await modules.add_assessment_to_module(module_id, second)
+        after_second = mapping.grade_keys_for(module_id)
+        await modules.remove_assessment_from_module(module_id, second)
+        after_removal = mapping.grade_keys_for(module_id)
+        await mapping.reload()
+        return after_first, after_second, after_removal, mapping.grade_keys_for(module_id)
+
+    after_first, after_second, after_removal, reloaded = run(scenario())
+
+    assert after_first == ["Quiz 1"]
+    assert after_second == ["Quiz 2"]
+    assert after_removal == ["Quiz 1"]
+    assert reloaded == after_removal
+
+
+def test_renaming_the_gate_keeps_earlier_keys(db, memory_cache, run):
+    async def scenario():
+        module_id = await _module(db)
+        assessment_id = await _assessment(db, module_id, "Functions Quiz", 1024)
+        await db["modules"].update_one({}, {"$set": {"assessment_ids": [assessment_id]}})
+        mapping = AssessmentMappingService()
+        await mapping.refresh_module(module_id)
+
+        await AssessmentService().update_assessment(assessment_id, AssessmentUpdate(title="Functions Test"))
+        return mapping.grade_keys_for(module_id), mapping.modules_for_grade_key("Functions Quiz"), module_id
+
+    grade_keys, modules, module_id = run(scenario())
+
+    assert grade_keys == ["Functions Test", "Functions Quiz"]
+    assert modules == [module_id]
+
+
+def test_legacy_module_falls_back_to_its_seeded_key(db, memory_cache, run):
+    async def scenario():
+        await _seed_legacy_grade_keys()
+        mapping = AssessmentMappingService()
+        await mapping.reload()
+        await mapping.refresh_module("python-module1")
+        stored = await db["module_grade_keys"].find_one({"_id": "python-module1"})
+        return mapping.grade_keys_for("python-module1"), stored
+
+    grade_keys, stored = run(scenario())
+
+    assert grade_keys == ["Assessment1"]
+    assert stored["grade_key"] == "Assessment1"
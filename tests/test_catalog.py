@@ -0,0 +1,31 @@
+from app.services.catalog.catalog_service import CourseCatalogService
+
+
+def _course(title: str, category: str) -> dict:
+    return {
+        "title": title,
+        "description": f"{title} from scratch",
+        "language": "es",
+        "level": "beginner",
+        "category": category,
+        "estimated_duration": 600,
+        "instructor_id": "instructor",
+        "status": "published"
+    }
+
+
+def test_catalog_pages_newest_first_with_facet_counts(db, memory_cache, run):
+    async def scenario():
+        for title, category in [("Python", "Programming"), ("SQL", "Data"), ("Java", "Programming")]:
+            await db["courses"].insert_one(_course(title, category))
+        return await CourseCatalogService().search({"category": "Programming"}, limit=1)
+
+    page = run(scenario())
+
+    assert [item["title"] for item in page["items"]] == ["Java"]
+    assert page["total"] == 2
+    assert page["facets"]["category"] == [
+        {"value": "Programming", "count": 2},
+        {"value": "Data", "count": 1}
+    ]
+
@@ -0,0 +1,71 @@
+import numpy as np
+
+from app.models.studentGrades import StudentGrades
+from app.services.analytics import grade_analytics_service
+from app.services.analytics.grade_analytics_service import GradeAnalyticsService
+from app.services.studentGrades import GradesService
+
+
+def _grades(module: str, *grades) -> list:
+    return [
+        {"email": f"s{index}@example.com", "module": module, "grade": grade, "date_assigned": "2025-03-01"}
+        for index, grade in enumerate(grades)
+    ]
+
+
+def test_statistics_of_a_grade_column():
+    stats = GradeAnalyticsService.compute_statistics(np.array([20.0, 40.0, 60.0, 80.0, 100.0]), passing_grade=60)
+
+    assert (stats["count"], stats["mean"], stats["median"], stats["min"], stats["max"]) == (5, 60.0, 60.0, 20.0, 100.0)
+    assert stats["std"] == np.std([20, 40, 60, 80, 100])
+    assert stats["percentiles"]["p25"] == 40.0
+    assert (stats["passed"], stats["pass_rate"]) == (3, 0.6)
+    assert [bucket["count"] for bucket in stats["histogram"]] == [0, 0, 1, 0, 1, 0, 1, 0, 1, 1]
+
+
+def test_statistics_of_an_empty_column():
+    stats = GradeAnalyticsService.compute_statistics(np.empty(0))
+
+    assert stats["count"] == 0
+    assert stats["mean"] is None and stats["pass_rate"] is None
+
+
+def test_all_statistics_split_modules_across_batches(db, memory_cache, run, monkeypatch):
+    monkeypatch.setattr(grade_analytics_service, "ANALYTICS_BATCH_SIZE", 2)
+
+    async def scenario():
+        await db["student_grades"].insert_many(
+            _grades("Assessment2", 50, 70, 90) + _grades("Assessment1", 10, 30) + _grades("Assessment2", "n/a")
+        )
+        return await GradeAnalyticsService().get_all_statistics()
+
+    stats = run(scenario())
+
+    assert list(stats["modules"]) == ["Assessment1", "Assessment2"]
+    assert (stats["modules"]["Assessment1"]["count"], stats["modules"]["Assessment1"]["mean"]) == (2, 20.0)
+    assert (stats["modules"]["Assessment2"]["count"], stats["modules"]["Assessment2"]["mean"]) == (3, 70.0)
+    assert (stats["overall"]["count"], stats["overall"]["mean"]) == (5, 50.0)
+
+
+def test_module_statistics_are_cached_until_a_grade_is_written(db, memory_cache, run):
+    async def scenario():
+        await db["student_grades"].insert_many(_grades("Assessment1", 40, 60))
+        analytics = GradeAnalyticsService()
+        first = await analytics.get_module_statistics("Assessment1")
+
+        # Written behind the service's back: the cached statistics still hold
+        await db["student_grades"].insert_one(_grades("Assessment1", 100)[0] | {"email": "late@example.com"})
+        cached = await analytics.get_module_statistics("Assessment1")
+
+        await GradesService().create_grade(StudentGrades(
+            email="new@example.com", module="Assessment1", grade=80, date_assigned="2025-03-02"
+        ))
+        fresh = await analytics.get_module_statistics("Assessment1")
+        missing = await analytics.get_module_statistics("Unknown")
+        return first, cached, fresh, missing
+
+    first, cached, fresh, missing = run(scenario())
+
+    assert first["count"] == cached["count"] == 2
+    assert (fresh["count"], fresh["mean"]) == (4, 70.0)
+    assert missing is None
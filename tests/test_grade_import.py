@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+
+from app.core.streaming import iter_csv_rows, iter_lines, iter_ndjson_rows
+from app.main import app
+
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+def test_lines_are_split_across_chunk_boundaries(run):
+    # "ó" is two bytes, split between the first two chunks
+    encoded = "módulo\r\nsecond\nlast".encode("utf-8")
+    chunks = _chunks(encoded[:2], encoded[2:9], encoded[9:])
+
+    assert run(_collect(iter_lines(chunks))) == ["módulo", "second", "last"]
+
+
+def test_rows_report_parse_errors_with_their_line(run):
+    ndjson = _chunks(b'{"email": "a"}\n\n[1, 2]\nnot json\n')
+    csv = _chunks(b"email,grade\n\na@example.com,90\nb@example.com\n")
+
+    ndjson_rows = run(_collect(iter_ndjson_rows(iter_lines(ndjson))))
+    csv_rows = run(_collect(iter_csv_rows(iter_lines(csv))))
+
+    assert ndjson_rows[0] == (1, {"email": "a"})
+    assert [(line, isinstance(row, Exception)) for line, row in ndjson_rows[1:]] == [(3, True), (4, True)]
+    assert csv_rows[0] == (3, {"email": "a@example.com", "grade": "90"})
+    assert csv_rows[1][0] == 4 and isinstance(csv_rows[1][1], ValueError)
+
+
+def test_csv_import_upserts_grades_and_reports_bad_rows(db, memory_cache, run):
+    run(db["student_grades"].insert_one(
+        {"email": "a@example.com", "module": "Assessment1", "grade": 40.0, "date_assigned": "2025-01-01"}
+    ))
+    body = (
+        "email,module,grade,date_assigned\n"
+        "a@example.com,Assessment1,95,2025-03-01\n"
+        "b@example.com,Assessment1,80,2025-03-01\n"
+        "c@example.com,Assessment1,not a number,2025-03-01\n"
+        "b@example.com,Assessment2,70,2025-03-02\n"
+    )
+
+    response = TestClient(app).post(
+        "/import?batch_size=2",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "text/csv"}
+    )
+
+    report = response.json()
+    assert response.status_code == 200
+    assert (report["processed"], report["upserted"], report["modified"], report["failed"]) == (4, 2, 1, 1)
+    assert [error["line"] for error in report["errors"]] == [4]
+    grades = run(db["student_grades"].find({}, {"_id": 0, "email": 1, "module": 1, "grade": 1}).to_list(None))
+    assert sorted((grade["email"], grade["module"], grade["grade"]) for grade in grades) == [
+        ("a@example.com", "Assessment1", 95.0),
+        ("b@example.com", "Assessment1", 80.0),
+        ("b@example.com", "Assessment2", 70.0)
+    ]
+
+
+def test_ndjson_import_is_the_default_format(db, memory_cache, run):
+    body = b'{"email": "a@example.com", "module": "Assessment1", "grade": 90, "date_assigned": "2025-03-01"}\n'
+
+    response = TestClient(app).post("/import", content=body)
+
+    assert response.json()["upserted"] == 1
+    assert run(db["student_grades"].count_documents({"email": "a@example.com"})) == 1
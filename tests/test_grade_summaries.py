@@ -0,0 +1,136 @@
+from app.core.config import settings
+from app.DB.database import _seed_legacy_grade_keys, get_database
+from app.models.studentGrades import StudentGrades
+from app.services import studentGradeSummaries as grade_summaries_module
+from app.services.module_access_service import ModuleAccessService
+from app.services.studentGradeSummaries import GradeSummaryService
+from app.services.studentGrades import GradesService
+
+EMAIL = "student@example.com"
+
+
+def _grade(grade: float) -> StudentGrades:
+    return StudentGrades(email=EMAIL, module="Assessment1", grade=grade, date_assigned="2025-03-01")
+
+
+async def _module_with_prerequisite(db) -> str:
+    await _seed_legacy_grade_keys()
+    result = await db["modules"].insert_one({
+        "course_id": "python",
+        "title": "Python II",
+        "prerequisites": ["python-module1"]
+    })
+    return str(result.inserted_id)
+
+
+def test_lowered_grade_revokes_access(db, memory_cache, run):
+    async def scenario():
+        module_id = await _module_with_prerequisite(db)
+        grades = GradesService()
+        access = ModuleAccessService()
+
+        await grades.create_grade(_grade(90))
+        granted = await access.check_module_access(EMAIL, "python", module_id)
+
+        await grades.update_grades(_grade(settings.PASSING_GRADE - 10))
+        revoked = await access.check_module_access(EMAIL, "python", module_id)
+        summary = await GradeSummaryService().get_summary(EMAIL)
+        return granted, revoked, summary
+
+    granted, revoked, summary = run(scenario())
+
+    assert granted["has_access"] is True
+    assert revoked["has_access"] is False
+    assert revoked["current_grade"] == settings.PASSING_GRADE - 10
+    assert summary == {"Assessment1": settings.PASSING_GRADE - 10}
+
+
+def test_rebuild_reads_the_stored_grades(db, memory_cache, run):
+    async def scenario():
+        await db["student_grades"].insert_one({"email": EMAIL, "module": "Assessment1", "grade": 75})
+        summaries = GradeSummaryService()
+        rebuilt = await summaries.get_summary(EMAIL)
+        await summaries.record_grades(EMAIL, {"Assessment1": 30})
+        return rebuilt, await summaries.get_summary(EMAIL)
+
+    rebuilt, lowered = run(scenario())
+
+    assert rebuilt == {"Assessment1": 75}
+    assert lowered == {"Assessment1": 30}
+
+
+class RacingDatabase:
+    """Database whose grade reads are followed by a concurrent grade write."""
+
+    def __init__(self, db, concurrent_write):
+        self.db = db
+        self.concurrent_write = concurrent_write
+
+    def __getitem__(self, name):
+        if name != "student_grades":
+            return self.db[name]
+        database = self
+
+        class RacingGrades:
+            def find(self, *args, **kwargs):
+                async def documents():
+                    async for document in database.db[name].find(*args, **kwargs):
+                        yield document
+                    await database.concurrent_write()
+                return documents()
+
+        return RacingGrades()
+
+
+def _lower_grade_during_rebuild(db, monkeypatch):
+    summaries = GradeSummaryService()
+
+    async def lower_grade():
+        await db["student_grades"].update_one({"email": EMAIL}, {"$set": {"grade": 30}})
+        await summaries.record_grades(EMAIL, {"Assessment1": 30})
+
+    async def racing_database():
+        return RacingDatabase(db, lower_grade)
+
+    monkeypatch.setattr(grade_summaries_module, "get_database", racing_database)
+    return summaries
+
+
+def test_rebuild_does_not_overwrite_a_grade_recorded_meanwhile(db, memory_cache, run, monkeypatch):
+    async def scenario():
+        await db["student_grades"].insert_one({"email": EMAIL, "module": "Assessment1", "grade": 75})
+        summaries = _lower_grade_during_rebuild(db, monkeypatch)
+        during = await summaries.rebuild(EMAIL)
+        stored = await db["student_grade_summaries"].find_one({"_id": EMAIL})
+        monkeypatch.setattr(grade_summaries_module, "get_database", get_database)
+        return during, stored, await summaries.get_summary(EMAIL)
+
+    during, stored, after = run(scenario())
+
+    assert during == {"Assessment1": 75}
+    assert stored["grades"] == {"Assessment1": 30}
+    assert not stored.get("complete")
+    assert after == {"Assessment1": 30}
+
+
+def test_batched_rebuild_does_not_overwrite_a_grade_recorded_meanwhile(db, memory_cache, run, monkeypatch):
+    async def scenario():
+        await db["student_grades"].insert_many([
+            {"email": EMAIL, "module": "Assessment1", "grade": 75},
+            {"email": "other@example.com", "module": "Assessment1", "grade": 60}
+        ])
+        summaries = _lower_grade_during_rebuild(db, monkeypatch)
+        await summaries.rebuild_many([EMAIL, "other@example.com"])
+        stored = {
+            summary["_id"]: summary
+            for summary in await db["student_grade_summaries"].find({}).to_list(None)
+        }
+        monkeypatch.setattr(grade_summaries_module, "get_database", get_database)
+        return stored, await summaries.get_summaries([EMAIL, "other@example.com"])
+
+    stored, after = run(scenario())
+
+    assert stored[EMAIL]["grades"] == {"Assessment1": 30}
+    assert not stored[EMAIL].get("complete")
+    assert stored["other@example.com"]["complete"] is True
+    assert after == {EMAIL: {"Assessment1": 30}, "other@example.com": {"Assessment1": 60}}
@@ -0,0 +1,84 @@
+import asyncio
+
+from app.core.text_index import snippet
+from app.services.search import lesson_search_service
+from app.services.search.lesson_search_service import LessonSearchService
+
+
+def _lesson(title: str, blocks: list) -> dict:
+    return {
+        "title": title,
+        "description": f"{title} paso a paso",
+        "module_id": "module",
+        "course_id": "python",
+        "status": "published",
+        "content_blocks": [
+            {"order": index + 1, "type": block_type, "content": content}
+            for index, (block_type, content) in enumerate(blocks)
+        ]
+    }
+
+
+async def _search(db, query: str):
+    await db["lessons"].insert_many([
+        _lesson("Bucles", [
+            ("text", {"text": "Un bucle repite instrucciones mientras se cumpla una condición."}),
+            ("code", {"code": "for item in items:\n    print(item)", "explanation": "Un for loop recorre la lista."}),
+            ("exercise", {"instructions": "Escribe un while loop.", "solution": "for secret in answers"})
+        ]),
+        _lesson("Listas", [("text", {"text": "Comprueba si un valor está in la lista."})])
+    ])
+    service = LessonSearchService()
+    await service.reload()
+    return await service.search(query)
+
+
+def test_search_points_at_the_best_matching_block(db, run):
+    results = run(_search(db, "for loop"))
+
+    assert results[0]["title"] == "Bucles"
+    assert results[0]["block"] == {"index": 1, "order": 2, "type": "code"}
+    assert results[0]["snippet"].startswith("for item in items:")
+
+
+def test_code_keywords_alone_find_lessons(db, run):
+    results = run(_search(db, "in"))
+
+    assert {result["title"] for result in results} == {"Bucles", "Listas"}
+
+
+def test_exercise_solutions_are_not_searchable(db, run):
+    assert run(_search(db, "secret")) == []
+
+
+def test_snippet_centers_on_the_first_match():
+    text = " ".join(["intro"] * 40) + " the for loop body " + " ".join(["outro"] * 40)
+
+    fragment = snippet(text, "loops", width=60)
+
+    assert fragment.startswith("...") and fragment.endswith("...")
+    assert "for loop body" in fragment
+    assert len(fragment) <= 66
+
+
+def test_snippet_falls_back_to_the_start():
+    assert snippet("Short lesson text", "missing") == "Short lesson text"
+
+
+def test_writes_made_during_a_rebuild_reach_the_new_index(db, run, monkeypatch):
+    service = LessonSearchService()
+    to_thread = asyncio.to_thread
+
+    async def build_while_writing(function, *args):
+        # Written after the rebuild read the lessons, before its swap
+        service.index_lesson({"_id": "new", **_lesson("Diccionarios", [("text", {"text": "Claves y valores"})])})
+        service.remove_lesson("old")
+        return await to_thread(function, *args)
+
+    async def scenario():
+        await db["lessons"].insert_one({"_id": "old", **_lesson("Tuplas", [("text", {"text": "Valores fijos"})])})
+        monkeypatch.setattr(lesson_search_service.asyncio, "to_thread", build_while_writing)
+        await service.reload()
+        return await service.search("valores")
+
+    assert [result["lesson_id"] for result in run(scenario())] == ["new"]
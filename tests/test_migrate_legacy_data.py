@@ -0,0 +1,50 @@
+from app.tools import migrate_legacy_data
+from app.tools.migrate_legacy_data import backfill_progress_counters
+
+
+def test_module_completion_is_derived_from_the_counters(db, run):
+    async def scenario():
+        started = await db["modules"].insert_one({"course_id": "course", "lesson_ids": ["l1", "l2"]})
+        finished = await db["modules"].insert_one({"course_id": "course", "lesson_ids": ["l3"]})
+        started_id, finished_id = str(started.inserted_id), str(finished.inserted_id)
+        await db["progress"].insert_one({"user_id": "student", "course_id": "course", "module_progress": {
+            # Completed before l2 was added to the module
+            started_id: {"status": "completed", "completed_at": "2025-01-01", "content_progress": {
+                "l1": {"status": "completed"}
+            }},
+            finished_id: {"status": "in_progress", "content_progress": {"l3": {"status": "completed"}}},
+            "removed": {"status": "completed", "content_progress": {"old": {"status": "completed"}}}
+        }})
+        await backfill_progress_counters(batch_size=1)
+        return started_id, finished_id, await db["progress"].find_one({})
+
+    started_id, finished_id, progress = run(scenario())
+
+    modules = progress["module_progress"]
+    assert (progress["completed_count"], progress["total_count"]) == (2, 3)
+    assert (progress["completed_modules"], progress["total_modules"]) == (1, 2)
+    assert (modules[started_id]["status"], modules[started_id]["completed_count"]) == ("in_progress", 1)
+    assert "completed_at" not in modules[started_id]
+    assert modules[finished_id]["status"] == "completed"
+    assert modules[finished_id]["completed_at"] is not None
+    assert modules["removed"]["status"] == "completed"
+
+
+def test_migration_ranks_legacy_orders_and_builds_the_unique_indexes(db, run):
+    async def scenario():
+        await db["modules"].insert_many([
+            {"course_id": "course", "title": "second", "order": 2},
+            {"course_id": "course", "title": "first", "order": 1},
+            {"course_id": "course", "title": "tied", "order": 2}
+        ])
+        await db["student_responses"].insert_many([{"email": "twice@example.com"}, {"email": "twice@example.com"}])
+        await migrate_legacy_data.migrate()
+        modules = await db["modules"].find({}).sort("rank", 1).to_list(None)
+        return modules, await db["modules"].index_information(), await db["student_responses"].count_documents({})
+
+    modules, indexes, responses = run(scenario())
+
+    assert [module["title"] for module in modules] == ["first", "second", "tied"]
+    assert all("order" not in module for module in modules)
+    assert indexes["course_id_1_rank_1"]["unique"] is True
+    assert responses == 1
@@ -0,0 +1,45 @@
+from app.services.progress.progress_service import ProgressService
+from app.tools.migrate_progress_layout import to_embedded, to_normalized
+
+
+def _contents(progress) -> dict:
+    return {
+        module_id: {content_id: content.model_dump() for content_id, content in module.content_progress.items()}
+        for module_id, module in progress.module_progress.items()
+    }
+
+
+def test_entries_survive_a_round_trip_between_layouts(db, run):
+    async def scenario():
+        result = await db["modules"].insert_many([
+            {"course_id": "course", "lesson_ids": ["intro"]},
+            {"course_id": "course", "lesson_ids": ["loops", "lists"]}
+        ])
+        first, second = [str(module_id) for module_id in result.inserted_ids]
+        embedded = ProgressService(layout="embedded")
+        normalized = ProgressService(layout="normalized")
+        for user_id in ("ana", "luis"):
+            await embedded.update_content_progress(user_id, "course", first, "intro", 30, completed=True)
+            await embedded.update_content_progress(user_id, "course", second, "loops", 45, last_position={"seconds": 45})
+        before = [await embedded.get_course_progress(user_id, "course") for user_id in ("ana", "luis")]
+
+        # One progress document (and one content entry) per batch
+        moved_out = await to_normalized(batch_size=1)
+        stored = await db["progress"].find({}).to_list(None)
+        moved_in = await db["content_progress"].count_documents({})
+        normalized_reads = [await normalized.get_course_progress(user_id, "course") for user_id in ("ana", "luis")]
+
+        moved_back = await to_embedded(batch_size=1)
+        after = [await embedded.get_course_progress(user_id, "course") for user_id in ("ana", "luis")]
+        left = await db["content_progress"].count_documents({})
+        return before, (moved_out, moved_in, stored), normalized_reads, (moved_back, left), after
+
+    before, (moved_out, moved_in, stored), normalized_reads, (moved_back, left), after = run(scenario())
+
+    assert [sum(map(len, _contents(progress).values())) for progress in before] == [2, 2]
+    assert moved_out == moved_in == moved_back == 4
+    assert not any(module.get("content_progress") for progress in stored for module in progress["module_progress"].values())
+    assert [_contents(progress) for progress in normalized_reads] == [_contents(progress) for progress in before]
+    assert left == 0
+    assert [_contents(progress) for progress in after] == [_contents(progress) for progress in before]
+    assert [progress.completed_count for progress in after] == [1, 1]
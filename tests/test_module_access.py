@@ -0,0 +1,134 @@
+import pytest
+
+from app.services.modules import assessment_mapping, prerequisite_graph
+from app.services.module_access_service import ModuleAccessService
+
+PASSED = "passed@example.com"
+FAILED = "failed@example.com"
+
+
+@pytest.fixture
+def course(db, memory_cache, run, monkeypatch):
+    """A course whose second module requires passing the first one's assessment."""
+    monkeypatch.setattr(assessment_mapping, "_loaded_at", None)
+    prerequisite_graph._compiled_graphs.clear()
+
+    async def setup():
+        first = await db["modules"].insert_one({"course_id": "", "rank": 1024, "prerequisites": []})
+        first_id = str(first.inserted_id)
+        second = await db["modules"].insert_one({"course_id": "", "rank": 2048, "prerequisites": [first_id]})
+        second_id = str(second.inserted_id)
+        course = await db["courses"].insert_one({
+            "title": "Python",
+            "description": "Python from scratch",
+            "language": "en",
+            "level": "beginner",
+            "category": "Programming",
+            "estimated_duration": 600,
+            "instructor_id": "instructor",
+            "module_ids": [first_id, second_id]
+        })
+        course_id = str(course.inserted_id)
+        await db["modules"].update_many({}, {"$set": {"course_id": course_id}})
+        # Only the summaries hold grades: access must be decided from them
+        await db["student_grade_summaries"].insert_many([
+            {"_id": PASSED, "grades": {f"{first_id}-assessment": 90}, "complete": True},
+            {"_id": FAILED, "grades": {f"{first_id}-assessment": 10}, "complete": True}
+        ])
+        return course_id, first_id, second_id
+
+    return run(setup())
+
+
+def test_course_access_is_evaluated_from_the_grade_summary(course, run):
+    course_id, first_id, second_id = course
+
+    async def scenario():
+        access = ModuleAccessService()
+        return (
+            await access.get_student_module_access_for_course(PASSED, course_id),
+            await access.get_student_module_access_for_course(FAILED, course_id)
+        )
+
+    passed, failed = run(scenario())
+
+    assert passed["module_access"][first_id]["has_access"] is True
+    assert passed["module_access"][second_id]["has_access"] is True
+    assert failed["module_access"][second_id]["has_access"] is False
+    assert failed["module_access"][second_id]["current_grade"] == 10
+
+
+def test_course_access_reads_one_summary_per_student(course, run, monkeypatch):
+    course_id, _, second_id = course
+    reads = []
+
+    async def scenario():
+        access = ModuleAccessService()
+        get_summary = access.grade_summaries.get_summary
+
+        async def counted(email):
+            reads.append(email)
+            return await get_summary(email)
+
+        monkeypatch.setattr(access.grade_summaries, "get_summary", counted)
+        return await access.get_student_module_access_for_course(PASSED, course_id)
+
+    result = run(scenario())
+
+    assert result["module_access"][second_id]["has_access"] is True
+    assert reads == [PASSED]
+
+
+def test_single_module_check_agrees_with_the_course_check(course, run):
+    course_id, _, second_id = course
+
+    async def scenario():
+        access = ModuleAccessService()
+        return (
+            await access.check_module_access(PASSED, course_id, second_id),
+            await access.check_module_access(FAILED, course_id, second_id)
+        )
+
+    passed, failed = run(scenario())
+
+    assert passed["has_access"] is True
+    assert failed["has_access"] is False
+    assert failed["prerequisite_module"] == course[1]
+
+
+def test_cohort_access_uses_the_graph_module_list(course, run, monkeypatch):
+    course_id, first_id, second_id = course
+
+    async def scenario():
+        access = ModuleAccessService()
+
+        async def no_course_read(course_id):
+            raise AssertionError("The course is read through the prerequisite graph")
+
+        monkeypatch.setattr(access.course_service, "get_course", no_course_read)
+        rows = await access.stream_course_access_for_students(course_id, [PASSED, FAILED])
+        missing = await access.stream_course_access_for_students("0123456789abcdef01234567", [PASSED])
+        return [row async for row in rows], missing
+
+    rows, missing = run(scenario())
+
+    assert [row["student_email"] for row in rows] == [PASSED, FAILED]
+    assert [list(row["module_access"]) for row in rows] == [[first_id, second_id]] * 2
+    assert [row["module_access"][second_id]["has_access"] for row in rows] == [True, False]
+    assert missing is None
+
+
+def test_single_module_check_is_served_from_the_cached_course_decision(course, run, monkeypatch):
+    course_id, _, second_id = course
+
+    async def scenario():
+        access = ModuleAccessService()
+        await access.get_student_module_access_for_course(PASSED, course_id)
+
+        async def no_module_read(module_id):
+            raise AssertionError("The cached course decision answers the check")
+
+        monkeypatch.setattr(access.module_service, "get_by_id", no_module_read)
+        return await access.check_module_access(PASSED, course_id, second_id)
+
+    assert run(scenario())["has_access"] is True
@@ -0,0 +1,50 @@
+from app.services.courses.course_service import CourseService
+from app.services.module_access_cache import ModuleAccessCache
+from app.services.module_access_service import ModuleAccessService
+
+EMAIL = "student@example.com"
+
+
+def test_decision_computed_before_invalidation_is_not_served(memory_cache, run):
+    async def scenario():
+        access_cache = ModuleAccessCache()
+        _, generation = await access_cache.get(EMAIL, "python", "v1")
+        # A grade is written while the decision is being computed
+        await access_cache.invalidate([EMAIL])
+        await access_cache.set(EMAIL, "python", {"stale": True}, "v1", generation)
+        stale, generation = await access_cache.get(EMAIL, "python", "v1")
+
+        await access_cache.set(EMAIL, "python", {"stale": False}, "v1", generation)
+        fresh, _ = await access_cache.get(EMAIL, "python", "v1")
+        return stale, fresh
+
+    stale, fresh = run(scenario())
+
+    assert stale is None
+    assert fresh == {"stale": False}
+
+
+def test_module_added_to_course_reaches_cached_access(db, memory_cache, run):
+    async def scenario():
+        course = await db["courses"].insert_one({
+            "title": "Python",
+            "description": "Python from scratch",
+            "language": "en",
+            "level": "beginner",
+            "category": "Programming",
+            "estimated_duration": 600,
+            "instructor_id": "instructor",
+            "module_ids": ["intro"]
+        })
+        course_id = str(course.inserted_id)
+        access = ModuleAccessService()
+
+        before = await access.get_student_module_access_for_course(EMAIL, course_id)
+        await CourseService().add_module_to_course(course_id, "loops")
+        after = await access.get_student_module_access_for_course(EMAIL, course_id)
+        return before, after
+
+    before, after = run(scenario())
+
+    assert list(before["module_access"]) == ["intro"]
+    assert list(after["module_access"]) == ["intro", "loops"]
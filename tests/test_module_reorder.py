@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from app.core.auth import require_instructor
+from app.main import app
+from app.services.ordering import RANK_GAP
+
+
+def _module(title: str, rank: int) -> dict:
+    return {
+        "title": title,
+        "description": title,
+        "course_id": "course-reorder",
+        "estimated_duration": 30,
+        "difficulty": "easy",
+        "rank": rank
+    }
+
+
+def test_reorder_rewrites_module_ranks(db, memory_cache, run):
+    result = run(db["modules"].insert_many([_module("first", 1), _module("second", 2), _module("third", 3)]))
+    first, second, third = [str(module_id) for module_id in result.inserted_ids]
+    app.dependency_overrides[require_instructor] = lambda: {"user_id": "instructor", "roles": ["instructor"]}
+    try:
+        response = TestClient(app).put(
+            "/courses/course-reorder/modules/order",
+            json={"module_ids": [third, first, second]}
+        )
+    finally:
+        app.dependency_overrides.pop(require_instructor)
+
+    assert response.status_code == 200
+    assert [module["title"] for module in response.json()] == ["third", "first", "second"]
+    assert [module["order"] for module in response.json()] == [1, 2, 3]
+    stored = run(db["modules"].find({}, {"title": 1, "rank": 1}).sort("rank", 1).to_list(None))
+    assert [(module["title"], module["rank"]) for module in stored] == [
+        ("third", RANK_GAP), ("first", 2 * RANK_GAP), ("second", 3 * RANK_GAP)
+    ]
+
+
+def test_reorder_rejects_an_incomplete_ordering(db, memory_cache, run):
+    result = run(db["modules"].insert_many([_module("first", 1), _module("second", 2)]))
+    app.dependency_overrides[require_instructor] = lambda: {"user_id": "instructor", "roles": ["instructor"]}
+    try:
+        response = TestClient(app).put(
+            "/courses/course-reorder/modules/order",
+            json={"module_ids": [str(result.inserted_ids[0])]}
+        )
+    finally:
+        app.dependency_overrides.pop(require_instructor)
+
+    assert response.status_code == 400
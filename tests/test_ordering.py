@@ -0,0 +1,95 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.services.ordering import RANK_GAP, OrderedService
+
+
+class Item(BaseModel):
+    parent_id: str
+    title: str
+    order: Optional[int] = None
+
+
+class ItemUpdate(BaseModel):
+    title: Optional[str] = None
+    order: Optional[int] = None
+
+
+def _apply(operations, ranks: dict) -> None:
+    """Apply rank updates one at a time, failing on any rank collision."""
+    for operation in operations:
+        document_id, rank = operation._filter["_id"], operation._doc["$set"]["rank"]
+        assert rank not in [held for other, held in ranks.items() if other != document_id]
+        ranks[document_id] = rank
+
+
+def test_rank_operations_never_collide():
+    service = OrderedService("items", "parent_id")
+    current = [("a", 1), ("b", 2), ("c", 2048), ("d", 2049), ("e", 10000), ("f", None)]
+    ranks = dict(current)
+
+    _apply(service._rank_operations(current), ranks)
+
+    assert ranks == {document_id: (index + 1) * RANK_GAP for index, (document_id, _) in enumerate(current)}
+
+
+def test_rank_operations_skip_documents_already_in_place():
+    service = OrderedService("items", "parent_id")
+
+    operations = service._rank_operations([("a", RANK_GAP), ("b", 5), ("c", 3 * RANK_GAP)])
+
+    assert [operation._filter["_id"] for operation in operations] == ["b"]
+
+
+def test_insert_between_siblings_takes_the_midpoint(db, run):
+    async def scenario():
+        service = OrderedService("items", "parent_id")
+        first = await service.create_ordered(Item(parent_id="p", title="first"))
+        last = await service.create_ordered(Item(parent_id="p", title="last"))
+        middle = await service.create_ordered(Item(parent_id="p", title="middle", order=2))
+        listed = await service.list_ordered({"parent_id": "p"})
+        return first, last, middle, listed
+
+    first, last, middle, listed = run(scenario())
+
+    assert middle["rank"] == (first["rank"] + last["rank"]) // 2
+    assert middle["order"] == 2
+    assert [item["title"] for item in listed] == ["first", "middle", "last"]
+    assert [item["order"] for item in listed] == [1, 2, 3]
+
+
+def test_exhausted_gap_rebalances_the_parent(db, run):
+    async def scenario():
+        await db["items"].create_index([("parent_id", 1), ("rank", 1)], unique=True)
+        await db["items"].insert_many([
+            {"parent_id": "p", "title": "first", "rank": 10},
+            {"parent_id": "p", "title": "last", "rank": 11}
+        ])
+        service = OrderedService("items", "parent_id")
+        middle = await service.create_ordered(Item(parent_id="p", title="middle", order=2))
+        listed = await service.list_ordered({"parent_id": "p"})
+        return middle, listed
+
+    middle, listed = run(scenario())
+
+    assert [item["title"] for item in listed] == ["first", "middle", "last"]
+    assert listed[0]["rank"] == RANK_GAP and listed[2]["rank"] == 2 * RANK_GAP
+    assert middle["rank"] == RANK_GAP + RANK_GAP // 2
+
+
+def test_update_ordered_moves_and_stamps_updated_at(db, run):
+    async def scenario():
+        service = OrderedService("items", "parent_id")
+        first = await service.create_ordered(Item(parent_id="p", title="first"))
+        await service.create_ordered(Item(parent_id="p", title="second"))
+        moved = await service.update_ordered(str(first["_id"]), ItemUpdate(title="now last", order=2))
+        listed = await service.list_ordered({"parent_id": "p"})
+        return moved, listed
+
+    moved, listed = run(scenario())
+
+    assert moved["order"] == 2
+    assert moved["title"] == "now last"
+    assert moved["updated_at"] is not None
+    assert [item["title"] for item in listed] == ["second", "now last"]
@@ -0,0 +1,73 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def _pages(client: TestClient, path: str, **params) -> list:
+    """Follow X-Next-Cursor until the last page and return every page."""
+    pages = []
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+        params["after"] = cursor
+
+
+def test_grade_pages_follow_the_cursor_without_gaps(db, run):
+    run(db["student_grades"].insert_many([
+        {"email": f"s{index}@example.com", "module": "Assessment1" if index % 2 else "Assessment2",
+         "grade": float(index), "date_assigned": f"2025-03-{index + 1:02d}"}
+        for index in range(7)
+    ]))
+
+    pages = _pages(TestClient(app), "/", limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [grade["grade"] for page in pages for grade in page] == [float(index) for index in range(7)]
+
+
+def test_grade_pages_apply_the_module_and_date_filters(db, run):
+    run(db["student_grades"].insert_many([
+        {"email": f"s{index}@example.com", "module": "Assessment1" if index % 2 else "Assessment2",
+         "grade": float(index), "date_assigned": f"2025-03-{index + 1:02d}"}
+        for index in range(7)
+    ]))
+
+    pages = _pages(TestClient(app), "/", limit=1, module="Assessment1", date_to="2025-03-04")
+
+    assert [grade["email"] for page in pages for grade in page] == ["s1@example.com", "s3@example.com"]
+
+
+def test_last_page_has_no_cursor_and_bad_cursors_are_rejected(db, run):
+    run(db["student_responses"].insert_many([
+        {"email": f"s{index}@example.com", "responses": []} for index in range(2)
+    ]))
+    client = TestClient(app)
+
+    exact = client.get("/responses/", params={"limit": 2})
+    invalid = client.get("/responses/", params={"after": "not-an-id"})
+
+    assert len(exact.json()) == 2
+    assert "X-Next-Cursor" not in exact.headers
+    assert invalid.status_code == 400
+
+
+def test_response_pages_and_export_cover_every_student(db, run):
+    run(db["student_responses"].insert_many([
+        {"email": f"s{index}@example.com", "responses": [{"question_id": 1, "answer": "a"}]}
+        for index in range(5)
+    ]))
+    client = TestClient(app)
+
+    pages = _pages(client, "/responses/", limit=2)
+    exported = client.get("/responses/export")
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [json.loads(line)["email"] for line in exported.text.splitlines()] == [
+        response["email"] for page in pages for response in page
+    ]
@@ -0,0 +1,54 @@
+import random
+
+from app.services.modules import prerequisite_graph
+from app.services.modules.prerequisite_graph import PrerequisiteGraph, PrerequisiteGraphService
+
+
+def _compiled_fields(graph: PrerequisiteGraph):
+    return graph.version, graph.order, graph.ancestors, graph.cyclic, graph.dangling, graph.dependents
+
+
+def test_incremental_update_matches_a_full_compile():
+    rng = random.Random(7)
+    modules = [f"m{index}" for index in range(30)]
+    graph = PrerequisiteGraph("course", {module_id: [] for module_id in modules}, modules)
+
+    for _ in range(200):
+        module_id = rng.choice(modules)
+        # Mostly earlier modules, sometimes later ones (cycles) or unknown IDs
+        prerequisites = rng.sample(modules, rng.randint(0, 3)) + (["missing"] if rng.random() < 0.1 else [])
+        graph = graph.with_prerequisites(module_id, prerequisites)
+        full = PrerequisiteGraph("course", graph.prerequisites, graph.module_order)
+        assert _compiled_fields(graph) == _compiled_fields(full)
+
+
+def test_update_reuses_closures_of_unrelated_modules():
+    graph = PrerequisiteGraph("course", {"a": [], "b": ["a"], "c": [], "d": ["c"]}, ["a", "b", "c", "d"])
+    updated = graph.with_prerequisites("b", [])
+
+    assert updated.ancestors["b"] == set()
+    assert updated.ancestors["d"] is graph.ancestors["d"]
+
+
+def test_prerequisite_change_retires_the_shared_copy(db, memory_cache, run):
+    async def scenario():
+        prerequisite_graph._compiled_graphs.clear()
+        first = await db["modules"].insert_one({"course_id": "course", "rank": 1024, "prerequisites": []})
+        second = await db["modules"].insert_one({"course_id": "course", "rank": 2048, "prerequisites": []})
+        service = PrerequisiteGraphService()
+        before = await service.get_graph("course")
+
+        await db["modules"].update_one({"_id": second.inserted_id}, {"$set": {"prerequisites": [str(first.inserted_id)]}})
+        await service.update_module_prerequisites("course", str(second.inserted_id), [str(first.inserted_id)])
+        local = await service.get_graph("course")
+
+        # Another worker, without a compiled copy, rebuilds from the database
+        prerequisite_graph._compiled_graphs.clear()
+        shared = await service.get_graph("course")
+        return before, local, shared, str(first.inserted_id), str(second.inserted_id)
+
+    before, local, shared, first, second = run(scenario())
+
+    assert before.ancestors[second] == set()
+    assert local.ancestors[second] == {first}
+    assert shared.version == local.version
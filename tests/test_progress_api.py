@@ -0,0 +1,70 @@
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+from pymongo.errors import BulkWriteError
+
+from app.api import progress as progress_api
+from app.core.auth import require_student
+from app.main import app
+from app.services.progress import progress_buffer
+from app.services.progress.progress_service import ProgressWriteError
+
+
+class UnwritableProgressService:
+    """Fails every write as a bulk write that wrote nothing would."""
+
+    async def apply_content_events(self, events):
+        raise ProgressWriteError(list(events))
+
+
+@pytest.fixture
+def student():
+    progress_buffer._pending.clear()
+    app.dependency_overrides[require_student] = lambda: {"user_id": "student", "roles": ["student"]}
+    yield TestClient(app)
+    app.dependency_overrides.pop(require_student)
+    progress_buffer._pending.clear()
+
+
+def test_unwritten_completion_heartbeat_is_returned(student, monkeypatch):
+    monkeypatch.setattr(progress_api.progress_buffer, "progress_service", UnwritableProgressService())
+    url = "/progress/courses/course/modules/module/content/intro/heartbeat"
+
+    buffered = student.post(url, params={"time_spent": 30})
+    response = student.post(url, params={"time_spent": 5, "completed": True})
+
+    assert buffered.status_code == 202
+    assert response.status_code == 409
+    assert response.json()["detail"]["unwritten"] == [{
+        "course_id": "course", "module_id": "module", "content_id": "intro",
+        "time_spent": 5, "last_position": None, "completed": True
+    }]
+    # The time buffered before the completion stays buffered
+    assert [event.time_spent for event in progress_buffer._pending.values()] == [30]
+
+
+def test_batch_returns_the_events_a_bulk_write_did_not_write(db, student, run, monkeypatch):
+    bulk_write = mongomock.collection.Collection.bulk_write
+
+    def second_write_fails(self, requests, ordered=True, **kwargs):
+        # Only the first (time spent) write fails, after applying its first operation
+        monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", bulk_write)
+        bulk_write(self, requests[:1], ordered=ordered)
+        raise BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key error"}],
+            "writeConcernErrors": [], "nInserted": 0, "nUpserted": 1, "nMatched": 0, "nModified": 0,
+            "nRemoved": 0, "upserted": []
+        })
+
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", second_write_fails)
+    response = student.post("/progress/batch", json={"events": [
+        {"course_id": "written", "module_id": "module", "content_id": "intro", "content_type": "lesson", "time_spent": 30},
+        {"course_id": "unwritten", "module_id": "module", "content_id": "intro", "content_type": "lesson", "time_spent": 40}
+    ]})
+
+    assert response.status_code == 409
+    assert [(event["course_id"], event["time_spent"]) for event in response.json()["detail"]["unwritten"]] == [
+        ("unwritten", 40)
+    ]
+    stored = run(db["progress"].find({}, {"course_id": 1}).to_list(None))
+    assert [progress["course_id"] for progress in stored] == ["written"]
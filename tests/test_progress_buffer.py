@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.progress import progress_buffer
+from app.services.progress.progress_buffer import ProgressBuffer
+from app.services.progress.progress_service import ContentProgressEvent, ProgressWriteError
+
+
+class FailingProgressService:
+    """Records applied events, then fails as configured."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.applied = []
+
+    async def apply_content_events(self, events):
+        self.applied.append(events)
+        if self.error is not None:
+            raise self.error
+
+
+def _heartbeat(content_id: str, time_spent: int = 30) -> ContentProgressEvent:
+    return ContentProgressEvent("user", "course", "module", content_id, time_spent)
+
+
+@pytest.fixture
+def buffer():
+    progress_buffer._pending.clear()
+    yield ProgressBuffer()
+    progress_buffer._pending.clear()
+
+
+def test_failure_after_the_time_write_keeps_nothing_buffered(buffer, run):
+    buffer.progress_service = FailingProgressService(RuntimeError("rollup failed"))
+
+    async def scenario():
+        await buffer.add(_heartbeat("intro"))
+        return await buffer.flush()
+
+    assert run(scenario()) == 1
+    assert progress_buffer._pending == {}
+
+
+def test_only_unwritten_heartbeats_are_restored(buffer, run):
+    unwritten = _heartbeat("loops")
+    buffer.progress_service = FailingProgressService(ProgressWriteError([unwritten]))
+
+    async def scenario():
+        await buffer.add(_heartbeat("intro"))
+        await buffer.add(_heartbeat("loops"))
+        return await buffer.flush()
+
+    assert run(scenario()) == 1
+    assert list(progress_buffer._pending.values()) == [unwritten]
+
+
+def test_completion_keeps_buffered_time_once_written(buffer, run):
+    buffer.progress_service = FailingProgressService(RuntimeError("rollup failed"))
+    completion = _heartbeat("intro", time_spent=5)
+    completion.completed = True
+
+    async def scenario():
+        await buffer.add(_heartbeat("intro"))
+        with pytest.raises(RuntimeError):
+            await buffer.add(completion)
+
+    run(scenario())
+
+    assert buffer.progress_service.applied[0][0].time_spent == 35
+    assert progress_buffer._pending == {}
+
+
+def test_threshold_wakes_the_flush_task_instead_of_flushing_inline(buffer, run, monkeypatch):
+    monkeypatch.setattr(settings, "PROGRESS_FLUSH_MAX_EVENTS", 2)
+    buffer.progress_service = FailingProgressService()
+
+    async def scenario():
+        buffer.start()
+        try:
+            await buffer.add(_heartbeat("intro"))
+            await buffer.add(_heartbeat("loops"))
+            inline = len(buffer.progress_service.applied)
+            for _ in range(10):
+                await asyncio.sleep(0)
+            return inline, len(buffer.progress_service.applied)
+        finally:
+            await buffer.stop()
+
+    # Written by the flush task long before its 5 second interval is up
+    assert run(scenario()) == (0, 1)
+    assert progress_buffer._pending == {}
@@ -0,0 +1,123 @@
+import mongomock
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.services.progress.progress_service import ProgressService
+
+
+async def _course(db, course_id: str) -> list:
+    result = await db["modules"].insert_many([
+        {"course_id": course_id, "lesson_ids": ["intro"]},
+        {"course_id": course_id, "lesson_ids": ["loops", "lists"]}
+    ])
+    return [str(module_id) for module_id in result.inserted_ids]
+
+
+def test_content_of_unknown_modules_is_rejected(db, run):
+    async def scenario():
+        first, _ = await _course(db, "course-unknown-module")
+        service = ProgressService(layout="embedded")
+        progress = await service.update_content_progress(
+            "user", "course-unknown-module", first, "intro", 30, completed=True
+        )
+        with pytest.raises(ValueError):
+            await service.update_content_progress(
+                "user", "course-unknown-module", "bogus", "extra", 30, completed=True
+            )
+        return progress
+
+    progress = run(scenario())
+
+    assert progress.completed_modules == 1
+    assert progress.status != "completed"
+
+
+def test_modules_outside_the_structure_do_not_count(db, run):
+    async def scenario():
+        first, _ = await _course(db, "course-legacy-module")
+        # Left behind by a module that was removed from the course
+        await db["progress"].insert_one({
+            "user_id": "user",
+            "course_id": "course-legacy-module",
+            "total_modules": 2,
+            "completed_modules": 0,
+            "version": 1,
+            "module_progress": {
+                "removed": {
+                    "module_id": "removed",
+                    "status": "in_progress",
+                    "content_progress": {"old": {"status": "completed"}}
+                }
+            }
+        })
+        service = ProgressService(layout="embedded")
+        await service.update_content_progress(
+            "user", "course-legacy-module", first, "intro", 30, completed=True
+        )
+        progress_dict = await db["progress"].find_one({"course_id": "course-legacy-module"})
+        return await service._roll_up_status(progress_dict, ["removed"], progress_dict["updated_at"])
+
+    progress_dict = run(scenario())
+
+    assert progress_dict["module_progress"]["removed"]["status"] == "completed"
+    assert progress_dict["completed_modules"] == 1
+    assert progress_dict["status"] != "completed"
+
+
+def _race_status_writes(monkeypatch, races: int) -> None:
+    """Make another writer bump the document version right before each of the next `races` status writes."""
+    find_one_and_update = mongomock.collection.Collection.find_one_and_update
+    left = [races]
+
+    def racing(self, filter, update, *args, **kwargs):
+        if "version" in filter and left[0]:
+            left[0] -= 1
+            find_one_and_update(self, {"_id": filter["_id"]}, {"$inc": {"version": 1}})
+        return find_one_and_update(self, filter, update, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "find_one_and_update", racing)
+
+
+def _conflicts() -> float:
+    return REGISTRY.get_sample_value("progress_write_conflicts_total") or 0
+
+
+def test_status_write_is_retried_on_a_version_conflict(db, run, monkeypatch):
+    async def scenario():
+        first, _ = await _course(db, "course-conflict")
+        _race_status_writes(monkeypatch, races=1)
+        return first, await ProgressService(layout="embedded").update_content_progress(
+            "user", "course-conflict", first, "intro", 30, completed=True
+        )
+
+    conflicts = _conflicts()
+    first, progress = run(scenario())
+
+    assert _conflicts() - conflicts == 1
+    assert progress.module_progress[first].status == "completed"
+    assert progress.completed_modules == 1
+    stored = run(db["progress"].find_one({"course_id": "course-conflict"}))
+    assert stored["module_progress"][first]["status"] == "completed"
+    # Content write, completion, the racing write and the retried status write
+    assert stored["version"] == 4
+
+
+def test_status_write_gives_up_after_the_configured_retries(db, run, monkeypatch):
+    monkeypatch.setattr(settings, "PROGRESS_WRITE_RETRIES", 3)
+
+    async def scenario():
+        first, _ = await _course(db, "course-contended")
+        _race_status_writes(monkeypatch, races=10)
+        await ProgressService(layout="embedded").update_content_progress(
+            "user", "course-contended", first, "intro", 30, completed=True
+        )
+        return first, await db["progress"].find_one({"course_id": "course-contended"})
+
+    conflicts = _conflicts()
+    first, stored = run(scenario())
+
+    assert _conflicts() - conflicts == 3
+    # The counters were written; only the status decision was given up
+    assert stored["module_progress"][first]["completed_count"] == 1
+    assert stored["module_progress"][first]["status"] != "completed"
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.text_index import InvertedIndex
+from app.services.roadmaps import roadmap_search
+from app.services.roadmaps.roadmap_search import RoadmapSearchService
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    """Give the test its own, not yet loaded, worker index."""
+    monkeypatch.setattr(roadmap_search, "_index", InvertedIndex(roadmap_search.FIELD_WEIGHTS))
+    monkeypatch.setattr(roadmap_search, "_filters", {})
+    monkeypatch.setattr(roadmap_search, "_loaded_at", None)
+    monkeypatch.setattr(roadmap_search, "_reload_task", None)
+
+
+def test_stale_index_is_served_while_one_rebuild_runs(db, fresh_index, run, monkeypatch):
+    reloads = []
+    reload = RoadmapSearchService.reload
+
+    async def counted(self):
+        reloads.append(1)
+        await reload(self)
+
+    monkeypatch.setattr(RoadmapSearchService, "reload", counted)
+
+    async def scenario():
+        await db["roadmaps"].insert_one({"title": "Python backend"})
+        service = RoadmapSearchService()
+        first = await service.search("python")
+
+        await db["roadmaps"].insert_one({"title": "Python data science"})
+        roadmap_search._loaded_at = time.monotonic() - roadmap_search.INDEX_REFRESH_SECONDS - 1
+        stale = await asyncio.gather(service.search("python"), service.search("python"))
+        await roadmap_search._reload_task
+        return first, stale, await service.search("python")
+
+    first, stale, fresh = run(scenario())
+
+    assert len(first) == 1
+    assert stale == [first, first]
+    assert len(fresh) == 2
+    assert len(reloads) == 2
+
+
+def test_writes_made_during_a_rebuild_reach_the_new_index(db, fresh_index, run, monkeypatch):
+    service = RoadmapSearchService()
+    to_thread = asyncio.to_thread
+
+    async def build_while_writing(function, *args):
+        # Written after the rebuild read the collection, before its swap
+        service.index_roadmap({"_id": "written", "title": "Rust systems"})
+        service.remove_roadmap("removed")
+        return await to_thread(function, *args)
+
+    async def scenario():
+        await db["roadmaps"].insert_one({"_id": "removed", "title": "Rust web"})
+        monkeypatch.setattr(roadmap_search.asyncio, "to_thread", build_while_writing)
+        await service.reload()
+        return await service.search("rust")
+
+    assert run(scenario()) == ["written"]
@@ -0,0 +1,96 @@
+from bson import ObjectId
+
+from app.models.roadmaps.roadmap import RoadmapCreate
+from app.services.roadmaps.roadmap_service import RoadmapService
+from app.services.studentGrades import GradesService
+
+EMAIL = "student@example.com"
+
+
+def _roadmap(course_ids: list, milestones: list) -> RoadmapCreate:
+    return RoadmapCreate(
+        title="Backend",
+        description="From zero to backend developer",
+        category="web_development",
+        difficulty="beginner",
+        estimated_duration_weeks=12,
+        instructor_id="instructor",
+        courses=[
+            {"course_id": course_id, "order": index + 1, "estimated_duration_weeks": 4}
+            for index, course_id in enumerate(course_ids)
+        ],
+        milestones=[
+            {"id": f"m{index + 1}", "title": f"Milestone {index + 1}", "description": "", "order": index + 1,
+             "course_ids": milestone, "estimated_duration_weeks": 4}
+            for index, milestone in enumerate(milestones)
+        ]
+    )
+
+
+def test_progress_reads_every_final_grade_in_one_query(db, memory_cache, run, monkeypatch):
+    lookups = []
+    get_grades_for_modules = GradesService.get_grades_for_modules
+
+    async def counted(self, email, modules):
+        lookups.append(list(modules))
+        return await get_grades_for_modules(self, email, modules)
+
+    monkeypatch.setattr(GradesService, "get_grades_for_modules", counted)
+
+    async def scenario():
+        await db["student_grades"].insert_many([
+            {"email": EMAIL, "module": "sql-final", "grade": 90, "date_assigned": "2025-03-01"},
+            {"email": EMAIL, "module": "api-final", "grade": 10, "date_assigned": "2025-03-02"},
+            {"email": "other@example.com", "module": "docker-final", "grade": 100, "date_assigned": "2025-03-03"}
+        ])
+        service = RoadmapService()
+        roadmap = await service.create_roadmap(_roadmap(["sql", "api", "docker"], [["sql"], ["api", "docker"]]))
+        return await service.get_student_roadmap_progress(EMAIL, str(roadmap.id))
+
+    progress = run(scenario())
+
+    assert lookups == [["sql-final", "api-final", "docker-final"]]
+    assert progress["course_progress"]["sql"] == {"completed": True, "grade": 90, "completion_date": "2025-03-01"}
+    assert progress["course_progress"]["api"] == {"completed": False, "grade": 10, "completion_date": None}
+    assert progress["course_progress"]["docker"]["grade"] is None
+    assert (progress["completed_courses"], progress["total_courses"]) == (1, 3)
+    assert progress["milestone_progress"]["m1"]["completed"] is True
+    assert progress["milestone_progress"]["m2"]["completed_courses"] == 0
+    assert progress["milestone_progress"]["m2"]["progress_percentage"] == 0
+    assert progress["roadmap_completed"] is False
+
+
+def test_course_details_match_object_and_string_ids(db, memory_cache, run):
+    async def scenario():
+        modern = await db["courses"].insert_one({"title": "SQL", "level": "beginner", "status": "published"})
+        await db["courses"].insert_one({"_id": "legacy-api", "title": "APIs", "level": "intermediate"})
+        service = RoadmapService()
+        roadmap = await service.create_roadmap(_roadmap([str(modern.inserted_id), "legacy-api", "missing"], []))
+        return str(modern.inserted_id), await service.get_roadmap_with_courses_details(str(roadmap.id))
+
+    modern_id, details = run(scenario())
+
+    assert [course["course_details"]["id"] for course in details["courses"]] == [modern_id, "legacy-api"]
+    assert [course["course_details"]["title"] for course in details["courses"]] == ["SQL", "APIs"]
+    assert details["courses"][1]["roadmap_info"]["order"] == 2
+
+
+def test_course_details_are_cached_until_a_course_changes(db, memory_cache, run):
+    async def scenario():
+        course = await db["courses"].insert_one({"title": "SQL"})
+        course_id = str(course.inserted_id)
+        service = RoadmapService()
+        roadmap_id = str((await service.create_roadmap(_roadmap([course_id], []))).id)
+        first = await service.get_roadmap_with_courses_details(roadmap_id)
+
+        await db["courses"].update_one({"_id": ObjectId(course_id)}, {"$set": {"title": "PostgreSQL"}})
+        cached = await service.get_roadmap_with_courses_details(roadmap_id)
+        await service.invalidate_course_details(course_id)
+        fresh = await service.get_roadmap_with_courses_details(roadmap_id)
+        return first, cached, fresh
+
+    first, cached, fresh = run(scenario())
+
+    assert first["courses"][0]["course_details"]["title"] == "SQL"
+    assert cached["courses"][0]["course_details"]["title"] == "SQL"
+    assert fresh["courses"][0]["course_details"]["title"] == "PostgreSQL"
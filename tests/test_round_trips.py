@@ -0,0 +1,34 @@
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.metrics import DB_ROUND_TRIPS
+from app.core.roundtrips import record_redis_call
+from app.main import app
+
+ROUTE = "/_test/streamed-export"
+
+
+def _observed(backend: str) -> float:
+    return DB_ROUND_TRIPS.labels(method="GET", route=ROUTE, backend=backend)._sum.get()
+
+
+def test_round_trips_made_while_streaming_are_recorded():
+    async def rows():
+        for row in range(3):
+            record_redis_call()
+            yield f"{row}\n"
+
+    async def streamed_export():
+        return StreamingResponse(rows(), media_type="text/plain")
+
+    # Ahead of the grades router, whose "/{email}/{module}" would match first
+    app.add_api_route(ROUTE, streamed_export, methods=["GET"])
+    app.router.routes.insert(0, app.router.routes.pop())
+    try:
+        before = _observed("redis")
+        response = TestClient(app).get(ROUTE)
+    finally:
+        app.router.routes.pop(0)
+
+    assert response.text == "0\n1\n2\n"
+    assert _observed("redis") - before == 3
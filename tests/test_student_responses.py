@@ -0,0 +1,81 @@
+from pymongo.errors import DuplicateKeyError
+
+from app.tools.migrate_legacy_data import drop_duplicates
+from app.models.studentResponses import StudentResponses
+from app.services.studentResponses import ResponsesService
+
+
+def _responses(email: str, *answers: str) -> StudentResponses:
+    return StudentResponses(
+        email=email,
+        responses=[{"question_id": index + 1, "answer": answer} for index, answer in enumerate(answers)]
+    )
+
+
+class RacingCollection:
+    """Collection whose first upsert loses the race against a concurrent insert."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.attempts = 0
+
+    async def update_one(self, *args, **kwargs):
+        self.attempts += 1
+        if self.attempts == 1:
+            await self.collection.insert_one({"email": "racer@example.com", "responses": []})
+            raise DuplicateKeyError("E11000 duplicate key error")
+        return await self.collection.update_one(*args, **kwargs)
+
+
+def test_create_responses_inserts_then_updates(db, run):
+    async def scenario():
+        service = ResponsesService()
+        created = await service.create_responses(_responses("student@example.com", "a"))
+        updated = await service.create_responses(_responses("student@example.com", "b", "c"))
+        stored = await service.get_responses_by_token("student@example.com")
+        return created, updated, stored
+
+    created, updated, stored = run(scenario())
+
+    assert "inserted_id" in created
+    assert updated == {"updated_count": 1}
+    assert stored["_id"] == created["inserted_id"]
+    assert [response["answer"] for response in stored["responses"]] == ["b", "c"]
+    assert run(db["student_responses"].count_documents({})) == 1
+
+
+def test_create_responses_retries_a_lost_upsert_race(db, run):
+    async def scenario():
+        await db["student_responses"].create_index("email", unique=True)
+        racing = RacingCollection(db["student_responses"])
+        service = ResponsesService()
+
+        async def get_collection():
+            return racing
+
+        service.get_collection = get_collection
+        result = await service.create_responses(_responses("racer@example.com", "a"))
+        stored = await db["student_responses"].find({"email": "racer@example.com"}).to_list(None)
+        return racing.attempts, result, stored
+
+    attempts, result, stored = run(scenario())
+
+    assert attempts == 2
+    assert result == {"updated_count": 1}
+    assert len(stored) == 1
+    assert stored[0]["responses"] == [{"question_id": 1, "answer": "a"}]
+
+
+def test_drop_duplicates_keeps_the_oldest_document(db, run):
+    async def scenario():
+        collection = db["student_responses"]
+        oldest = await collection.insert_one({"email": "twice@example.com", "responses": ["first"]})
+        await collection.insert_one({"email": "twice@example.com", "responses": ["second"]})
+        await collection.insert_one({"email": "once@example.com", "responses": []})
+        await drop_duplicates("student_responses", ["email"])
+        return oldest.inserted_id, await collection.find({}).sort("_id", 1).to_list(None)
+
+    oldest_id, remaining = run(scenario())
+
+    assert [document["email"] for document in remaining] == ["twice@example.com", "once@example.com"]
+    assert remaining[0]["_id"] == oldest_id
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.text_index import PrefixIndex
+from app.services.search import suggest_service
+from app.services.search.suggest_service import SuggestService
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    """Give the test its own, not yet loaded, worker index."""
+    monkeypatch.setattr(suggest_service, "_index", PrefixIndex())
+    monkeypatch.setattr(suggest_service, "_loaded_at", None)
+    monkeypatch.setattr(suggest_service, "_refresh_task", None)
+
+
+def _titles(suggestions) -> list:
+    return sorted(suggestion["title"] for suggestion in suggestions)
+
+
+def test_writes_made_during_a_rebuild_reach_the_new_index(db, fresh_index, run, monkeypatch):
+    service = SuggestService()
+    to_thread = asyncio.to_thread
+
+    async def build_while_writing(function, *args):
+        # Written after the rebuild read the collections, before its swap
+        service.index_document("course", {"_id": "new", "title": "Python avanzado", "status": "published"})
+        service.index_document("course", {"_id": "old", "title": "Python básico", "status": "archived"})
+        return await to_thread(function, *args)
+
+    async def scenario():
+        await db["courses"].insert_one({"_id": "old", "title": "Python básico", "status": "published"})
+        monkeypatch.setattr(suggest_service.asyncio, "to_thread", build_while_writing)
+        await service.reload()
+        return await service.suggest("pyth")
+
+    assert _titles(run(scenario())) == ["Python avanzado"]
+
+
+def test_expired_index_is_served_while_it_is_rebuilt(db, fresh_index, run):
+    async def scenario():
+        await db["courses"].insert_one({"title": "Python básico", "status": "published"})
+        service = SuggestService()
+        first = await service.suggest("pyth")
+
+        await db["courses"].insert_one({"title": "Python avanzado", "status": "published"})
+        suggest_service._loaded_at = time.monotonic() - suggest_service.SUGGEST_REFRESH_SECONDS - 1
+        stale = await service.suggest("pyth")
+        task = suggest_service._refresh_task
+        await task
+        return first, stale, task, await service.suggest("pyth")
+
+    first, stale, task, fresh = run(scenario())
+
+    assert _titles(first) == _titles(stale) == ["Python básico"]
+    assert task is not None
+    assert _titles(fresh) == ["Python avanzado", "Python básico"]
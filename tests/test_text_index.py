@@ -0,0 +1,61 @@
+import pytest
+
+from app.core.text_index import InvertedIndex, PrefixIndex, stem, tokenize
+
+
+@pytest.mark.parametrize("words", [
+    ("Desarrollo", "desarrollar", "desarrollando"),
+    ("programación", "programming", "programar", "programas"),
+    ("función", "funciones", "funcionar"),
+    ("class", "classes"),
+    ("library", "libraries"),
+    ("loop", "loops"),
+])
+def test_variants_share_a_stem(words):
+    assert len({tokenize(word)[0] for word in words}) == 1
+
+
+@pytest.mark.parametrize("word", ["class", "data", "status", "order"])
+def test_short_words_are_not_overstripped(word):
+    assert stem(word) == word
+
+
+def test_code_keywords_are_searchable():
+    index = InvertedIndex({"title": 1.0})
+    index.add("loops", {"title": "Bucles for en Python"})
+    index.add("sets", {"title": "Operador in y conjuntos"})
+
+    assert [doc_id for doc_id, _ in index.search("for")] == ["loops"]
+    assert [doc_id for doc_id, _ in index.search("in")] == ["sets"]
+
+
+def test_spanish_query_matches_verb_forms():
+    index = InvertedIndex({"title": 1.0})
+    index.add("web", {"title": "Desarrollo web"})
+    index.add("data", {"title": "Ciencia de datos"})
+
+    assert [doc_id for doc_id, _ in index.search("desarrollar")] == ["web"]
+
+
+def _lesson(number: int):
+    return f"lesson:{number:03d}", f"Intro python {number}", {"id": number}, ()
+
+
+def test_prefix_index_load_matches_incremental_adds():
+    loaded, added = PrefixIndex(), PrefixIndex()
+    entries = [_lesson(number) for number in range(50)]
+    loaded.load(entries)
+    for entry in reversed(entries):
+        added.add(*entry)
+    added.remove("lesson:007")
+    loaded.remove("lesson:007")
+
+    assert loaded._pairs == added._pairs
+    assert loaded.lookup("intro pyth") == added.lookup("intro pyth")
+
+
+def test_label_prefix_matches_rank_beyond_the_candidate_scan():
+    index = PrefixIndex(max_candidates=20)
+    index.load([_lesson(number) for number in range(100)] + [("lesson:zzz", "Python", {"id": "zzz"}, ())])
+
+    assert index.lookup("pyth", limit=1) == [{"id": "zzz"}]